@@ -1,6 +1,6 @@
 from django.contrib import admin
 from .models import (
-    School, UserProfile, Member, ClassRoom, AcademicYear,
+    School, UserProfile, Member, MemberProfile, ClassRoom, AcademicYear,
     Attendance, Notice, Expense, StudyMaterial, ExamScore,
     TransportRoute, StudentTransport, Book, LibraryTransaction,
     Staff, SalaryTransaction, FeeStructure, FeeTransaction 
@@ -15,7 +15,13 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_filter = ('school', 'role')
 
 # --- 1. STUDENT ADMIN ---
+class MemberProfileInline(admin.StackedInline):
+    model = MemberProfile
+    can_delete = False
+    extra = 0
+
 class MemberAdmin(admin.ModelAdmin):
+    inlines = [MemberProfileInline]
     list_display = ('firstname', 'lastname', 'student_class', 'mobile_number')
     search_fields = ('firstname', 'admission_no', 'mobile_number')
     list_filter = ('student_class', 'gender')
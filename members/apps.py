@@ -9,6 +9,15 @@ class MembersConfig(AppConfig):
         from django.db.models.signals import post_migrate
         from django.contrib.auth.models import Group, Permission
         from django.contrib.contenttypes.models import ContentType
+        from .utils import tenant_registry  # noqa: F401  (connects School cache invalidation)
+        from .services import notifications  # noqa: F401  (connects notification summary invalidation)
+        from .services import dashboard  # noqa: F401  (connects dashboard snapshot maintenance)
+        from .services import attendance  # noqa: F401  (connects attendance rollup maintenance)
+        from .services import pdf  # noqa: F401  (connects cached PDF invalidation)
+        from .services import student_search  # noqa: F401  (connects search index invalidation)
+        from .services import metrics
+
+        metrics.time_template_rendering()
 
         def ensure_groups(sender, **kwargs):
             roles = ['Admin', 'Accountant', 'Teacher', 'Librarian', 'Student']
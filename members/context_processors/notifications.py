@@ -1,5 +1,7 @@
 """Expose notification count and recent notifications for navbar."""
-from ..models import Notification
+from ..services.notifications import NotificationService
+
+NAVBAR_LIMIT = 8
 
 
 def notifications(request):
@@ -8,9 +10,8 @@ def notifications(request):
     school = getattr(request, "school", None)
     if not school:
         return {"unread_notification_count": 0, "recent_notifications": []}
-    qs = Notification.objects.filter(school=school, user=request.user).order_by("-created_at")[:8]
-    unread_count = Notification.objects.filter(school=school, user=request.user, read=False).count()
+    summary = NotificationService.summary(school.id, request.user.id)
     return {
-        "unread_notification_count": unread_count,
-        "recent_notifications": list(qs),
+        "unread_notification_count": summary["unread_count"],
+        "recent_notifications": summary["recent"][:NAVBAR_LIMIT],
     }
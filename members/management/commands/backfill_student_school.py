@@ -0,0 +1,63 @@
+"""
+Copy each student's school onto Attendance, ExamScore, FeeTransaction and Payment rows
+that predate the denormalized school column.
+Usage: python manage.py backfill_student_school [--model attendance] [--batch-size 5000] [--sleep 0]
+
+Works in primary-key order, one UPDATE per batch, each in its own transaction, so it can
+be interrupted and re-run at any time: only rows whose school is still empty are touched.
+Rows of students without a school stay empty and are reported.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from members.models import Attendance, ExamScore, FeeTransaction, Member, Payment
+
+MODELS = {
+    "attendance": Attendance,
+    "examscore": ExamScore,
+    "feetransaction": FeeTransaction,
+    "payment": Payment,
+}
+
+
+def backfill(model, batch_size, sleep=0, after_pk=0):
+    """Fill school_id for one model in pk batches; returns (rows updated, last pk seen)."""
+    student_school = Member.objects.filter(pk=OuterRef("student_id")).values("school_id")[:1]
+    pending = model.objects.filter(school__isnull=True).order_by("pk")
+    updated = 0
+    while True:
+        ids = list(pending.filter(pk__gt=after_pk).values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return updated, after_pk
+        with transaction.atomic():
+            updated += model.objects.filter(pk__in=ids).update(school_id=Subquery(student_school))
+        after_pk = ids[-1]
+        if sleep:
+            time.sleep(sleep)
+
+
+class Command(BaseCommand):
+    help = "Backfill the denormalized school column on student-owned tables, in resumable batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", choices=sorted(MODELS), action="append", help="Only this table (repeatable). Default: all")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per UPDATE (default: 5000)")
+        parser.add_argument("--sleep", type=float, default=0, help="Seconds to pause between batches (default: 0)")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        for name in options["model"] or sorted(MODELS):
+            model = MODELS[name]
+            updated, _ = backfill(model, batch_size, sleep=options["sleep"])
+            orphans = model.objects.filter(school__isnull=True).count()
+            line = f"{name}: {updated} rows backfilled"
+            if orphans:
+                line += f", {orphans} left empty (student has no school)"
+            self.stdout.write(line)
+        self.stdout.write(self.style.SUCCESS("✓ Student school backfill complete"))
@@ -0,0 +1,81 @@
+"""
+Write one school's backup as NDJSON (optionally gzip), streaming it in primary-key chunks.
+Usage: python manage.py backup_school CODE --output backup.ndjson[.gz] [--gzip] [--resume]
+
+The file is written to <output>.partial and renamed when the end marker is on disk. With
+--resume, the complete lines of an existing .partial are kept and the backup continues
+after the last row in it instead of starting over.
+"""
+import gzip
+import json
+import os
+import zlib
+
+from django.core.management.base import BaseCommand, CommandError
+
+from members.models import School
+from members.services.backup import BackupService
+
+
+def _complete_lines(path, compressed):
+    """Yield the whole lines of a partial backup, stopping at truncation."""
+    opener = gzip.open if compressed else open
+    try:
+        with opener(path, "rb") as fh:
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    return
+                try:
+                    json.loads(line)
+                except ValueError:
+                    return
+                yield line
+    except (EOFError, zlib.error, gzip.BadGzipFile):
+        return
+
+
+class Command(BaseCommand):
+    help = "Stream a school backup (NDJSON, optionally gzip) to a file; resumable"
+
+    def add_arguments(self, parser):
+        parser.add_argument("code", help="School code (subdomain)")
+        parser.add_argument("--output", required=True, help="Destination file")
+        parser.add_argument("--gzip", action="store_true", help="gzip-compress the output")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows read per query (default: 2000)")
+        parser.add_argument("--resume", action="store_true", help="Continue from <output>.partial")
+
+    def handle(self, *args, **options):
+        try:
+            school = School.objects.get(code=options["code"])
+        except School.DoesNotExist:
+            raise CommandError(f"No school with code {options['code']!r}")
+        output, compressed = options["output"], options["gzip"]
+        partial = output + ".partial"
+
+        kept, after = [], None
+        if options["resume"] and os.path.exists(partial):
+            kept = list(_complete_lines(partial, compressed))
+            records = [json.loads(line) for line in kept]
+            if records and records[-1].get("end"):
+                os.replace(partial, output)
+                self.stdout.write(self.style.SUCCESS(f"✓ {output} was already complete"))
+                return
+            rows = [r for r in records if "model" in r]
+            if rows:
+                after = (rows[-1]["model"], rows[-1]["pk"])
+            else:
+                kept = []  # at most the header: write the backup from the start (and its header once)
+            self.stdout.write(f"Resuming after {len(kept)} line(s)" + (f" ({after[0]} #{after[1]})" if after else ""))
+
+        if kept:
+            # Keep only the whole lines; the rest of the backup is appended after them
+            # (for gzip as a further member, which gzip readers concatenate).
+            tmp = partial + ".tmp"
+            with (gzip.open if compressed else open)(tmp, "wb") as out:
+                out.writelines(kept)
+            os.replace(tmp, partial)
+        with open(partial, "ab" if kept else "wb") as out:
+            for block in BackupService.iter_ndjson(school, compress=compressed, chunk_size=options["chunk_size"], after=after):
+                out.write(block)
+        os.replace(partial, output)
+        self.stdout.write(self.style.SUCCESS(f"✓ Backup of {school.code} written to {output}"))
@@ -0,0 +1,271 @@
+"""
+Load-test the tenant hot paths: wall time and query count per view, as JSON.
+Usage: python manage.py benchmark_views [--students 1000] [--iterations 20] [--output bench.json]
+       python manage.py benchmark_views --school CODE ...        (an existing school)
+       python manage.py benchmark_views ... --compare last.json  (flag regressions)
+
+By default a throwaway test database is created and seeded with seed_all_schools
+--scale STUDENTS (plus generate_installments), so runs are comparable on any machine;
+--keepdb keeps it between runs. With --school the current database is used.
+
+GET requests run as they do in production, outside any transaction, so the caches that
+refuse to store inside one (tenant lookups, the notification summary) are measured warm.
+POST requests write, so each runs in a transaction that is rolled back; an unmeasured GET
+of the same URL primes those caches first. The benchmark's own users, with their
+notifications and sessions, are deleted at the end, so nothing is left behind.
+
+Each view gets --warmup unmeasured requests, then --iterations measured ones through
+the Django test client. The report has p50/p90/p95/p99/mean/max milliseconds and the
+query count per view. --compare exits non-zero when a view's p95 is more than
+--tolerance percent slower than in the earlier report, or it issues more queries.
+"""
+import json
+import math
+import platform
+import time
+from contextlib import contextmanager
+from datetime import date
+
+import django
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from members.models import ClassRoom, Member, Notification, School
+from members.services.seeding import MAX_STUDENTS, create_school_user
+
+BENCH_SCHOOL = {"code": "bench", "name": "Benchmark School", "school_code": "BENCH001", "address": "1 Load Test Road"}
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(sorted_values, p: float) -> float:
+    """Linear interpolation between closest ranks (numpy's default)."""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    lo, hi = math.floor(k), math.ceil(k)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class _Rollback(Exception):
+    pass
+
+
+def bench_users(school) -> dict:
+    """One login per benchmarked role; the parent is linked to two students."""
+    users = {
+        role: create_school_user(f"bench-{role.lower()}-{school.pk}", "!", school, role)
+        for role in ("OWNER", "TEACHER", "ACCOUNTANT", "PARENT")
+    }
+    children = Member.objects.filter(school=school).order_by("id")[:2]
+    users["PARENT"].userprofile.guardian_of.set(children)
+    Notification.objects.bulk_create([
+        Notification(school=school, user=users["OWNER"], title=f"Benchmark {i}", message="Load test", read=i % 3 == 0)
+        for i in range(60)
+    ])
+    return users
+
+
+def scenarios(school, users):
+    """(name, user, method, url, data) for each benchmarked view."""
+    today = date.today().isoformat()
+    classroom = (
+        ClassRoom.objects.filter(school=school).annotate(n=Count("member")).order_by("-n", "id").first()
+    )
+    class_students = list(
+        Member.objects.filter(school=school, student_class=classroom).values_list("id", flat=True)
+    ) if classroom else []
+    student_id = class_students[0] if class_students else Member.objects.filter(school=school).values_list("id", flat=True).first()
+
+    attendance_post = {"date": today, "class_id": classroom.id if classroom else "", "student_ids": class_students}
+    attendance_post.update({f"status_{sid}": "Present" if i % 5 else "Absent" for i, sid in enumerate(class_students)})
+    attendance_url = reverse("attendance") + (f"?class_id={classroom.id}&date={today}" if classroom else "")
+    return [
+        ("index", users["OWNER"], "get", reverse("index"), None),
+        ("all_students", users["OWNER"], "get", reverse("all_students"), None),
+        ("attendance GET", users["TEACHER"], "get", attendance_url, None),
+        ("attendance POST", users["TEACHER"], "post", reverse("attendance"), attendance_post),
+        ("fee_installments", users["ACCOUNTANT"], "get", reverse("fee_installments"), None),
+        ("collect_fee", users["ACCOUNTANT"], "post", reverse("collect_fee"),
+         {"student_id": student_id, "amount": "500", "mode": "Cash", "date": today}),
+        ("report_card", users["OWNER"], "get", reverse("report_card"), None),
+        ("library", users["OWNER"], "get", reverse("library_home"), None),
+        ("parent_dashboard", users["PARENT"], "get", reverse("parent_dashboard"), None),
+        ("notification_list", users["OWNER"], "get", reverse("notification_list"), None),
+    ]
+
+
+class Command(BaseCommand):
+    help = "Benchmark the hot tenant views (wall time percentiles and query counts) and write a JSON report"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=1000, help="Size of the seeded school (default: 1000)")
+        parser.add_argument("--school", help="Benchmark this existing school (code) in the current database instead")
+        parser.add_argument("--keepdb", action="store_true", help="Keep (and reuse) the seeded test database")
+        parser.add_argument("--iterations", type=int, default=20, help="Measured requests per view (default: 20)")
+        parser.add_argument("--warmup", type=int, default=2, help="Unmeasured requests per view first (default: 2)")
+        parser.add_argument("--only", help="Comma-separated view names to run (default: all)")
+        parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+        parser.add_argument("--compare", help="Earlier JSON report to compare against")
+        parser.add_argument("--tolerance", type=float, default=20.0, help="Allowed p95 slowdown in percent (default: 20)")
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be at least 1")
+        if options["school"]:
+            school = School.objects.filter(code=options["school"]).first()
+            if school is None:
+                raise CommandError(f"School with code '{options['school']}' not found")
+            report = self._run(school, options)
+        else:
+            if not 1 <= options["students"] <= MAX_STUDENTS:
+                raise CommandError(f"--students must be between 1 and {MAX_STUDENTS}")
+            old_name = connection.settings_dict["NAME"]
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options["keepdb"])
+            try:
+                school = self._seeded_school(options["students"])
+                report = self._run(school, options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+
+        text = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                fh.write(text + "\n")
+            self.stderr.write(f"Report written to {options['output']}")
+        else:
+            self.stdout.write(text)
+        self._summary(report)
+        if options["compare"]:
+            self._compare(report, options["compare"], options["tolerance"])
+
+    def _seeded_school(self, students: int) -> School:
+        school = School.objects.filter(code=BENCH_SCHOOL["code"]).first()
+        if school is not None and Member.objects.filter(school=school).count() == students:
+            return school  # --keepdb: seeded by an earlier run
+        if school is not None:
+            school.delete()
+        school = School.objects.create(**BENCH_SCHOOL)
+        self.stderr.write(f"Seeding {students} students...")
+        started = time.perf_counter()
+        call_command("seed_all_schools", scale=students, seed=1, stdout=_Null())
+        call_command("generate_installments", school=school.code, stdout=_Null())
+        self.stderr.write(f"Seeded in {time.perf_counter() - started:.1f}s")
+        return school
+
+    def _run(self, school, options) -> dict:
+        only = {name.strip() for name in options["only"].split(",")} if options["only"] else None
+        results = {}
+        users = bench_users(school)
+        try:
+            for name, user, method, url, data in scenarios(school, users):
+                if only and name not in only:
+                    continue
+                self.stderr.write(f"  {name}...")
+                results[name] = self._measure(school, user, method, url, data, options)
+        finally:
+            # Cascades to their profiles and notifications (whose signals drop the cached summaries)
+            User.objects.filter(pk__in=[user.pk for user in users.values()]).delete()
+
+        return {
+            "meta": {
+                "created_at": timezone.now().isoformat(),
+                "school": school.code,
+                "students": Member.objects.filter(school=school).count(),
+                "iterations": options["iterations"],
+                "warmup": options["warmup"],
+                "database": connection.vendor,
+                "django": django.get_version(),
+                "python": platform.python_version(),
+            },
+            "views": results,
+        }
+
+    def _measure(self, school, user, method, url, data, options) -> dict:
+        client = Client(HTTP_HOST=f"{school.code}.localhost")
+        client.force_login(user)
+        if method != "get":
+            client.get(url)  # outside the rollback below, so the per-process caches are warm
+        times, queries, statuses = [], [], set()
+        for i in range(options["warmup"] + options["iterations"]):
+            with self._rolled_back(method != "get"):
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response = getattr(client, method)(url, data or {})
+                    elapsed = (time.perf_counter() - started) * 1000
+            if i >= options["warmup"]:
+                times.append(elapsed)
+                queries.append(len(captured))
+                statuses.add(response.status_code)
+        client.logout()  # deletes the session row
+
+        times.sort()
+        return {
+            "method": method.upper(),
+            "url": url,
+            "status": sorted(statuses),
+            "queries": {"min": min(queries), "max": max(queries)},
+            "ms": {
+                **{f"p{p}": round(percentile(times, p), 2) for p in PERCENTILES},
+                "mean": round(sum(times) / len(times), 2),
+                "max": round(times[-1], 2),
+            },
+        }
+
+    @staticmethod
+    @contextmanager
+    def _rolled_back(enabled: bool):
+        """Run the block in a transaction that is rolled back (or as is, when not enabled)."""
+        if not enabled:
+            yield
+            return
+        try:
+            with transaction.atomic():
+                yield
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _summary(self, report) -> None:
+        self.stderr.write(f"\n{'view':<20} {'status':>8} {'queries':>8} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+        for name, r in report["views"].items():
+            status = ",".join(map(str, r["status"]))
+            self.stderr.write(
+                f"{name:<20} {status:>8} {r['queries']['max']:>8} {r['ms']['p50']:>9} {r['ms']['p95']:>9} {r['ms']['max']:>9}"
+            )
+        failing = [name for name, r in report["views"].items() if any(s >= 400 for s in r["status"])]
+        if failing:
+            raise CommandError(f"Views answered with an error status: {', '.join(failing)}")
+
+    def _compare(self, report, path, tolerance) -> None:
+        try:
+            with open(path) as fh:
+                baseline = json.load(fh)["views"]
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f"Cannot read baseline report {path}: {e}")
+        regressions = []
+        for name, r in report["views"].items():
+            before = baseline.get(name)
+            if not before:
+                continue
+            if r["queries"]["max"] > before["queries"]["max"]:
+                regressions.append(f"{name}: {before['queries']['max']} -> {r['queries']['max']} queries")
+            if before["ms"]["p95"] and r["ms"]["p95"] > before["ms"]["p95"] * (1 + tolerance / 100):
+                regressions.append(f"{name}: p95 {before['ms']['p95']} -> {r['ms']['p95']} ms")
+        if regressions:
+            raise CommandError("Regressions against " + path + ":\n  " + "\n  ".join(regressions))
+        self.stderr.write(self.style.SUCCESS(f"No regressions against {path} (p95 tolerance {tolerance:g}%)"))
+
+
+class _Null:
+    def write(self, *args, **kwargs):
+        pass
+
+    def flush(self):
+        pass
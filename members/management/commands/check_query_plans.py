@@ -0,0 +1,129 @@
+"""
+EXPLAIN the main tenant-scoped view queries and fail on sequential scans of large tables.
+Usage: python manage.py check_query_plans [--school CODE] [--min-rows 10000] [--verbose]
+
+Run against a production-sized copy of the database after adding views or migrations.
+Tables with fewer than --min-rows rows are ignored: planners rightly prefer a full scan
+of a small table. Exits non-zero when any query scans a large table sequentially.
+Supports PostgreSQL ("Seq Scan on ...") and SQLite ("SCAN table" without an index).
+"""
+import re
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Q
+
+from members.models import (
+    AdmissionEnquiry, Attendance, ClassRoom, ExamScore, FeeInstallment, FeePaymentReceipt,
+    FeeTransaction, LibraryTransaction, Member, Notification, School, UserProfile,
+)
+
+SEQ_SCAN_PATTERNS = {
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+    "sqlite": re.compile(r"\bSCAN (\w+)\b(?! USING)"),
+}
+
+
+def view_queries(school):
+    """(label, queryset) pairs mirroring the hot queries of the main views."""
+    classroom = ClassRoom.objects.filter(school=school).first()
+    student = Member.objects.filter(school=school).first()
+    user_id = UserProfile.objects.filter(school=school).values_list("user_id", flat=True).first()
+    today = date.today()
+
+    queries = [
+        ("all_students", Member.objects.filter(school=school).order_by("firstname", "id")[:26]),
+        ("dashboard recent admissions", Member.objects.filter(school=school).order_by("-joined_date", "-id")[:5]),
+        ("attendance_records", Attendance.objects.filter(school=school).order_by("-date", "id")[:51]),
+        (
+            "attendance_records deep page",
+            Attendance.objects.filter(school=school)
+            .filter(Q(date__lt=today) | Q(date=today, id__gt=0))
+            .order_by("-date", "id")[:51],
+        ),
+        ("attendance_records by date", Attendance.objects.filter(school=school, date=today)),
+        ("fee_home transactions", FeeTransaction.objects.filter(school=school).order_by("-payment_date", "-id")[:50]),
+        ("fee receipts", FeePaymentReceipt.objects.filter(school=school).order_by("-received_at")[:200]),
+        ("books issued", LibraryTransaction.objects.filter(school=school, status="Issued")),
+        ("enquiry_list", AdmissionEnquiry.objects.filter(school=school).order_by("-created_at")[:50]),
+        ("enquiry status counts", AdmissionEnquiry.objects.filter(school=school).values("status").annotate(n=Count("id"))),
+    ]
+    if classroom:
+        queries.append((
+            "attendance register",
+            Member.objects.filter(school=school, student_class=classroom).order_by("firstname"),
+        ))
+    if student:
+        queries += [
+            ("student ledger", FeeInstallment.objects.filter(school=school, student=student).order_by("due_date")),
+            ("student transactions", FeeTransaction.objects.filter(student=student).order_by("-payment_date")[:10]),
+            ("student exams", ExamScore.objects.filter(student=student).order_by("-created_at")),
+            ("student attendance", Attendance.objects.filter(student=student).order_by("-date")[:30]),
+        ]
+    if user_id:
+        queries.append((
+            "notification summary",
+            Notification.objects.filter(school=school, user_id=user_id).order_by("-created_at")[:15],
+        ))
+    return queries
+
+
+def _row_counts(tables):
+    counts = {}
+    with connection.cursor() as cursor:
+        for table in tables:
+            if connection.vendor == "postgresql":
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+                row = cursor.fetchone()
+                counts[table] = row[0] if row else 0
+            else:
+                cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(table)}")
+                counts[table] = cursor.fetchone()[0]
+    return counts
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the main view queries; fail if any sequentially scans a large table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--school", help="School code to build queries for (default: the largest school)")
+        parser.add_argument("--min-rows", type=int, default=10000, help="Only flag tables with at least this many rows")
+        parser.add_argument("--verbose", action="store_true", help="Print every plan")
+
+    def handle(self, *args, **options):
+        pattern = SEQ_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f"Unsupported database backend: {connection.vendor}")
+
+        if options["school"]:
+            school = School.objects.filter(code=options["school"]).first()
+            if school is None:
+                raise CommandError(f"School with code '{options['school']}' not found")
+        else:
+            school = School.objects.annotate(n=Count("member")).order_by("-n").first()
+            if school is None:
+                raise CommandError("No schools in the database")
+
+        queries = view_queries(school)
+        tables = {qs.model._meta.db_table for _, qs in queries} | {Member._meta.db_table}
+        counts = _row_counts(tables)
+        large = {t for t, n in counts.items() if n >= options["min_rows"]}
+
+        failures = []
+        for label, qs in queries:
+            plan = qs.explain()
+            if options["verbose"]:
+                self.stdout.write(f"-- {label}\n{plan}\n")
+            scanned = sorted({t for t in pattern.findall(plan) if t in large})
+            if scanned:
+                failures.append((label, scanned))
+                self.stdout.write(self.style.ERROR(f"✗ {label}: sequential scan of {', '.join(scanned)}"))
+            else:
+                self.stdout.write(f"✓ {label}")
+
+        if failures:
+            raise CommandError(f"{len(failures)} of {len(queries)} queries scan large tables sequentially")
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {len(queries)} query plans checked for {school.code} (large tables: {', '.join(sorted(large)) or 'none'})"
+        ))
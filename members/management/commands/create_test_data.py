@@ -11,6 +11,7 @@ from members.models import (
     TransportRoute, StudentTransport, Staff, ExamScore,
     Attendance, Notice, FeeStructure, FeeTransaction
 )
+from members.services.dashboard import DashboardService
 
 class Command(BaseCommand):
     help = 'Creates comprehensive test data for Django ERP'
@@ -256,6 +257,9 @@ class Command(BaseCommand):
                 message=message
             )
         
+        # Fee transactions were created next to seeded fee_paid values: recount the dashboard
+        DashboardService.rebuild(school1.id)
+
         # Summary
         self.stdout.write(self.style.SUCCESS('\n✅ Test Data Created Successfully!\n'))
         self.stdout.write(f'  📚 Schools: {School.objects.count()}')
@@ -0,0 +1,49 @@
+"""
+Print the slow-query sampler's ring buffer (see members/services/slow_queries.py).
+Usage: python manage.py dump_slow_queries [--group] [--school CODE] [--min-ms 100] [--limit 50] [--json]
+
+Reads the snapshots the web workers write to METRICS_DIR/slow-queries, so run it with
+the same METRICS_DIR as the server.
+"""
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from members.services import slow_queries
+
+
+class Command(BaseCommand):
+    help = "Dump the slow SQL statements recorded by the sampler (newest first, or grouped by fingerprint)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--group", action="store_true", help="One line per SQL fingerprint, slowest total first")
+        parser.add_argument("--school", help="Only this school code")
+        parser.add_argument("--min-ms", type=float, default=0, help="Only statements at least this slow")
+        parser.add_argument("--limit", type=int, default=50, help="Rows to print (0 = all; default: 50)")
+        parser.add_argument("--json", action="store_true", help="Print JSON instead of text")
+
+    def handle(self, *args, **options):
+        if not settings.METRICS_DIR:
+            self.stderr.write(self.style.WARNING("METRICS_DIR is not set: only this process's samples (none) are visible."))
+        entries = slow_queries.recent(school=options["school"], min_ms=options["min_ms"])
+        rows = slow_queries.grouped(entries) if options["group"] else entries
+        if options["limit"]:
+            rows = rows[: options["limit"]]
+
+        if options["json"]:
+            self.stdout.write(json.dumps(rows, indent=2))
+            return
+        if not rows:
+            self.stdout.write("No slow queries recorded.")
+            return
+        for row in rows:
+            if options["group"]:
+                self.stdout.write(
+                    f"{row['id']}  {row['count']}x  total {row['total_ms']} ms  max {row['max_ms']} ms  "
+                    f"[{', '.join(row['schools']) or '-'}]"
+                )
+            else:
+                self.stdout.write(f"{row['at']}  {row['ms']} ms  {row['school'] or '-'}  {row['view'] or '-'}")
+            self.stdout.write(f"    {row['frame'] or '-'}" + (f"  via {row['source']}" if row["source"] else ""))
+            self.stdout.write(f"    {row['fingerprint']}")
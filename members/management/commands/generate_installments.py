@@ -0,0 +1,52 @@
+"""
+Generate / refresh quarterly fee installments for the active academic year.
+Usage: python manage.py generate_installments [--school CODE] [--class-id ID] [--as-of YYYY-MM-DD] [--batch-size 500]
+
+Intended to run from cron (e.g. nightly) so late fees stay current without the
+fee_installments page having to write on every view.
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from members.models import School
+from members.services.finance import FinanceService
+
+
+class Command(BaseCommand):
+    help = "Bulk-generate quarterly fee installments (and refresh late fees) for one or all schools"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--school", help="School code (subdomain). Default: all active schools")
+        parser.add_argument("--class-id", type=int, help="Limit to one ClassRoom id (requires --school)")
+        parser.add_argument("--as-of", help="Late fee reference date, YYYY-MM-DD (default: today)")
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows per bulk INSERT/UPDATE (default: 500)")
+
+    def handle(self, *args, **options):
+        as_of = None
+        if options["as_of"]:
+            try:
+                as_of = date.fromisoformat(options["as_of"])
+            except ValueError:
+                raise CommandError("--as-of must be YYYY-MM-DD")
+
+        if options["school"]:
+            schools = list(School.objects.filter(code=options["school"]))
+            if not schools:
+                raise CommandError(f"School with code '{options['school']}' not found")
+        else:
+            if options["class_id"]:
+                raise CommandError("--class-id requires --school")
+            schools = list(School.objects.filter(is_active=True).order_by("id"))
+
+        for school in schools:
+            result = FinanceService.generate_installments(
+                school.id,
+                class_id=options["class_id"],
+                as_of=as_of,
+                batch_size=options["batch_size"],
+            )
+            self.stdout.write(
+                f"{school.code}: {result.students} students, {result.created} created, {result.updated} updated"
+            )
+        self.stdout.write(self.style.SUCCESS(f"✓ Installments generated for {len(schools)} school(s)"))
@@ -0,0 +1,49 @@
+"""
+Rebuild the per-student monthly attendance rollup (AttendanceMonthly) from Attendance.
+Usage: python manage.py rebuild_attendance_rollups [--school CODE] [--month YYYY-MM] [--batch-size 500]
+
+save_day and single-row saves keep the rollup current; run this after bulk imports or
+direct SQL edits, or periodically to correct drift.
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from members.models import Member, School
+from members.services.attendance import AttendanceService
+
+
+class Command(BaseCommand):
+    help = "Recompute AttendanceMonthly rows for one or all schools"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--school", help="School code (subdomain). Default: all schools")
+        parser.add_argument("--month", help="Only this month, YYYY-MM (default: all history)")
+        parser.add_argument("--batch-size", type=int, default=500, help="Students per rebuild batch (default: 500)")
+
+    def handle(self, *args, **options):
+        months = None
+        if options["month"]:
+            try:
+                months = [date.fromisoformat(f"{options['month']}-01")]
+            except ValueError:
+                raise CommandError("--month must be YYYY-MM")
+
+        schools = School.objects.order_by("id")
+        if options["school"]:
+            schools = schools.filter(code=options["school"])
+            if not schools.exists():
+                raise CommandError(f"School with code '{options['school']}' not found")
+
+        batch_size = max(1, options["batch_size"])
+        count = 0
+        for school in schools:
+            student_ids = list(Member.objects.filter(school=school).order_by("id").values_list("id", flat=True))
+            rows = 0
+            for start in range(0, len(student_ids), batch_size):
+                rows += AttendanceService.rebuild_rollups(
+                    school.id, student_ids=student_ids[start:start + batch_size], months=months
+                )
+            self.stdout.write(f"{school.code}: {len(student_ids)} students, {rows} monthly rows")
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"✓ Attendance rollups rebuilt for {count} school(s)"))
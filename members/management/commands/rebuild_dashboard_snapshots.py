@@ -0,0 +1,35 @@
+"""
+Rebuild the materialized owner-dashboard metrics (DashboardSnapshot) from source tables.
+Usage: python manage.py rebuild_dashboard_snapshots [--school CODE]
+
+Signals keep snapshots current for ordinary saves; run this periodically (e.g. nightly)
+and after bulk imports, which bypass signals, to correct any drift.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from members.models import School
+from members.services.dashboard import DashboardService
+
+
+class Command(BaseCommand):
+    help = "Recompute DashboardSnapshot rows for one or all schools"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--school", help="School code (subdomain). Default: all schools")
+
+    def handle(self, *args, **options):
+        schools = School.objects.order_by("id")
+        if options["school"]:
+            schools = schools.filter(code=options["school"])
+            if not schools.exists():
+                raise CommandError(f"School with code '{options['school']}' not found")
+
+        count = 0
+        for school in schools:
+            snapshot = DashboardService.rebuild(school.id)
+            self.stdout.write(
+                f"{school.code}: {snapshot.total_students} students, "
+                f"{snapshot.fee_collected} collected, {snapshot.books_issued} books issued"
+            )
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"✓ Dashboard snapshots rebuilt for {count} school(s)"))
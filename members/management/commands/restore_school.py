@@ -0,0 +1,84 @@
+"""
+Restore a backup written by backup_school (or downloaded from School settings) as a new school.
+Usage: python manage.py restore_school backup.ndjson[.gz] [--code NEW] [--school-code NEW] [--batch-size 1000] [--resume]
+
+Rows are bulk-inserted batch by batch with their ids remapped. Progress is committed with
+every batch, so after an interruption --resume continues the unfinished restore of the
+same file instead of creating another school. Aadhaar numbers already held by another
+student (e.g. when restoring a copy next to the original) are cleared and reported.
+"""
+import gzip
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from members.models import School, SchoolRestore
+from members.services.backup import BackupService
+
+
+def _open(path):
+    with open(path, "rb") as fh:
+        compressed = fh.read(2) == b"\x1f\x8b"
+    return gzip.open(path, "rt", encoding="utf-8") if compressed else open(path, encoding="utf-8")
+
+
+class Command(BaseCommand):
+    help = "Restore a school backup into a new school, in resumable batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Backup file (.ndjson or .ndjson.gz)")
+        parser.add_argument("--code", help="Subdomain code for the restored school (default: the one in the backup)")
+        parser.add_argument("--school-code", help="School code for the restored school (default: the one in the backup)")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per insert (default: 1000)")
+        parser.add_argument("--resume", action="store_true", help="Continue the last unfinished restore of this file")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.exists(path):
+            raise CommandError(f"{path} does not exist")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        source = os.path.basename(path)
+
+        with _open(path) as fh:
+            records = BackupService.read_records(fh)
+            first = next(records, None)
+            if first is None:
+                raise CommandError("Backup is empty")
+            restore = None
+            if options["resume"]:
+                restore = (
+                    SchoolRestore.objects.filter(source=source[:255], status__in=["Running", "Failed"])
+                    .order_by("-created_at").first()
+                )
+                if restore is None:
+                    raise CommandError(f"No unfinished restore of {source} to resume")
+                SchoolRestore.objects.filter(pk=restore.pk).update(status="Running")
+                self.stdout.write(f"Resuming into {restore.school.code} after line {restore.lines_done}")
+            else:
+                school = first[1].get("school", {})
+                code = options["code"] or school.get("code")
+                school_code = options["school_code"] or school.get("school_code")
+                if School.objects.filter(code=code).exists() or School.objects.filter(school_code=school_code).exists():
+                    raise CommandError(f"School {code!r} / {school_code!r} already exists; pass --code and --school-code")
+                try:
+                    restore = BackupService.start_restore(first[1], source, options["code"], options["school_code"])
+                except ValueError as e:
+                    raise CommandError(str(e))
+            try:
+                restore = BackupService.restore_records(restore, records, batch_size=options["batch_size"])
+            except (ValueError, IntegrityError) as e:
+                raise CommandError(
+                    f"{e} (restored so far: {SchoolRestore.objects.get(pk=restore.pk).rows_restored} rows; "
+                    "fix the cause and re-run with --resume)"
+                )
+
+        if restore.aadhaar_cleared:
+            self.stdout.write(self.style.WARNING(
+                f"Cleared the Aadhaar number of {len(restore.aadhaar_cleared)} student(s) that another student "
+                f"already has (restored member ids: {', '.join(map(str, restore.aadhaar_cleared))})"
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Restored {restore.rows_restored} rows into {restore.school.name} ({restore.school.code})"
+        ))
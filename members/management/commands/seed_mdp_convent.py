@@ -32,6 +32,7 @@ from members.models import (
     TimetableEntry,
     Notification,
 )
+from members.services.dashboard import DashboardService
 from members.models import UserProfile
 
 User = get_user_model()
@@ -420,6 +421,9 @@ class Command(BaseCommand):
                     read=False,
                 )
 
+        # Fee transactions were created next to seeded fee_paid values: recount the dashboard
+        DashboardService.rebuild(school.id)
+
         # Summary
         self.stdout.write(self.style.SUCCESS("\nMDP Convent seed completed.\n"))
         self.stdout.write(f"  School: {school.name}")
@@ -427,9 +431,9 @@ class Command(BaseCommand):
         self.stdout.write(f"  Students: {Member.objects.filter(school=school).count()}")
         self.stdout.write(f"  Staff: {Staff.objects.filter(school=school).count()}")
         self.stdout.write(f"  Books: {Book.objects.filter(school=school).count()}")
-        self.stdout.write(f"  Fee transactions: {FeeTransaction.objects.filter(student__school=school).count()}")
-        self.stdout.write(f"  Attendance: {Attendance.objects.filter(student__school=school).count()}")
-        self.stdout.write(f"  Exam scores: {ExamScore.objects.filter(student__school=school).count()}")
+        self.stdout.write(f"  Fee transactions: {FeeTransaction.objects.filter(school=school).count()}")
+        self.stdout.write(f"  Attendance: {Attendance.objects.filter(school=school).count()}")
+        self.stdout.write(f"  Exam scores: {ExamScore.objects.filter(school=school).count()}")
         self.stdout.write(f"  Notices: {Notice.objects.filter(school=school).count()}")
         self.stdout.write(f"  Enquiries: {AdmissionEnquiry.objects.filter(school=school).count()}")
         self.stdout.write(f"  Timetable entries: {TimetableEntry.objects.filter(school=school).count()}\n")
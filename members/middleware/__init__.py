@@ -1,3 +1,6 @@
+from .metrics import MetricsMiddleware
+from .query_budget import QueryBudgetMiddleware
+from .slow_queries import SlowQueryMiddleware
 from .tenant import TenantMiddleware
 
-__all__ = ["TenantMiddleware"]
+__all__ = ["MetricsMiddleware", "QueryBudgetMiddleware", "SlowQueryMiddleware", "TenantMiddleware"]
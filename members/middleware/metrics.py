@@ -0,0 +1,49 @@
+"""
+Records latency, queries, template time and response size of each request in
+services.metrics, labelled with the school and the URL name.
+"""
+
+from __future__ import annotations
+
+import time
+
+from ..services import metrics
+
+
+class MetricsMiddleware:
+    """Goes after WhiteNoise (static files are not counted), inside QueryBudgetMiddleware."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = metrics.start_request()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            seconds = time.perf_counter() - started
+            template_seconds = metrics.finish_request(token)
+
+        match = getattr(request, "resolver_match", None)
+        view = (match.view_name if match else "") or "unresolved"
+        if view == "metrics":
+            return response
+        school = getattr(request, "school", None)
+        stats = getattr(request, "query_stats", None)
+        if response.streaming:
+            size = int(response.get("Content-Length") or 0)
+        else:
+            size = len(response.content)
+        metrics.record(
+            school.code if school else "",
+            view,
+            request.method,
+            response.status_code,
+            seconds,
+            queries=stats.queries if stats else 0,
+            db_seconds=stats.db_ms / 1000 if stats else 0.0,
+            template_seconds=template_seconds,
+            response_bytes=size,
+        )
+        return response
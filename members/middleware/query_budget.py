@@ -0,0 +1,51 @@
+"""
+Counts the queries and database time of each request (request.query_stats) and enforces
+the budgets declared with utils.query_budget.query_budget.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from ..utils.query_budget import QueryBudgetExceeded, QueryStats, get_query_budget
+
+logger = logging.getLogger("members.query_budget")
+
+
+class QueryBudgetMiddleware:
+    """Keep it first in MIDDLEWARE so session, auth and tenant queries are counted too."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = request.query_stats = QueryStats()
+        request.query_budget = None
+
+        def count(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                stats.queries += 1
+                stats.db_ms += (time.perf_counter() - started) * 1000
+
+        with connection.execute_wrapper(count):
+            response = self.get_response(request)
+
+        budget = request.query_budget
+        problem = budget.check(stats) if budget else None
+        if problem:
+            message = f"{request.method} {request.path} over its query budget: {problem}"
+            if getattr(settings, "QUERY_BUDGET_STRICT", False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = get_query_budget(view_func)
+        return None
@@ -0,0 +1,45 @@
+"""
+Times each statement of a sampled request and hands the slow ones to
+services.slow_queries. Not loaded at all unless settings.SLOW_QUERY_MS > 0.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from ..services import slow_queries
+
+
+class SlowQueryMiddleware:
+    def __init__(self, get_response):
+        self.threshold_ms = float(getattr(settings, "SLOW_QUERY_MS", 0) or 0)
+        if self.threshold_ms <= 0:
+            raise MiddlewareNotUsed
+        self.sample_rate = float(getattr(settings, "SLOW_QUERY_SAMPLE_RATE", 1.0))
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        def sample(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                ms = (time.perf_counter() - started) * 1000
+                if ms >= self.threshold_ms:
+                    school = getattr(request, "school", None)
+                    match = getattr(request, "resolver_match", None)
+                    slow_queries.record(sql, ms, school.code if school else "", match.view_name if match else "")
+
+        try:
+            with connection.execute_wrapper(sample):
+                return self.get_response(request)
+        finally:
+            slow_queries.flush_if_dirty()  # once per request, so an idle worker's samples are visible too
@@ -12,7 +12,8 @@ from django.http import Http404, HttpResponseForbidden
 from django.utils.deprecation import MiddlewareMixin
 
 from ..utils.domain import extract_subdomain
-from ..models import School, ROLE_CHOICES
+from ..utils import tenant_registry
+from ..models import ROLE_CHOICES
 
 _VALID_ROLES = frozenset(c[0] for c in ROLE_CHOICES)
 
@@ -24,11 +25,14 @@ class TenantMiddleware(MiddlewareMixin):
     - With subdomain: Sets request.school from subdomain; 404 when subdomain unknown.
     - Without subdomain (localhost): Auto-assigns first school from UserProfile for development.
     - For authenticated users: sets request.role from UserProfile.
+
+    School rows come from the process-local tenant registry, so steady-state resolution
+    issues no School queries.
     """
 
     def process_request(self, request):
         path = (request.path or "").strip("/")
-        if path.startswith("admin") or path == "health":
+        if path.startswith("admin") or path in ("health", "metrics"):
             request.school = None
             request.role = None
             return None
@@ -36,31 +40,28 @@ class TenantMiddleware(MiddlewareMixin):
         user = getattr(request, "user", None)
         is_authenticated = user and getattr(user, "is_authenticated", False)
 
-        # Case 1: No subdomain (localhost development)
         # Case 1: No subdomain (localhost development)
         if subdomain is None:
-            # Default to first school for localhost (Dev Mode)
-            first_school = School.objects.first()
-            request.school = first_school
-
-            # For authenticated users, override with their profile school if exists
+            # For authenticated users, use their profile school if a profile exists
             if is_authenticated:
                 profile = getattr(user, "userprofile", None)
                 if profile:
-                    request.school = profile.school
+                    request.school = tenant_registry.get_school_by_id(profile.school_id)
                     request.role = "OWNER" if getattr(user, "is_superuser", False) else profile.role
                     return None
                 
-                # No profile - fallback to first school (already set)
+                # No profile - fallback to first school
+                request.school = tenant_registry.get_default_school()
                 request.role = "OWNER" if getattr(user, "is_superuser", False) else None
                 return None
             
-            # Not authenticated on localhost
+            # Not authenticated on localhost: default to first school (Dev Mode)
+            request.school = tenant_registry.get_default_school()
             request.role = None
             return None
 
         # Case 2: With subdomain (production multi-tenant)
-        school = School.objects.filter(code=subdomain.lower()).first()
+        school = tenant_registry.get_school_by_code(subdomain)
         if not school:
             raise Http404("Tenant not found")
 
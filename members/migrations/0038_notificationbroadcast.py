@@ -0,0 +1,35 @@
+# Generated by Django 4.2.27 on 2026-10-18 18:57
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('members', '0037_fix_classroom_unique_constraint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationBroadcast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('message', models.TextField(blank=True)),
+                ('recipient_ids', models.JSONField(default=list, help_text='User ids to notify')),
+                ('total_recipients', models.PositiveIntegerField(default=0)),
+                ('delivered_count', models.PositiveIntegerField(default=0)),
+                ('status', models.CharField(choices=[('Queued', 'Queued'), ('Running', 'Running'), ('Done', 'Done'), ('Failed', 'Failed')], default='Queued', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='members.school')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.27 on 2026-10-18 18:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0038_notificationbroadcast'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_students', models.IntegerField(default=0)),
+                ('male_count', models.IntegerField(default=0)),
+                ('female_count', models.IntegerField(default=0)),
+                ('admissions_month', models.DateField(help_text='First day of the month new_admissions counts')),
+                ('new_admissions', models.IntegerField(default=0)),
+                ('fee_expected', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('fee_collected', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('students_on_bus', models.IntegerField(default=0)),
+                ('books_issued', models.IntegerField(default=0)),
+                ('rebuilt_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('school', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='dashboard_snapshot', to='members.school')),
+            ],
+        ),
+    ]
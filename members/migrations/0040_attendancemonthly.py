@@ -0,0 +1,32 @@
+# Generated by Django 4.2.27 on 2026-10-18 19:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0039_dashboardsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceMonthly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+                ('late', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='members.school')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_months', to='members.member')),
+            ],
+            options={
+                'verbose_name_plural': 'Attendance Monthly Rollups',
+                'indexes': [models.Index(fields=['school', 'month'], name='members_att_school__dfc617_idx')],
+                'unique_together': {('student', 'month')},
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.27 on 2026-10-18 19:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0040_attendancemonthly'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='admissionenquiry',
+            index=models.Index(fields=['school', '-created_at'], name='members_adm_school__cb0ed1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='admissionenquiry',
+            index=models.Index(fields=['school', 'status'], name='members_adm_school__462bbd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examscore',
+            index=models.Index(fields=['student', '-created_at'], name='members_exa_student_3fe4be_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feeinstallment',
+            index=models.Index(fields=['school', 'student', 'due_date'], name='members_fee_school__a12eca_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feepaymentreceipt',
+            index=models.Index(fields=['school', '-received_at'], name='members_fee_school__6f04b3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feetransaction',
+            index=models.Index(fields=['student', '-payment_date'], name='members_fee_student_c90181_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='librarytransaction',
+            index=models.Index(fields=['school', 'status'], name='members_lib_school__bc38fc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['school', 'student_class', 'firstname'], name='members_mem_school__509bb7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['school', 'firstname'], name='members_mem_school__a22b58_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['school', '-joined_date'], name='members_mem_school__9931d5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['school', 'user', '-created_at'], name='members_not_school__708630_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['school', 'user', 'read'], name='members_not_school__d90ed5_idx'),
+        ),
+    ]
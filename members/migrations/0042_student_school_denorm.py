@@ -0,0 +1,46 @@
+# Generated by Django 4.2.27 on 2026-10-18 19:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0041_tenant_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendance',
+            name='school',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='members.school'),
+        ),
+        migrations.AddField(
+            model_name='examscore',
+            name='school',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='members.school'),
+        ),
+        migrations.AddField(
+            model_name='feetransaction',
+            name='school',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='members.school'),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='school',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='members.school'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['school', '-date'], name='members_att_school__d8ac04_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examscore',
+            index=models.Index(fields=['school', '-id'], name='members_exa_school__29d586_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feetransaction',
+            index=models.Index(fields=['school', '-payment_date'], name='members_fee_school__333298_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.27 on 2026-10-18 19:34
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('members', '0042_student_school_denorm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PdfExport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('marksheet', 'Marksheets'), ('receipt', 'Fee receipts')], max_length=20)),
+                ('output', models.CharField(choices=[('zip', 'ZIP of PDFs'), ('pdf', 'One merged PDF')], default='zip', max_length=10)),
+                ('label', models.CharField(blank=True, help_text='What was selected, e.g. class and exam', max_length=200)),
+                ('object_ids', models.JSONField(default=list, help_text='ExamScore / FeeTransaction ids, in output order')),
+                ('documents', models.JSONField(default=list, help_text='[archive name, stored PDF path] per rendered document')),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('rendered_count', models.PositiveIntegerField(default=0)),
+                ('status', models.CharField(choices=[('Queued', 'Queued'), ('Running', 'Running'), ('Done', 'Done'), ('Failed', 'Failed')], default='Queued', max_length=20)),
+                ('merged_file', models.FileField(blank=True, null=True, upload_to='pdf_exports/')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='members.school')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.27 on 2026-10-18 19:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0043_pdfexport'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchoolRestore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(help_text='Backup file name', max_length=255)),
+                ('source_school_id', models.IntegerField(help_text='School id in the backup')),
+                ('lines_done', models.PositiveIntegerField(default=0)),
+                ('rows_restored', models.PositiveIntegerField(default=0)),
+                ('status', models.CharField(choices=[('Running', 'Running'), ('Done', 'Done'), ('Failed', 'Failed')], default='Running', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='restores', to='members.school')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SchoolRestoreIdMap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100)),
+                ('old_id', models.BigIntegerField()),
+                ('new_id', models.BigIntegerField()),
+                ('restore', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='id_maps', to='members.schoolrestore')),
+            ],
+            options={
+                'unique_together': {('restore', 'model', 'old_id')},
+            },
+        ),
+    ]
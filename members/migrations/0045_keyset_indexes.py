@@ -0,0 +1,29 @@
+# Generated by Django 4.2.27 on 2026-10-18 19:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0044_school_restore'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='attendance',
+            name='members_att_school__d8ac04_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='member',
+            name='members_mem_school__a22b58_idx',
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['school', '-date', 'id'], name='members_att_school__4597f4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['school', 'firstname', 'id'], name='members_mem_school__49527e_idx'),
+        ),
+    ]
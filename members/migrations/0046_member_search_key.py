@@ -0,0 +1,66 @@
+import re
+import unicodedata
+
+from django.db import migrations, models, transaction
+
+
+def _search_text(*parts):
+    text = unicodedata.normalize("NFKD", " ".join(str(p) for p in parts if p))
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return " ".join(re.split(r"[^0-9a-z]+", text)).strip()
+
+
+def backfill_search_key(apps, schema_editor):
+    Member = apps.get_model("members", "Member")
+    last_pk = 0
+    while True:
+        batch = list(Member.objects.filter(pk__gt=last_pk).order_by("pk").only("id", "firstname", "lastname", "admission_no")[:2000])
+        if not batch:
+            return
+        for m in batch:
+            m.search_key = _search_text(m.firstname, m.lastname, m.admission_no)
+        Member.objects.bulk_update(batch, ["search_key"])
+        last_pk = batch[-1].pk
+
+
+def create_search_indexes(apps, schema_editor):
+    """PostgreSQL: trigram index for substring matches, pattern-ops index for prefix matches."""
+    if schema_editor.connection.vendor != "postgresql":
+        return  # other databases use the in-memory prefix index in services.student_search
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS members_member_search_prefix "
+        "ON members_member (school_id, search_key varchar_pattern_ops)"
+    )
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias), schema_editor.connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except Exception:
+        return  # no permission to add the extension: prefix index only
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS members_member_search_trgm "
+        "ON members_member USING gin (search_key gin_trgm_ops)"
+    )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS members_member_search_trgm")
+    schema_editor.execute("DROP INDEX IF EXISTS members_member_search_prefix")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0045_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='member',
+            name='search_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=400),
+        ),
+        migrations.RunPython(backfill_search_key, migrations.RunPython.noop),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.27 on 2026-10-18 19:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0046_member_search_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MemberProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('medical_conditions', models.TextField(blank=True, null=True)),
+                ('mother_name', models.CharField(blank=True, max_length=100, null=True)),
+                ('mother_mobile', models.CharField(blank=True, max_length=15, null=True)),
+                ('mother_occupation', models.CharField(blank=True, max_length=100, null=True)),
+                ('father_occupation', models.CharField(blank=True, max_length=100, null=True)),
+                ('caste_category', models.CharField(blank=True, choices=[('General', 'General'), ('OBC', 'OBC'), ('SC', 'SC'), ('ST', 'ST'), ('EWS', 'EWS')], default='General', max_length=20)),
+                ('religion', models.CharField(blank=True, max_length=50, null=True)),
+                ('nationality', models.CharField(blank=True, default='Indian', max_length=50)),
+                ('previous_school', models.CharField(blank=True, max_length=200, null=True)),
+                ('previous_class', models.CharField(blank=True, help_text='Last class attended', max_length=50, null=True)),
+                ('tc_number', models.CharField(blank=True, help_text='Transfer Certificate number', max_length=50, null=True)),
+                ('emergency_contact_person', models.CharField(blank=True, max_length=100, null=True)),
+                ('emergency_phone', models.CharField(blank=True, max_length=15, null=True)),
+                ('emergency_relationship', models.CharField(blank=True, help_text='Relationship with student', max_length=50, null=True)),
+                ('whatsapp_number', models.CharField(blank=True, max_length=15, null=True)),
+                ('known_allergies', models.TextField(blank=True, help_text='Food, medicine, or other allergies', null=True)),
+                ('chronic_conditions', models.TextField(blank=True, help_text='Diabetes, Asthma, etc.', null=True)),
+                ('vaccination_status', models.CharField(blank=True, help_text='COVID-19, MMR, etc.', max_length=100, null=True)),
+                ('family_doctor_name', models.CharField(blank=True, max_length=100, null=True)),
+                ('family_doctor_phone', models.CharField(blank=True, max_length=15, null=True)),
+                ('special_needs', models.TextField(blank=True, help_text='Physical or learning disabilities', null=True)),
+                ('annual_income', models.DecimalField(blank=True, decimal_places=2, help_text='Annual family income', max_digits=10, null=True)),
+                ('parent_education', models.CharField(blank=True, help_text='Highest education of parents', max_length=100, null=True)),
+                ('guardian_name', models.CharField(blank=True, max_length=100, null=True)),
+                ('guardian_relationship', models.CharField(blank=True, help_text='Grandparent, Uncle, etc.', max_length=50, null=True)),
+                ('guardian_contact', models.CharField(blank=True, max_length=15, null=True)),
+                ('birth_certificate', models.FileField(blank=True, null=True, upload_to='documents/birth_certificates/')),
+                ('aadhaar_card', models.FileField(blank=True, null=True, upload_to='documents/aadhaar/')),
+                ('transfer_certificate', models.FileField(blank=True, null=True, upload_to='documents/tc/')),
+                ('previous_marksheet', models.FileField(blank=True, null=True, upload_to='documents/marksheets/')),
+                ('photo_id', models.FileField(blank=True, null=True, upload_to='documents/photo_ids/')),
+                ('sibling_in_school', models.BooleanField(default=False, help_text='Does student have siblings in this school?')),
+                ('sibling_details', models.TextField(blank=True, help_text='Name, Class, Admission No of siblings', null=True)),
+                ('alternate_email', models.EmailField(blank=True, max_length=254, null=True)),
+                ('permanent_address', models.TextField(blank=True, help_text='If different from current address', null=True)),
+                ('terms_consent', models.BooleanField(default=False, help_text='Agreement to school terms and conditions')),
+                ('photo_permission', models.BooleanField(default=False, help_text='Permission to use photos/videos')),
+                ('communication_consent', models.BooleanField(default=True, help_text='Consent for SMS/Email notifications')),
+                ('member', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='profile', to='members.member')),
+            ],
+        ),
+    ]
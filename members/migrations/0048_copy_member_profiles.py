@@ -0,0 +1,51 @@
+from django.db import migrations
+
+BATCH_SIZE = 2000
+
+
+def _profile_fields(apps):
+    MemberProfile = apps.get_model("members", "MemberProfile")
+    return [f.attname for f in MemberProfile._meta.concrete_fields if f.name not in ("id", "member")]
+
+
+def copy_to_profiles(apps, schema_editor):
+    Member = apps.get_model("members", "Member")
+    MemberProfile = apps.get_model("members", "MemberProfile")
+    fields = _profile_fields(apps)
+    last_pk = 0
+    while True:
+        rows = list(Member.objects.filter(pk__gt=last_pk).order_by("pk").values("pk", *fields)[:BATCH_SIZE])
+        if not rows:
+            return
+        last_pk = rows[-1]["pk"]
+        MemberProfile.objects.bulk_create([MemberProfile(member_id=row.pop("pk"), **row) for row in rows])
+
+
+def copy_back(apps, schema_editor):
+    Member = apps.get_model("members", "Member")
+    MemberProfile = apps.get_model("members", "MemberProfile")
+    fields = _profile_fields(apps)
+    last_pk = 0
+    while True:
+        profiles = list(MemberProfile.objects.filter(pk__gt=last_pk).order_by("pk")[:BATCH_SIZE])
+        if not profiles:
+            return
+        members = []
+        for p in profiles:
+            m = Member(pk=p.member_id)
+            for name in fields:
+                setattr(m, name, getattr(p, name))
+            members.append(m)
+        Member.objects.bulk_update(members, fields)
+        last_pk = profiles[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0047_member_profile'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_to_profiles, copy_back),
+    ]
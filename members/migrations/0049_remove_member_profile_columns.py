@@ -0,0 +1,162 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0048_copy_member_profiles'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='member',
+            name='aadhaar_card',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='alternate_email',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='annual_income',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='birth_certificate',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='caste_category',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='chronic_conditions',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='communication_consent',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='emergency_contact_person',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='emergency_phone',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='emergency_relationship',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='family_doctor_name',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='family_doctor_phone',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='father_occupation',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='guardian_contact',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='guardian_name',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='guardian_relationship',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='known_allergies',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='medical_conditions',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='mother_mobile',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='mother_name',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='mother_occupation',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='nationality',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='parent_education',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='permanent_address',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='photo_id',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='photo_permission',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='previous_class',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='previous_marksheet',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='previous_school',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='religion',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='sibling_details',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='sibling_in_school',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='special_needs',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='tc_number',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='terms_consent',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='transfer_certificate',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='vaccination_status',
+        ),
+        migrations.RemoveField(
+            model_name='member',
+            name='whatsapp_number',
+        ),    ]
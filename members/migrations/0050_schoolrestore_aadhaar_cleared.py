@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-18 20:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0049_remove_member_profile_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schoolrestore',
+            name='aadhaar_cleared',
+            field=models.JSONField(blank=True, default=list, help_text='Restored member ids whose Aadhaar number another student already had'),
+        ),
+    ]
@@ -1,5 +1,8 @@
+import re
+import unicodedata
 import uuid
 from datetime import date
+from typing import NamedTuple
 from django.db import models
 from django.utils import timezone
 from django.contrib.auth.models import User
@@ -71,6 +74,65 @@ class ClassRoom(models.Model):
 # 2. STUDENT MODULE
 # ==========================================
 
+def search_text(*parts) -> str:
+    """Lower-case, accent-free words of parts joined by single spaces (the form search keys and queries share)."""
+    text = unicodedata.normalize("NFKD", " ".join(str(p) for p in parts if p))
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return " ".join(re.split(r"[^0-9a-z]+", text)).strip()
+
+
+class MemberRow(NamedTuple):
+    """A student as pickers show it: read from values_list, no model instance built."""
+    id: int
+    firstname: str
+    lastname: str
+    admission_no: str | None
+    class_name: str | None
+    class_section: str | None
+
+    @property
+    def student_class(self) -> str:
+        return f"{self.class_name} - {self.class_section}" if self.class_name else ""
+
+    def __str__(self):
+        return f"{self.firstname} {self.lastname}"
+
+
+class MemberQuerySet(models.QuerySet):
+    """
+    Projections for screens that show many students. Member has 60+ columns (text blobs,
+    five file fields); list and picker screens need a handful of them.
+    """
+
+    # Columns the student lists read (name, class, contact, fee summary).
+    LIST_FIELDS = (
+        "id", "school_id", "admission_no", "firstname", "lastname", "roll_number", "gender",
+        "father_name", "mobile_number", "fee_total", "fee_paid",
+        "student_class__id", "student_class__name", "student_class__section",
+    )
+
+    def for_list(self, *extra):
+        """Member instances with only the list columns loaded (others load on access, one query each)."""
+        return self.select_related("student_class").only(*self.LIST_FIELDS, *extra)
+
+    @classmethod
+    def related_defer(cls, path: str) -> list:
+        """
+        defer() arguments that leave only the id and names of the Member reached through
+        path, for rows that select_related a student just to print its name:
+        LibraryTransaction.objects.select_related("student").defer(*MemberQuerySet.related_defer("student"))
+        """
+        keep = {"id", "firstname", "lastname"}
+        return [f"{path}__{f.name}" for f in Member._meta.concrete_fields if f.name not in keep]
+
+    def for_picker(self) -> list:
+        """MemberRow tuples (id, names, admission no, class) ordered by name, for <select> options."""
+        rows = self.order_by("firstname", "lastname", "id").values_list(
+            "id", "firstname", "lastname", "admission_no", "student_class__name", "student_class__section"
+        )
+        return [MemberRow(*row) for row in rows]
+
+
 class Member(models.Model):
     school = models.ForeignKey(School, on_delete=models.CASCADE, null=True, blank=True)
     admission_no = models.CharField(max_length=50, null=True, blank=True)
@@ -89,7 +151,6 @@ class Member(models.Model):
     
     # Extra Fields
     blood_group = models.CharField(max_length=5, null=True, blank=True)
-    medical_conditions = models.TextField(null=True, blank=True)
     transport_mode = models.CharField(max_length=20, null=True, blank=True)
     route_name = models.CharField(max_length=100, null=True, blank=True)
     house_team = models.CharField(max_length=20, null=True, blank=True)
@@ -99,7 +160,65 @@ class Member(models.Model):
     fee_total = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     fee_paid = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     
-    # ========== PHASE 1: CRITICAL ADMISSION FIELDS (15 fields) ==========
+    # Government identity (unique; checked on every admission and import)
+    aadhaar_number = models.CharField(max_length=12, blank=True, null=True, unique=True, help_text="12-digit Aadhaar number")
+
+    # Admission, medical, document, consent and family details live in MemberProfile
+    # (one row per student, read on the profile / admission screens only). The old attribute
+    # names still work on Member instances: see PROFILE_FIELDS below.
+
+    # Normalized "firstname lastname admission_no" for the student search API; kept by save().
+    # Trigram / prefix indexes on it are created on PostgreSQL only (migration 0046).
+    search_key = models.CharField(max_length=400, blank=True, default="", editable=False)
+
+    objects = MemberQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Class registers / lists: school + class, ordered by name
+            models.Index(fields=['school', 'student_class', 'firstname']),
+            # Whole-school lists ordered by name (id breaks ties for keyset pages)
+            models.Index(fields=['school', 'firstname', 'id']),
+            # Recent admissions on the dashboard
+            models.Index(fields=['school', '-joined_date']),
+        ]
+
+    def __str__(self):
+        return f"{self.firstname} {self.lastname}"
+
+    def save(self, *args, **kwargs):
+        self.search_key = search_text(self.firstname, self.lastname, self.admission_no)
+        update_fields = kwargs.get("update_fields")
+        save_profile = getattr(self, "_profile_dirty", False)
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            save_profile = save_profile and bool(update_fields & set(PROFILE_FIELDS))
+            update_fields -= set(PROFILE_FIELDS)
+            if {"firstname", "lastname", "admission_no"} & update_fields:
+                update_fields.add("search_key")
+            kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
+        if save_profile:
+            self.profile.member = self
+            self.profile.save()
+            self._profile_dirty = False
+
+    def profile_or_new(self) -> "MemberProfile":
+        """The student's MemberProfile; an unsaved blank one (all defaults) if there is none yet."""
+        try:
+            return self.profile
+        except MemberProfile.DoesNotExist:
+            self.profile = MemberProfile(member=self)
+            return self.profile
+
+
+class MemberProfile(models.Model):
+    """Rarely read student details, split off Member so the hot row stays narrow."""
+    member = models.OneToOneField(Member, on_delete=models.CASCADE, related_name="profile")
+
+    medical_conditions = models.TextField(null=True, blank=True)
+
+    # ========== PHASE 1: ADMISSION FIELDS ==========
     # Mother's Information (3 fields)
     mother_name = models.CharField(max_length=100, blank=True, null=True)
     mother_mobile = models.CharField(max_length=15, blank=True, null=True)
@@ -108,8 +227,7 @@ class Member(models.Model):
     # Father's Additional Info (1 field)
     father_occupation = models.CharField(max_length=100, blank=True, null=True)
     
-    # Government & Identity (4 fields)
-    aadhaar_number = models.CharField(max_length=12, blank=True, null=True, unique=True, help_text="12-digit Aadhaar number")
+    # Government & Identity (3 fields)
     caste_category = models.CharField(max_length=20, choices=[
         ('General', 'General'),
         ('OBC', 'OBC'),
@@ -171,8 +289,26 @@ class Member(models.Model):
     photo_permission = models.BooleanField(default=False, help_text="Permission to use photos/videos")
     communication_consent = models.BooleanField(default=True, help_text="Consent for SMS/Email notifications")
 
-    def __str__(self):
-        return f"{self.firstname} {self.lastname}"
+
+# Member attributes that read / write the MemberProfile row (member.mother_name etc.).
+PROFILE_FIELDS = tuple(f.name for f in MemberProfile._meta.concrete_fields if f.name not in ("id", "member"))
+
+
+def _profile_attribute(name):
+    def fget(self):
+        return getattr(self.profile_or_new(), name)
+
+    def fset(self, value):
+        profile = self.profile_or_new()
+        if getattr(profile, name) != value:
+            setattr(profile, name, value)
+            self._profile_dirty = True  # written by the next Member.save()
+
+    return property(fget, fset)
+
+
+for _name in PROFILE_FIELDS:
+    setattr(Member, _name, _profile_attribute(_name))
 
 # ==========================================
 # 3. CORE UTILITIES
@@ -236,6 +372,9 @@ class LibraryTransaction(models.Model):
     fine_amount = models.DecimalField(max_digits=6, decimal_places=2, default=0)
     status = models.CharField(max_length=20, default='Issued')
 
+    class Meta:
+        indexes = [models.Index(fields=['school', 'status'])]
+
     def __str__(self):
         return f"{self.student.firstname} - {self.book.title}"
 
@@ -328,6 +467,28 @@ class ExamType(models.Model):
         return self.name
 
 
+# --- Dashboard snapshot ---
+
+
+class DashboardSnapshot(models.Model):
+    """Per-school owner dashboard counters; kept current by members.services.dashboard."""
+    school = models.OneToOneField(School, on_delete=models.CASCADE, related_name="dashboard_snapshot")
+    total_students = models.IntegerField(default=0)
+    male_count = models.IntegerField(default=0)
+    female_count = models.IntegerField(default=0)
+    admissions_month = models.DateField(help_text="First day of the month new_admissions counts")
+    new_admissions = models.IntegerField(default=0)
+    fee_expected = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    fee_collected = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    students_on_bus = models.IntegerField(default=0)
+    books_issued = models.IntegerField(default=0)
+    rebuilt_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Dashboard snapshot ({self.school_id})"
+
+
 # --- Notifications (Phase 2.4) ---
 
 
@@ -341,11 +502,65 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Navbar summary: one user's rows in one school, newest first; unread filter
+            models.Index(fields=["school", "user", "-created_at"]),
+            models.Index(fields=["school", "user", "read"]),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.user.username})"
 
 
+class NotificationBroadcast(models.Model):
+    """One notification_send fan-out; recipients are written in chunks, progress is pollable."""
+    STATUSES = [("Queued", "Queued"), ("Running", "Running"), ("Done", "Done"), ("Failed", "Failed")]
+
+    school = models.ForeignKey(School, on_delete=models.CASCADE)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    title = models.CharField(max_length=200)
+    message = models.TextField(blank=True)
+    recipient_ids = models.JSONField(default=list, help_text="User ids to notify")
+    total_recipients = models.PositiveIntegerField(default=0)
+    delivered_count = models.PositiveIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUSES, default="Queued")
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.title} -> {self.total_recipients} ({self.status})"
+
+
+class PdfExport(models.Model):
+    """One batch download of many marksheets or receipts; documents render in chunks, progress is pollable."""
+    STATUSES = [("Queued", "Queued"), ("Running", "Running"), ("Done", "Done"), ("Failed", "Failed")]
+    KINDS = [("marksheet", "Marksheets"), ("receipt", "Fee receipts")]
+    OUTPUTS = [("zip", "ZIP of PDFs"), ("pdf", "One merged PDF")]
+
+    school = models.ForeignKey(School, on_delete=models.CASCADE)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    kind = models.CharField(max_length=20, choices=KINDS)
+    output = models.CharField(max_length=10, choices=OUTPUTS, default="zip")
+    label = models.CharField(max_length=200, blank=True, help_text="What was selected, e.g. class and exam")
+    object_ids = models.JSONField(default=list, help_text="ExamScore / FeeTransaction ids, in output order")
+    documents = models.JSONField(default=list, help_text="[archive name, stored PDF path] per rendered document")
+    total = models.PositiveIntegerField(default=0)
+    rendered_count = models.PositiveIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUSES, default="Queued")
+    merged_file = models.FileField(upload_to="pdf_exports/", null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.label} ({self.rendered_count}/{self.total}, {self.status})"
+
+
 # --- Admission Enquiry / CRM (Phase 2.2) ---
 
 
@@ -370,6 +585,10 @@ class AdmissionEnquiry(models.Model):
     class Meta:
         ordering = ["-created_at"]
         verbose_name_plural = "Admission enquiries"
+        indexes = [
+            models.Index(fields=["school", "-created_at"]),
+            models.Index(fields=["school", "status"]),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.status})"
@@ -410,8 +629,23 @@ class TimetableEntry(models.Model):
         return f"{self.class_room} {self.get_day_of_week_display()} {self.time_slot} - {self.subject}"
 
 
-class ExamScore(models.Model):
+class StudentSchoolMixin:
+    """
+    For student-owned rows that carry a denormalized copy of the student's school so
+    tenant-scoped lists can filter on an indexed column instead of joining Member.
+    save() keeps it in step with the student; bulk_create callers must set school_id
+    themselves (backfill_student_school repairs older rows).
+    """
+
+    def save(self, *args, **kwargs):
+        if self.student_id:
+            self.school_id = self.student.school_id
+        super().save(*args, **kwargs)
+
+
+class ExamScore(StudentSchoolMixin, models.Model):
     student = models.ForeignKey(Member, on_delete=models.CASCADE)
+    school = models.ForeignKey(School, on_delete=models.CASCADE, null=True, blank=True, editable=False)
     exam_name = models.CharField(max_length=100)
     exam_type = models.ForeignKey(ExamType, on_delete=models.SET_NULL, null=True, blank=True)
     maths = models.IntegerField(default=0)
@@ -423,15 +657,43 @@ class ExamScore(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     generated_report = models.FileField(upload_to='reports/', null=True, blank=True)
 
-class Attendance(models.Model):
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', '-created_at']),
+            models.Index(fields=['school', '-id']),
+        ]
+
+class Attendance(StudentSchoolMixin, models.Model):
     student = models.ForeignKey(Member, on_delete=models.CASCADE)
+    school = models.ForeignKey(School, on_delete=models.CASCADE, null=True, blank=True, editable=False)
     date = models.DateField()
     status = models.CharField(max_length=10)
     
     class Meta:
         unique_together = ('student', 'date')
+        # Newest first, id as the keyset tie-breaker for attendance history pages
+        indexes = [models.Index(fields=['school', '-date', 'id'])]
         verbose_name_plural = 'Attendance Records'
 
+
+class AttendanceMonthly(models.Model):
+    """Per-student, per-month attendance counts rolled up from Attendance (see services.attendance)."""
+    school = models.ForeignKey(School, on_delete=models.CASCADE)
+    student = models.ForeignKey(Member, on_delete=models.CASCADE, related_name='attendance_months')
+    month = models.DateField(help_text="First day of the month")
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    late = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('student', 'month')
+        indexes = [models.Index(fields=['school', 'month'])]
+        verbose_name_plural = 'Attendance Monthly Rollups'
+
+    def __str__(self):
+        return f"{self.student_id} {self.month:%Y-%m}: {self.present}/{self.total}"
+
 class Notice(models.Model):
     school = models.ForeignKey(School, on_delete=models.CASCADE, null=True, blank=True)
     title = models.CharField(max_length=200)
@@ -455,8 +717,9 @@ class StudyMaterial(models.Model):
     def __str__(self):
         return f"{self.title} ({self.subject} - {self.class_name})"
 
-class Payment(models.Model): # Legacy
+class Payment(StudentSchoolMixin, models.Model): # Legacy
     student = models.ForeignKey(Member, on_delete=models.CASCADE)
+    school = models.ForeignKey(School, on_delete=models.CASCADE, null=True, blank=True, editable=False)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     date = models.DateField(auto_now_add=True)
 
@@ -499,14 +762,21 @@ class SalaryTransaction(models.Model):
 # - Aligned to migrations 0019+ (month_year/status, no receipt_number column)
 # ==========================================
 
-class FeeTransaction(models.Model):
+class FeeTransaction(StudentSchoolMixin, models.Model):
     student = models.ForeignKey(Member, on_delete=models.CASCADE)
+    school = models.ForeignKey(School, on_delete=models.CASCADE, null=True, blank=True, editable=False)
     amount_paid = models.DecimalField(max_digits=10, decimal_places=2)
     month_year = models.CharField(max_length=20) # e.g., "January 2026"
     payment_date = models.DateField(auto_now_add=True)
     payment_mode = models.CharField(max_length=50)
     status = models.CharField(max_length=20, default='Paid') # Paid, Partial, Unpaid
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', '-payment_date']),
+            models.Index(fields=['school', '-payment_date']),
+        ]
+
     def __str__(self):
         return f"{self.student.firstname} - ₹{self.amount_paid} ({self.payment_mode})"
 
@@ -577,6 +847,7 @@ class FeeInstallment(models.Model):
 
     class Meta:
         unique_together = ('school', 'student', 'academic_year', 'quarter')
+        indexes = [models.Index(fields=['school', 'student', 'due_date'])]
 
     @property
     def net_due(self):
@@ -608,6 +879,9 @@ class FeePaymentReceipt(models.Model):
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
     legacy_fee_transaction = models.OneToOneField(FeeTransaction, on_delete=models.SET_NULL, null=True, blank=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['school', '-received_at'])]
+
     def __str__(self):
         return f"{self.student.firstname} - ₹{self.amount} ({self.mode})"
 
@@ -627,4 +901,38 @@ class FeeRefund(models.Model):
     reason = models.CharField(max_length=255, blank=True)
     status = models.CharField(max_length=20, choices=STATUSES, default='Initiated')
     processed_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    created_at = models.DateTimeField(auto_now_add=True)
+
+# ==========================================
+# 💾 BACKUP / RESTORE
+# ==========================================
+
+class SchoolRestore(models.Model):
+    """One run of restore_school; lines_done and the id map commit with each batch, so a re-run resumes."""
+    STATUSES = [("Running", "Running"), ("Done", "Done"), ("Failed", "Failed")]
+
+    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name="restores")
+    source = models.CharField(max_length=255, help_text="Backup file name")
+    source_school_id = models.IntegerField(help_text="School id in the backup")
+    lines_done = models.PositiveIntegerField(default=0)
+    rows_restored = models.PositiveIntegerField(default=0)
+    aadhaar_cleared = models.JSONField(
+        default=list, blank=True, help_text="Restored member ids whose Aadhaar number another student already had"
+    )
+    status = models.CharField(max_length=20, choices=STATUSES, default="Running")
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.source} -> {self.school_id} ({self.status})"
+
+
+class SchoolRestoreIdMap(models.Model):
+    """Backup id -> restored id for one model of one restore (dropped when the restore finishes)."""
+    restore = models.ForeignKey(SchoolRestore, on_delete=models.CASCADE, related_name="id_maps")
+    model = models.CharField(max_length=100)
+    old_id = models.BigIntegerField()
+    new_id = models.BigIntegerField()
+
+    class Meta:
+        unique_together = ("restore", "model", "old_id")
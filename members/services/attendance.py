@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ..models import Attendance, AttendanceMonthly, Member
+from ..utils.aggregates import count_buckets
+
+STATUSES = ("Present", "Absent", "Late")
+ROLLUP_FIELDS = ("present", "absent", "late", "total")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _month_range(month: date) -> tuple[date, date]:
+    start = month_start(month)
+    end = date(start.year + (start.month == 12), start.month % 12 + 1, 1)
+    return start, end
+
+
+@dataclass(frozen=True)
+class AttendanceSaveResult:
+    created: int
+    updated: int
+    unchanged: int
+    skipped: list  # student ids not in this school/class, or with an unknown status
+
+
+class AttendanceService:
+    @staticmethod
+    def save_day(school_id: int, day: date, statuses: dict, class_id: int | None = None) -> AttendanceSaveResult:
+        """
+        Record one day's attendance for many students (typically a whole class) at once.
+
+        statuses maps student id -> "Present" / "Absent" / "Late". Students outside the
+        school (or class, when given) and unknown statuses are skipped. Existing rows are
+        read once and diffed; new rows go in with one bulk INSERT (upserting on
+        (student, date) in case a concurrent submit got there first), changed rows with
+        one bulk UPDATE, all in one transaction.
+        """
+        wanted = {}
+        skipped = []
+        for raw_id, status in statuses.items():
+            try:
+                student_id = int(raw_id)
+            except (TypeError, ValueError):
+                skipped.append(raw_id)
+                continue
+            if status in STATUSES:
+                wanted[student_id] = status
+            else:
+                skipped.append(student_id)
+
+        students = Member.objects.filter(school_id=school_id, id__in=list(wanted))
+        if class_id is not None:
+            students = students.filter(student_class_id=class_id)
+        valid_ids = set(students.values_list("id", flat=True))
+        skipped.extend(sid for sid in wanted if sid not in valid_ids)
+        wanted = {sid: status for sid, status in wanted.items() if sid in valid_ids}
+
+        with transaction.atomic():
+            existing = {
+                row.student_id: row
+                for row in Attendance.objects.filter(student_id__in=list(wanted), date=day).only("id", "student_id", "status")
+            }
+            to_create = [
+                Attendance(student_id=sid, school_id=school_id, date=day, status=status)
+                for sid, status in wanted.items()
+                if sid not in existing
+            ]
+            to_update = []
+            for sid, row in existing.items():
+                if row.status != wanted[sid]:
+                    row.status = wanted[sid]
+                    to_update.append(row)
+            if to_create:
+                Attendance.objects.bulk_create(
+                    to_create,
+                    update_conflicts=True,
+                    unique_fields=["student", "date"],
+                    update_fields=["status", "school"],
+                )
+            if to_update:
+                Attendance.objects.bulk_update(to_update, ["status"])
+            if to_create or to_update:
+                changed = [row.student_id for row in to_create] + [row.student_id for row in to_update]
+                AttendanceService.rebuild_rollups(school_id, student_ids=changed, months=[day])
+
+        return AttendanceSaveResult(
+            created=len(to_create),
+            updated=len(to_update),
+            unchanged=len(existing) - len(to_update),
+            skipped=skipped,
+        )
+
+    @staticmethod
+    def rebuild_rollups(school_id: int, student_ids=None, months=None) -> int:
+        """
+        Recompute AttendanceMonthly rows from Attendance for one school, optionally limited
+        to some students and/or months (any date within the month). Returns rows written.
+        """
+        source = Attendance.objects.filter(school_id=school_id)
+        scope = AttendanceMonthly.objects.filter(school_id=school_id)
+        if student_ids is not None:
+            student_ids = list(student_ids)
+            source = source.filter(student_id__in=student_ids)
+            scope = scope.filter(student_id__in=student_ids)
+        if months is not None:
+            month_starts = sorted({month_start(m) for m in months})
+            date_q = Q()
+            for m in month_starts:
+                start, end = _month_range(m)
+                date_q |= Q(date__gte=start, date__lt=end)
+            source = source.filter(date_q)
+            scope = scope.filter(month__in=month_starts)
+
+        counts = count_buckets(
+            source.annotate(month=TruncMonth("date")),
+            group_by=("student_id", "month"),
+            present=Q(status="Present"),
+            absent=Q(status="Absent"),
+            late=Q(status="Late"),
+            total=None,
+        )
+        rows = [
+            AttendanceMonthly(school_id=school_id, student_id=student_id, month=month, **values)
+            for (student_id, month), values in counts.items()
+        ]
+        with transaction.atomic():
+            scope.delete()
+            AttendanceMonthly.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+    @staticmethod
+    def totals(student_ids, since: date | None = None) -> dict:
+        """{student_id: {"present", "absent", "late", "total"}} summed from the monthly rollup."""
+        qs = AttendanceMonthly.objects.filter(student_id__in=list(student_ids))
+        if since is not None:
+            qs = qs.filter(month__gte=month_start(since))
+        rows = qs.order_by().values("student_id").annotate(**{f: Sum(f) for f in ROLLUP_FIELDS})
+        return {row["student_id"]: {f: row[f] or 0 for f in ROLLUP_FIELDS} for row in rows}
+
+    @staticmethod
+    def class_month_summary(school_id: int, class_id: int, month: date) -> list:
+        """One rollup row per student of the class for the month (zeros when unmarked)."""
+        students = Member.objects.filter(school_id=school_id, student_class_id=class_id).order_by("firstname", "id")
+        rollups = {
+            r.student_id: r
+            for r in AttendanceMonthly.objects.filter(school_id=school_id, month=month_start(month), student__in=students)
+        }
+        summary = []
+        for student in students.only("id", "firstname", "lastname", "roll_number"):
+            r = rollups.get(student.id)
+            summary.append({"student": student, **{f: getattr(r, f) if r else 0 for f in ROLLUP_FIELDS}})
+        return summary
+
+
+def _as_date(value) -> date:
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+# Single-row writes (admin, scripts) keep the rollup current here; save_day and bulk
+# paths rebuild it themselves, since bulk_create/bulk_update send no signals.
+@receiver(post_save, sender=Attendance)
+def _attendance_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance.school_id:
+        AttendanceService.rebuild_rollups(instance.school_id, student_ids=[instance.student_id], months=[_as_date(instance.date)])
+
+
+@receiver(post_delete, sender=Attendance)
+def _attendance_deleted(sender, instance, **kwargs):
+    # Decrement rather than rebuild: during a Member cascade the rollup rows (and the
+    # student) are being deleted too, and must not be re-inserted.
+    field = {"Present": "present", "Absent": "absent", "Late": "late"}.get(instance.status)
+    changes = {"total": F("total") - 1}
+    guard = {"total__gt": 0}
+    if field:
+        changes[field] = F(field) - 1
+        guard[f"{field}__gt"] = 0
+    AttendanceMonthly.objects.filter(
+        student_id=instance.student_id, month=month_start(_as_date(instance.date)), **guard
+    ).update(**changes)
@@ -0,0 +1,318 @@
+"""
+Streaming school backup (NDJSON, optionally gzip) and batched restore with id remapping.
+
+Backup format, one JSON object per line:
+
+    {"format": "school-backup", "version": 1, "school": {...School fields}}
+    {"model": "members.member", "pk": 12, "fields": {"school_id": 3, "student_class_id": 7, ...}}
+    ...
+    {"end": true}
+
+Models are written in BACKUP_MODELS order (every foreign key points to an earlier
+model), each walked in primary-key order in chunks, so memory stays flat however big the
+school is. A backup can be continued after (model, pk) of the last line received.
+
+Not included: user accounts and profiles, notifications, PDF exports, and the derived
+tables (DashboardSnapshot, AttendanceMonthly), which are rebuilt after a restore.
+Uploaded files are referenced by path only. References to users (created_by,
+processed_by) are cleared on restore, since user ids differ between databases.
+
+Restore creates a new School and bulk-loads each model in batches. Every batch inserts its
+rows, records backup id -> new id in SchoolRestoreIdMap and advances SchoolRestore.lines_done
+in one transaction, so an interrupted restore resumes exactly where it stopped.
+
+Aadhaar numbers are unique across the whole database, so a school restored next to its
+original (under a new code) cannot keep them: numbers that another student already has
+are cleared, and the restored members concerned are listed in SchoolRestore.aadhaar_cleared.
+"""
+
+from __future__ import annotations
+
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.utils import timezone
+
+from ..models import (
+    AcademicYear, Attendance, Book, ClassRoom, ExamScore, ExamType, Expense, FeeDiscount,
+    FeeInstallment, FeePaymentAllocation, FeePaymentReceipt, FeeRefund, FeeStructure,
+    FeeTransaction, LateFeePolicy, LibraryTransaction, Member, Notice, Payment, SalaryTransaction,
+    MemberProfile, School, SchoolRestore, SchoolRestoreIdMap, Staff, StudentConcession, StudentTransport,
+    StudyMaterial, Subject, TimeSlot, TimetableEntry, TransportRoute, TransportStop, TransportZone,
+    AdmissionEnquiry,
+)
+
+FORMAT = "school-backup"
+VERSION = 2
+READ_VERSIONS = (1, 2)  # version 1 kept the MemberProfile columns on the member lines
+CHUNK_SIZE = 2000
+RESTORE_BATCH_SIZE = 1000
+
+# (model, lookup that scopes it to one school), parents before children.
+BACKUP_MODELS = [
+    (AcademicYear, "school"),
+    (ClassRoom, "school"),
+    (Member, "school"),
+    (MemberProfile, "member__school"),
+    (Book, "school"),
+    (LibraryTransaction, "school"),
+    (TransportRoute, "school"),
+    (TransportZone, "school"),
+    (TransportStop, "school"),
+    (StudentTransport, "school"),
+    (Staff, "school"),
+    (Subject, "school"),
+    (ExamType, "school"),
+    (Notice, "school"),
+    (Expense, "school"),
+    (StudyMaterial, "school"),
+    (AdmissionEnquiry, "school"),
+    (TimeSlot, "school"),
+    (TimetableEntry, "school"),
+    (ExamScore, "school"),
+    (Attendance, "school"),
+    (Payment, "school"),
+    (FeeStructure, "school"),
+    (SalaryTransaction, "school"),
+    (FeeTransaction, "school"),
+    (LateFeePolicy, "school"),
+    (FeeDiscount, "school"),
+    (StudentConcession, "school"),
+    (FeeInstallment, "school"),
+    (FeePaymentReceipt, "school"),
+    (FeePaymentAllocation, "receipt__school"),
+    (FeeRefund, "school"),
+]
+MODELS_BY_LABEL = {m._meta.label_lower: m for m, _ in BACKUP_MODELS}
+SCHOOL_FIELDS = [f.attname for f in School._meta.concrete_fields if not f.primary_key and f.name != "super_admin"]
+
+
+def _fields(model):
+    return [f for f in model._meta.concrete_fields if not f.primary_key]
+
+
+def _encode(record) -> bytes:
+    return (json.dumps(record, cls=DjangoJSONEncoder, separators=(",", ":")) + "\n").encode()
+
+
+class BackupService:
+    @staticmethod
+    def iter_records(school, chunk_size: int = CHUNK_SIZE, after: tuple | None = None):
+        """
+        Yield the backup records of one school. after=(model label, pk) skips everything up
+        to and including that row (header included), to continue an interrupted backup.
+        """
+        labels = [m._meta.label_lower for m, _ in BACKUP_MODELS]
+        if after is not None and after[0] not in labels:
+            raise ValueError(f"Unknown model in resume position: {after[0]}")
+        if after is None:
+            header = School.objects.values("id", *SCHOOL_FIELDS).get(pk=school.pk)
+            yield {"format": FORMAT, "version": VERSION, "school": header}
+        start = labels.index(after[0]) if after else 0
+        for model, scope in BACKUP_MODELS[start:]:
+            label = model._meta.label_lower
+            attnames = [f.attname for f in _fields(model)]
+            qs = model.objects.filter(**{scope: school}).order_by("pk")
+            last_pk = after[1] if after and label == after[0] else None
+            while True:
+                page = qs if last_pk is None else qs.filter(pk__gt=last_pk)
+                chunk = list(page.values("pk", *attnames)[:chunk_size])
+                for row in chunk:
+                    last_pk = row.pop("pk")
+                    yield {"model": label, "pk": last_pk, "fields": row}
+                if len(chunk) < chunk_size:
+                    break
+        yield {"end": True}
+
+    @staticmethod
+    def iter_ndjson(school, compress: bool = False, **kwargs):
+        """The backup as encoded lines; with compress=True as a gzip stream, flushed per chunk."""
+        lines = (_encode(record) for record in BackupService.iter_records(school, **kwargs))
+        if not compress:
+            yield from lines
+            return
+        gz = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+        pending = []
+        for line in lines:
+            pending.append(gz.compress(line))
+            if sum(map(len, pending)) >= 64 * 1024:
+                yield b"".join(pending)
+                pending.clear()
+        pending.append(gz.flush())
+        yield b"".join(pending)
+
+    @staticmethod
+    def read_records(lines):
+        """Parse backup lines into (line number, record), tolerating a truncated last line."""
+        for number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield number, json.loads(line)
+            except json.JSONDecodeError:
+                return
+
+    @staticmethod
+    def start_restore(header: dict, source: str, code: str | None = None, school_code: str | None = None) -> SchoolRestore:
+        """Create the target School from the backup header, and the SchoolRestore that tracks it."""
+        if header.get("format") != FORMAT or header.get("version") not in READ_VERSIONS:
+            raise ValueError("Not a school backup (or an unsupported version)")
+        data = dict(header["school"])
+        source_school_id = data.pop("id")
+        fields = {f.attname: f for f in School._meta.concrete_fields}
+        values = {name: fields[name].to_python(v) for name, v in data.items() if name in SCHOOL_FIELDS}
+        values["code"] = code or values["code"]
+        values["school_code"] = school_code or values["school_code"]
+        with transaction.atomic():
+            school = School.objects.create(**values)
+            return SchoolRestore.objects.create(
+                school=school, source=source[:255], source_school_id=source_school_id, lines_done=1
+            )
+
+    @staticmethod
+    def restore_records(restore: SchoolRestore, records, batch_size: int = RESTORE_BATCH_SIZE) -> SchoolRestore:
+        """
+        Load (line number, record) pairs into restore.school, skipping lines already done.
+        Rows of one model are inserted batch_size at a time with foreign keys remapped.
+        """
+        batch, batch_model, last_line = [], None, restore.lines_done
+        complete = False
+        try:
+            for number, record in records:
+                if number <= restore.lines_done:
+                    continue
+                if not isinstance(record, dict):
+                    raise ValueError(f"Line {number}: not a backup record")
+                if record.get("end"):
+                    last_line = number
+                    complete = True
+                    break
+                if "model" not in record or "pk" not in record or not isinstance(record.get("fields"), dict):
+                    raise ValueError(f"Line {number}: not a backup row (needs model, pk and fields)")
+                label = record["model"]
+                if label not in MODELS_BY_LABEL:
+                    raise ValueError(f"Line {number}: unknown model {label}")
+                if batch and (label != batch_model or len(batch) >= batch_size):
+                    BackupService._load_batch(restore, batch_model, batch, last_line)
+                    batch = []
+                batch_model, last_line = label, number
+                batch.append(record)
+            if batch:
+                BackupService._load_batch(restore, batch_model, batch, last_line)
+        except Exception:
+            SchoolRestore.objects.filter(pk=restore.pk).update(status="Failed")
+            raise
+        if not complete:
+            SchoolRestore.objects.filter(pk=restore.pk).update(status="Failed")
+            raise ValueError("Backup ended without its end marker (truncated?); re-run with the complete file to resume")
+        BackupService._finish(restore, last_line)
+        restore.refresh_from_db()
+        return restore
+
+    @staticmethod
+    def _load_batch(restore: SchoolRestore, label: str, records: list, last_line: int) -> None:
+        model = MODELS_BY_LABEL[label]
+        fields = _fields(model)
+        remote = {
+            f.attname: f.related_model._meta.label_lower
+            for f in fields
+            if f.is_relation and f.related_model is not School and f.related_model._meta.label_lower in MODELS_BY_LABEL
+        }
+        id_maps = {}
+        for attname, target in remote.items():
+            old_ids = {r["fields"].get(attname) for r in records} - {None}
+            id_maps[attname] = dict(
+                SchoolRestoreIdMap.objects.filter(restore=restore, model=target, old_id__in=old_ids).values_list("old_id", "new_id")
+            )
+        auto_dates = [f for f in fields if getattr(f, "auto_now", False) or getattr(f, "auto_now_add", False)]
+
+        objs, old_pks, dates, kept = [], [], [], []
+        for record in records:
+            values = {}
+            for f in fields:
+                if f.is_relation and f.related_model is School:
+                    value = restore.school_id
+                elif f.attname not in record["fields"]:
+                    value = f.get_default()  # column added after the backup was made
+                elif f.attname in remote:
+                    value = id_maps[f.attname].get(record["fields"][f.attname])
+                elif f.is_relation:
+                    value = None  # users and other rows outside the backup
+                else:
+                    value = record["fields"][f.attname]
+                    if value is not None:
+                        value = f.to_python(value)
+                values[f.attname] = value
+            if any(values[f.attname] is None and not f.null for f in fields if f.is_relation):
+                continue  # parent missing from the backup
+            objs.append(model(**values))
+            old_pks.append(record["pk"])
+            dates.append({f.attname: values[f.attname] for f in auto_dates})
+            kept.append(record)
+
+        with transaction.atomic():
+            taken = BackupService._clear_taken_aadhaar(objs) if model is Member else []
+            model.objects.bulk_create(objs)
+            if auto_dates:
+                # bulk_create stamps auto_now(_add) fields with "now"; put the backed-up values back
+                for obj, original in zip(objs, dates):
+                    for name, value in original.items():
+                        if value is not None:
+                            setattr(obj, name, value)
+                model.objects.bulk_update(objs, [f.name for f in auto_dates])
+            if model is Member:
+                BackupService._legacy_profiles(objs, kept)
+            SchoolRestoreIdMap.objects.bulk_create(
+                [SchoolRestoreIdMap(restore=restore, model=label, old_id=old, new_id=obj.pk) for old, obj in zip(old_pks, objs)]
+            )
+            if taken:
+                restore.aadhaar_cleared = restore.aadhaar_cleared + [obj.pk for obj in taken]
+            SchoolRestore.objects.filter(pk=restore.pk).update(
+                lines_done=last_line, rows_restored=models.F("rows_restored") + len(objs),
+                aadhaar_cleared=restore.aadhaar_cleared,
+            )
+        restore.lines_done = last_line
+
+    @staticmethod
+    def _clear_taken_aadhaar(members: list) -> list:
+        """Blank the Aadhaar numbers other students already have; returns the members changed."""
+        numbers = {m.aadhaar_number for m in members if m.aadhaar_number is not None}
+        if not numbers:
+            return []
+        taken = set(Member.objects.filter(aadhaar_number__in=numbers).values_list("aadhaar_number", flat=True))
+        cleared = [m for m in members if m.aadhaar_number in taken]
+        for m in cleared:
+            m.aadhaar_number = None
+        return cleared
+
+    @staticmethod
+    def _legacy_profiles(members: list, records: list) -> None:
+        """Version 1 backups carry the MemberProfile columns on the member lines; split them off."""
+        fields = [f for f in _fields(MemberProfile) if f.name != "member"]
+        profiles = []
+        for member, record in zip(members, records):
+            values = {f.attname: record["fields"][f.attname] for f in fields if f.attname in record["fields"]}
+            if values:
+                profiles.append(MemberProfile(
+                    member=member,
+                    **{f.attname: f.to_python(values[f.attname]) for f in fields if values.get(f.attname) is not None},
+                ))
+        MemberProfile.objects.bulk_create(profiles)
+
+    @staticmethod
+    def _finish(restore: SchoolRestore, last_line: int) -> None:
+        from .attendance import AttendanceService
+        from .dashboard import DashboardService
+        from .student_search import StudentSearchService
+
+        AttendanceService.rebuild_rollups(restore.school_id)
+        DashboardService.rebuild(restore.school_id)
+        StudentSearchService.refresh_keys(restore.school_id)  # backups may predate search_key
+        with transaction.atomic():
+            SchoolRestoreIdMap.objects.filter(restore=restore).delete()
+            SchoolRestore.objects.filter(pk=restore.pk).update(
+                lines_done=last_line, status="Done", finished_at=timezone.now()
+            )
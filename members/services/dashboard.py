@@ -0,0 +1,225 @@
+"""
+Materialized owner-dashboard metrics (DashboardSnapshot, one row per school).
+
+The dashboard reads one row instead of running a COUNT/SUM per tile. The row is kept
+current from model signals:
+
+- Member created or deleted, StudentTransport / LibraryTransaction created or deleted:
+  the affected counters are bumped with F() expressions.
+- Member updated: the counted columns are read back by primary key before the save (the
+  in-memory instance may hold stale fee values, since fees are posted with
+  queryset.update(), which sends no Member signal) and only the difference is applied;
+  a save that changes none of them writes nothing.
+- FeeTransaction created / deleted: fee_collected moves by amount_paid, as collect_fee
+  and delete_fee move the student's fee_paid alongside it.
+- LibraryTransaction updated (issue -> return): books_issued is recounted.
+
+Writes happen in the caller's transaction, so a rolled-back change never leaks into the
+snapshot. Bulk writes (bulk_create / queryset.update) bypass signals; run
+`manage.py rebuild_dashboard_snapshots` after them and periodically to correct drift.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import Case, F, IntegerField, Q, Sum, Value, When
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from ..models import DashboardSnapshot, FeeTransaction, LibraryTransaction, Member, StudentTransport
+from ..utils.aggregates import count_buckets
+
+
+def _month_start(day: date | None = None) -> date:
+    return (day or timezone.now().date()).replace(day=1)
+
+
+class DashboardService:
+    @staticmethod
+    def _student_metrics(school_id: int, month: date) -> dict:
+        row = count_buckets(
+            Member.objects.filter(school_id=school_id),
+            total_students=None,
+            male_count=Q(gender="Male"),
+            female_count=Q(gender="Female"),
+            new_admissions=Q(joined_date__month=month.month),
+            extra={"fee_expected": Sum("fee_total"), "fee_collected": Sum("fee_paid")},
+        )
+        row["fee_expected"] = row["fee_expected"] or 0
+        row["fee_collected"] = row["fee_collected"] or 0
+        return row
+
+    @staticmethod
+    def rebuild(school_id: int) -> DashboardSnapshot:
+        """Recompute every metric for one school from the source tables."""
+        month = _month_start()
+        values = DashboardService._student_metrics(school_id, month)
+        values.update(
+            admissions_month=month,
+            students_on_bus=StudentTransport.objects.filter(school_id=school_id).count(),
+            books_issued=LibraryTransaction.objects.filter(school_id=school_id, status="Issued").count(),
+            rebuilt_at=timezone.now(),
+        )
+        snapshot, _ = DashboardSnapshot.objects.update_or_create(school_id=school_id, defaults=values)
+        return snapshot
+
+    @staticmethod
+    def get(school_id: int) -> DashboardSnapshot:
+        """The school's snapshot; built on first use and when the admissions month rolls over."""
+        snapshot = DashboardSnapshot.objects.filter(school_id=school_id).first()
+        if snapshot is None or snapshot.admissions_month != _month_start():
+            snapshot = DashboardService.rebuild(school_id)
+        return snapshot
+
+    @staticmethod
+    def refresh_books(school_id: int) -> None:
+        DashboardSnapshot.objects.filter(school_id=school_id).update(
+            books_issued=LibraryTransaction.objects.filter(school_id=school_id, status="Issued").count(),
+            updated_at=timezone.now(),
+        )
+
+    @staticmethod
+    def bump(school_id: int, **deltas) -> None:
+        """Add deltas to counters; a school without a snapshot yet is skipped (built on read)."""
+        DashboardSnapshot.objects.filter(school_id=school_id).update(
+            updated_at=timezone.now(), **{field: F(field) + delta for field, delta in deltas.items()}
+        )
+
+
+# Member columns the snapshot counts, and each one's contribution of a single student
+_STUDENT_FIELDS = ("school_id", "gender", "joined_date", "fee_total", "fee_paid")
+
+
+def _clean(row: dict) -> dict:
+    """Field values as the database holds them (views assign raw POST strings)."""
+    return {
+        name: value if name == "school_id" else Member._meta.get_field(name).to_python(value)
+        for name, value in row.items()
+    }
+
+
+def _admitted(joined):
+    """1 when joined falls in the snapshot's admissions month (evaluated in the UPDATE)."""
+    if not joined:
+        return Value(0)
+    return Case(When(admissions_month__month=joined.month, then=Value(1)), default=Value(0), output_field=IntegerField())
+
+
+def _student_deltas(before: dict | None, after: dict | None) -> dict:
+    """Counter changes for one student going from row before to row after (None: absent)."""
+    empty = {"gender": None, "joined_date": None, "fee_total": None, "fee_paid": None}
+    old, new = before or empty, after or empty
+    deltas = {
+        "total_students": int(after is not None) - int(before is not None),
+        "male_count": int(new["gender"] == "Male") - int(old["gender"] == "Male"),
+        "female_count": int(new["gender"] == "Female") - int(old["gender"] == "Female"),
+        "fee_expected": Decimal(new["fee_total"] or 0) - Decimal(old["fee_total"] or 0),
+        "fee_collected": Decimal(new["fee_paid"] or 0) - Decimal(old["fee_paid"] or 0),
+    }
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if old["joined_date"] != new["joined_date"]:
+        deltas["new_admissions"] = _admitted(new["joined_date"]) - _admitted(old["joined_date"])
+    return deltas
+
+
+def _bump_student(school_id, before: dict | None, after: dict | None) -> None:
+    deltas = _student_deltas(before, after)
+    if deltas and school_id:
+        DashboardService.bump(school_id, **deltas)
+
+
+@receiver(pre_save, sender=Member)
+def _member_saving(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._dashboard_before = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not {f.removesuffix("_id") for f in update_fields} & {
+        f.removesuffix("_id") for f in _STUDENT_FIELDS
+    }:
+        return
+    instance._dashboard_before = Member.objects.filter(pk=instance.pk).values(*_STUDENT_FIELDS).first()
+
+
+@receiver(post_save, sender=Member)
+def _member_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if created:
+        _bump_student(instance.school_id, None, _clean({f: getattr(instance, f) for f in _STUDENT_FIELDS}))
+        return
+    before = getattr(instance, "_dashboard_before", None)
+    instance._dashboard_before = None
+    if before is None:
+        return
+    written = {f.removesuffix("_id") for f in update_fields} if update_fields is not None else None
+    after = dict(before)
+    for f in _STUDENT_FIELDS:
+        if written is None or f.removesuffix("_id") in written:
+            after[f] = getattr(instance, f)
+    after = _clean(after)
+    if before["school_id"] != after["school_id"]:
+        _bump_student(before["school_id"], before, None)
+        _bump_student(after["school_id"], None, after)
+    else:
+        _bump_student(after["school_id"], before, after)
+
+
+@receiver(pre_delete, sender=Member)
+def _member_deleting(sender, instance, origin=None, **kwargs):
+    # member.delete() may run on a stale instance; cascades and queryset deletes load fresh rows
+    if origin is instance:
+        instance._dashboard_before = Member.objects.filter(pk=instance.pk).values(*_STUDENT_FIELDS).first()
+    else:
+        instance._dashboard_before = _clean({f: getattr(instance, f) for f in _STUDENT_FIELDS})
+
+
+@receiver(post_delete, sender=Member)
+def _member_deleted(sender, instance, **kwargs):
+    before = getattr(instance, "_dashboard_before", None)
+    if before is not None:
+        _bump_student(before["school_id"], before, None)
+
+
+@receiver(post_save, sender=FeeTransaction)
+def _fee_transaction_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.school_id:
+        DashboardService.bump(instance.school_id, fee_collected=Decimal(str(instance.amount_paid or 0)))
+
+
+@receiver(post_delete, sender=FeeTransaction)
+def _fee_transaction_deleted(sender, instance, origin=None, **kwargs):
+    # In a Member (or School) cascade the student's own removal already takes its fee_paid out
+    deleted_directly = isinstance(origin, FeeTransaction) or getattr(origin, "model", None) is FeeTransaction
+    if deleted_directly and instance.school_id:
+        DashboardService.bump(instance.school_id, fee_collected=-Decimal(str(instance.amount_paid or 0)))
+
+
+@receiver(post_save, sender=StudentTransport)
+def _transport_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        DashboardService.bump(instance.school_id, students_on_bus=1)
+
+
+@receiver(post_delete, sender=StudentTransport)
+def _transport_deleted(sender, instance, **kwargs):
+    DashboardService.bump(instance.school_id, students_on_bus=-1)
+
+
+@receiver(post_save, sender=LibraryTransaction)
+def _library_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or not instance.school_id:
+        return
+    if created:
+        if instance.status == "Issued":
+            DashboardService.bump(instance.school_id, books_issued=1)
+    else:
+        DashboardService.refresh_books(instance.school_id)
+
+
+@receiver(post_delete, sender=LibraryTransaction)
+def _library_deleted(sender, instance, **kwargs):
+    if instance.school_id and instance.status == "Issued":
+        DashboardService.bump(instance.school_id, books_issued=-1)
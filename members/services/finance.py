@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections import defaultdict
 from decimal import Decimal, InvalidOperation
 from dataclasses import dataclass
 from datetime import date as date_type
@@ -24,6 +25,17 @@ class PaymentResult:
     receipt: FeePaymentReceipt
 
 
+@dataclass(frozen=True)
+class InstallmentRunResult:
+    students: int
+    created: int
+    updated: int
+
+
+QUARTERS = ('Q1', 'Q2', 'Q3', 'Q4')
+CENT = Decimal('0.01')
+
+
 class FinanceService:
     @staticmethod
     def _parse_decimal(value) -> Decimal:
@@ -50,13 +62,16 @@ class FinanceService:
         return 'Q4'
 
     @staticmethod
-    def _late_fee_for(installment: FeeInstallment, as_of: date_type) -> Decimal:
-        policy = LateFeePolicy.objects.filter(school=installment.school, is_active=True).first()
+    def _active_late_fee_policy(school_id: int) -> LateFeePolicy | None:
+        return LateFeePolicy.objects.filter(school_id=school_id, is_active=True).first()
+
+    @staticmethod
+    def _late_fee_from_policy(policy: LateFeePolicy | None, due_date: date_type, as_of: date_type) -> Decimal:
         if not policy:
             return Decimal('0')
-        if as_of <= installment.due_date:
+        if as_of <= due_date:
             return Decimal('0')
-        overdue_days = (as_of - installment.due_date).days
+        overdue_days = (as_of - due_date).days
         if overdue_days <= int(policy.grace_days or 0):
             return Decimal('0')
         billable_days = overdue_days - int(policy.grace_days or 0)
@@ -67,24 +82,45 @@ class FinanceService:
         return fee
 
     @staticmethod
-    def _discount_for(student: Member) -> Decimal:
+    def _late_fee_for(installment: FeeInstallment, as_of: date_type) -> Decimal:
+        policy = FinanceService._active_late_fee_policy(installment.school_id)
+        return FinanceService._late_fee_from_policy(policy, installment.due_date, as_of)
+
+    @staticmethod
+    def _discount_from(fee_total, discounts) -> Decimal:
         """
-        Sum active concessions. Percent concessions are applied on fee_total (legacy basis).
+        Sum (discount_type, value) pairs. Percent concessions are applied on fee_total (legacy basis).
         """
         total = Decimal('0')
-        qs = StudentConcession.objects.select_related('discount').filter(
+        for discount_type, value in discounts:
+            if discount_type == 'Percent':
+                total += (Decimal(fee_total or 0) * Decimal(value or 0)) / Decimal('100')
+            else:
+                total += Decimal(value or 0)
+        return total
+
+    @staticmethod
+    def _discount_for(student: Member) -> Decimal:
+        """
+        Sum active concessions for one student.
+        """
+        qs = StudentConcession.objects.filter(
             school=student.school,
             student=student,
             is_active=True,
             discount__is_active=True,
-        )
-        for sc in qs:
-            d = sc.discount
-            if d.discount_type == 'Percent':
-                total += (Decimal(student.fee_total or 0) * Decimal(d.value or 0)) / Decimal('100')
-            else:
-                total += Decimal(d.value or 0)
-        return total
+        ).values_list('discount__discount_type', 'discount__value')
+        return FinanceService._discount_from(student.fee_total, qs)
+
+    @staticmethod
+    def _quarter_due_dates(ay: AcademicYear) -> dict[str, date_type]:
+        start = ay.start_date
+        return {
+            'Q1': start,
+            'Q2': date_type(start.year, min(start.month + 3, 12), start.day),
+            'Q3': date_type(start.year, min(start.month + 6, 12), start.day),
+            'Q4': date_type(start.year, min(start.month + 9, 12), start.day),
+        }
 
     @staticmethod
     def ensure_quarterly_installments(student: Member, as_of: date_type | None = None) -> None:
@@ -92,81 +128,152 @@ class FinanceService:
         Creates/updates 4 quarterly installments for the active academic year.
         Principal is derived from legacy Member.fee_total (backward-compatible).
         """
+        FinanceService.generate_installments(student.school_id, student_ids=[student.id], as_of=as_of)
+
+    @staticmethod
+    def generate_installments(
+        school_id: int,
+        *,
+        class_id: int | None = None,
+        student_ids=None,
+        as_of: date_type | None = None,
+        batch_size: int = 500,
+    ) -> InstallmentRunResult:
+        """
+        Set-based installment engine for a whole school, one class or a set of students.
+        Reads the academic year, late fee policy, concessions and existing installments once,
+        builds the 4 quarterly rows per student in memory, then writes them with chunked
+        bulk_create / bulk_update. Existing rows are only written when late fee or discount changed.
+        """
         as_of = as_of or timezone.now().date()
-        ay = FinanceService._current_academic_year(student.school_id)
+        ay = FinanceService._current_academic_year(school_id)
         if not ay:
-            return
-
-        annual = Decimal(student.fee_total or 0)
-        per_q = (annual / Decimal('4')) if annual else Decimal('0')
-        discount_total = FinanceService._discount_for(student)
-        discount_per_q = (discount_total / Decimal('4')) if discount_total else Decimal('0')
-
-        due_dates = {
-            'Q1': ay.start_date,
-            'Q2': date_type(ay.start_date.year, min(ay.start_date.month + 3, 12), ay.start_date.day),
-            'Q3': date_type(ay.start_date.year, min(ay.start_date.month + 6, 12), ay.start_date.day),
-            'Q4': date_type(ay.start_date.year, min(ay.start_date.month + 9, 12), ay.start_date.day),
-        }
+            return InstallmentRunResult(students=0, created=0, updated=0)
 
-        for q in ('Q1', 'Q2', 'Q3', 'Q4'):
-            inst, _ = FeeInstallment.objects.get_or_create(
-                school=student.school,
-                student=student,
+        students_qs = Member.objects.filter(school_id=school_id)
+        if class_id:
+            students_qs = students_qs.filter(student_class_id=class_id)
+        if student_ids is not None:
+            students_qs = students_qs.filter(id__in=student_ids)
+        students = list(students_qs.order_by('id').values_list('id', 'fee_total'))
+        if not students:
+            return InstallmentRunResult(students=0, created=0, updated=0)
+        scope = students_qs.values('id')
+
+        policy = FinanceService._active_late_fee_policy(school_id)
+        discounts_by_student = defaultdict(list)
+        concessions = StudentConcession.objects.filter(
+            school_id=school_id,
+            student_id__in=scope,
+            is_active=True,
+            discount__is_active=True,
+        ).values_list('student_id', 'discount__discount_type', 'discount__value')
+        for student_id, discount_type, value in concessions:
+            discounts_by_student[student_id].append((discount_type, value))
+
+        existing = {
+            (inst.student_id, inst.quarter): inst
+            for inst in FeeInstallment.objects.filter(
+                school_id=school_id,
                 academic_year=ay,
-                quarter=q,
-                defaults={
-                    'due_date': due_dates[q],
-                    'principal_amount': per_q,
-                    'discount_amount': discount_per_q,
-                    'late_fee_amount': Decimal('0'),
-                    'paid_amount': Decimal('0'),
-                    'status': 'Due',
-                },
-            )
-            inst.late_fee_amount = FinanceService._late_fee_for(inst, as_of)
-            inst.discount_amount = discount_per_q
-            inst.save(update_fields=['late_fee_amount', 'discount_amount'])
+                student_id__in=scope,
+            ).only('id', 'student_id', 'quarter', 'due_date', 'late_fee_amount', 'discount_amount')
+        }
+        due_dates = FinanceService._quarter_due_dates(ay)
+
+        to_create = []
+        to_update = []
+        for student_id, fee_total in students:
+            annual = Decimal(fee_total or 0)
+            per_q = (annual / Decimal('4')).quantize(CENT) if annual else Decimal('0')
+            discount_total = FinanceService._discount_from(annual, discounts_by_student.get(student_id, ()))
+            discount_per_q = (discount_total / Decimal('4')).quantize(CENT) if discount_total else Decimal('0')
+            for q in QUARTERS:
+                inst = existing.get((student_id, q))
+                if inst is None:
+                    to_create.append(FeeInstallment(
+                        school_id=school_id,
+                        student_id=student_id,
+                        academic_year=ay,
+                        quarter=q,
+                        due_date=due_dates[q],
+                        principal_amount=per_q,
+                        discount_amount=discount_per_q,
+                        late_fee_amount=FinanceService._late_fee_from_policy(policy, due_dates[q], as_of).quantize(CENT),
+                        paid_amount=Decimal('0'),
+                        status='Due',
+                    ))
+                    continue
+                late_fee = FinanceService._late_fee_from_policy(policy, inst.due_date, as_of).quantize(CENT)
+                if inst.late_fee_amount != late_fee or inst.discount_amount != discount_per_q:
+                    inst.late_fee_amount = late_fee
+                    inst.discount_amount = discount_per_q
+                    to_update.append(inst)
+
+        with transaction.atomic():
+            # ignore_conflicts: a concurrent run may already have inserted the same quarter row.
+            FeeInstallment.objects.bulk_create(to_create, batch_size=batch_size, ignore_conflicts=True)
+            FeeInstallment.objects.bulk_update(to_update, ['late_fee_amount', 'discount_amount'], batch_size=batch_size)
+        return InstallmentRunResult(students=len(students), created=len(to_create), updated=len(to_update))
+
+    @staticmethod
+    def _installment_status(inst: FeeInstallment) -> str:
+        if inst.paid_amount >= inst.net_due and inst.net_due > 0:
+            return 'Paid'
+        if inst.paid_amount > 0:
+            return 'Partial'
+        return 'Due'
 
     @staticmethod
-    def allocate_receipt(receipt: FeePaymentReceipt, as_of: date_type | None = None) -> None:
+    def allocate_receipt(receipt: FeePaymentReceipt, as_of: date_type | None = None) -> list[FeePaymentAllocation]:
         """
         Allocates receipt amount to installments (oldest due first).
+        The student's installment ledger is read in one query; late fees, allocations and
+        statuses are computed in memory and written back with one bulk_create of allocations
+        and one bulk_update of installments.
         """
         as_of = as_of or timezone.now().date()
-        student = receipt.student
-        FinanceService.ensure_quarterly_installments(student, as_of=as_of)
+        FinanceService.generate_installments(receipt.school_id, student_ids=[receipt.student_id], as_of=as_of)
+        policy = FinanceService._active_late_fee_policy(receipt.school_id)
 
-        installments = FeeInstallment.objects.filter(
-            school=receipt.school,
-            student=student,
-        ).order_by('due_date', 'id')
-
-        remaining = Decimal(receipt.amount or 0)
-        for inst in installments:
-            if remaining <= 0:
-                break
-            inst.late_fee_amount = FinanceService._late_fee_for(inst, as_of)
-            inst.save(update_fields=['late_fee_amount'])
-            inst_remaining = Decimal(inst.remaining or 0)
-            if inst_remaining <= 0:
-                continue
-            alloc = remaining if remaining <= inst_remaining else inst_remaining
-            FeePaymentAllocation.objects.create(receipt=receipt, installment=inst, allocated_amount=alloc)
-            inst.paid_amount = F('paid_amount') + alloc
-            inst.save(update_fields=['paid_amount'])
-            remaining -= alloc
-
-        # Update installment statuses
-        for inst in installments:
-            inst.refresh_from_db()
-            if inst.paid_amount >= inst.net_due and inst.net_due > 0:
-                inst.status = 'Paid'
-            elif inst.paid_amount > 0:
-                inst.status = 'Partial'
-            else:
-                inst.status = 'Due'
-            inst.save(update_fields=['status'])
+        with transaction.atomic():
+            installments = list(
+                FeeInstallment.objects.select_for_update()
+                .filter(school_id=receipt.school_id, student_id=receipt.student_id)
+                .order_by('due_date', 'id')
+            )
+
+            allocations = []
+            changed = set()
+            remaining = Decimal(receipt.amount or 0)
+            for inst in installments:
+                if remaining <= 0:
+                    break
+                late_fee = FinanceService._late_fee_from_policy(policy, inst.due_date, as_of).quantize(CENT)
+                if inst.late_fee_amount != late_fee:
+                    inst.late_fee_amount = late_fee
+                    changed.add(inst.pk)
+                inst_remaining = Decimal(inst.remaining or 0)
+                if inst_remaining <= 0:
+                    continue
+                alloc = remaining if remaining <= inst_remaining else inst_remaining
+                allocations.append(FeePaymentAllocation(receipt=receipt, installment=inst, allocated_amount=alloc))
+                inst.paid_amount += alloc
+                changed.add(inst.pk)
+                remaining -= alloc
+
+            for inst in installments:
+                status = FinanceService._installment_status(inst)
+                if inst.status != status:
+                    inst.status = status
+                    changed.add(inst.pk)
+
+            FeePaymentAllocation.objects.bulk_create(allocations)
+            FeeInstallment.objects.bulk_update(
+                [inst for inst in installments if inst.pk in changed],
+                ['late_fee_amount', 'paid_amount', 'status'],
+            )
+        return allocations
 
     @staticmethod
     def collect_fee(*, school_id: int, student_id: int, amount, mode: str, date: str = None) -> FeeTransaction:
@@ -186,7 +293,13 @@ class FinanceService:
             # Lock the student row so no one else can edit it while we are
             student = Member.objects.select_for_update().get(id=student_id, school_id=school_id)
 
-            # 2. Create the Transaction Record
+            # 2. Update Balance using F() Expression (The Magic Fix)
+            # Instead of saying "New Balance = 500", we say "New Balance = Old Balance + 500"
+            # This happens inside the database, not in Python memory; only fee_paid is written.
+            Member.objects.filter(pk=student.pk).update(fee_paid=F('fee_paid') + amount_dec)
+
+            # 3. Create the Transaction Record (its post_save moves the dashboard
+            # snapshot's fee_collected by the same amount)
             fee_tx = FeeTransaction.objects.create(
                 student=student,
                 amount_paid=amount_dec,
@@ -196,18 +309,9 @@ class FinanceService:
                 status="Paid"
             )
 
-            # 3. Update Balance using F() Expression (The Magic Fix)
-            # Instead of saying "New Balance = 500", we say "New Balance = Old Balance + 500"
-            # This happens inside the database, not in Python memory.
-            student.fee_paid = F('fee_paid') + amount_dec
-            student.save()
-            
-            # Reload to get the actual decimal value back for display if needed
-            student.refresh_from_db()
-
             # ✅ Finance Engine v2: dual-write receipt + allocations
             receipt = FeePaymentReceipt.objects.create(
-                school=student.school,
+                school_id=student.school_id,
                 student=student,
                 amount=amount_dec,
                 mode=('UPI' if mode in {'Online', 'Online/UPI', 'UPI'} else mode) if mode in {'Cash', 'UPI', 'Bank', 'Cheque', 'Gateway', 'Online', 'Online/UPI'} else 'Cash',
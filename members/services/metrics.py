@@ -0,0 +1,239 @@
+"""
+Request metrics in the Prometheus text format (served at /metrics, see views.health).
+
+MetricsMiddleware records, per school (request.school.code) and URL name: a latency
+histogram, requests by method and status, database queries and time (from
+QueryBudgetMiddleware's request.query_stats), template render time and response bytes.
+
+Each process keeps its own counters in memory. With settings.METRICS_DIR set (use a
+tmpfs such as /dev/shm/erp-metrics under gunicorn) every worker writes a snapshot of
+them to <METRICS_DIR>/<pid>.json at most every METRICS_FLUSH_SECONDS (requests recorded
+inside that window are written by a timer when it ends, so an idle worker's last requests
+are not left out), and /metrics adds up the snapshots of all workers, so any worker can
+answer the scrape. Snapshots of
+workers that have exited are kept so that counters never go down; empty the directory
+when the server is (re)started, as with prometheus_client's multiprocess mode.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextvars
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TOTALS = ("requests", "seconds", "queries", "db_seconds", "template_seconds", "response_bytes")
+
+_series: dict = {}    # (school, view) -> {total name: value, "buckets": [count per bucket + +Inf]}
+_statuses: dict = {}  # (school, view, method, status) -> requests
+_lock = threading.Lock()
+_last_flush = 0.0
+_timer: threading.Timer | None = None  # pending flush of counters recorded since the last one
+_timer_lock = threading.Lock()
+
+# Template render seconds of the request being handled (None outside a request)
+_template_seconds: contextvars.ContextVar = contextvars.ContextVar("template_seconds", default=None)
+
+
+def _new_series() -> dict:
+    return {**{name: 0 for name in TOTALS}, "buckets": [0] * (len(BUCKETS) + 1)}
+
+
+def start_request():
+    """Start timing template rendering for the current request; pass the result to finish_request()."""
+    return _template_seconds.set([0.0])
+
+
+def finish_request(token) -> float:
+    """Template render seconds since start_request()."""
+    seconds = _template_seconds.get() or [0.0]
+    _template_seconds.reset(token)
+    return seconds[0]
+
+
+def record(school: str, view: str, method: str, status: int, seconds: float,
+           queries: int = 0, db_seconds: float = 0.0, template_seconds: float = 0.0, response_bytes: int = 0) -> None:
+    bucket = next((i for i, le in enumerate(BUCKETS) if seconds <= le), len(BUCKETS))
+    with _lock:
+        s = _series.get((school, view))
+        if s is None:
+            s = _series[(school, view)] = _new_series()
+        s["requests"] += 1
+        s["seconds"] += seconds
+        s["queries"] += queries
+        s["db_seconds"] += db_seconds
+        s["template_seconds"] += template_seconds
+        s["response_bytes"] += response_bytes
+        s["buckets"][bucket] += 1
+        key = (school, view, method, str(status))
+        _statuses[key] = _statuses.get(key, 0) + 1
+    _maybe_flush()
+
+
+def time_template_rendering() -> None:
+    """Add the time spent in Django template rendering to the current request's metrics."""
+    from django.template.backends.django import Template
+
+    if getattr(Template.render, "_timed", False):
+        return
+    render = Template.render
+
+    def timed_render(self, context=None, request=None):
+        seconds = _template_seconds.get()
+        if seconds is None:
+            return render(self, context, request)
+        started = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            seconds[0] += time.perf_counter() - started
+
+    timed_render._timed = True
+    Template.render = timed_render
+
+
+# --- sharing between worker processes ---
+
+
+def _directory() -> Path | None:
+    path = getattr(settings, "METRICS_DIR", "")
+    return Path(path) if path else None
+
+
+def _snapshot() -> dict:
+    with _lock:
+        return {
+            "series": [[school, view, dict(s, buckets=list(s["buckets"]))] for (school, view), s in _series.items()],
+            "statuses": [[*key, n] for key, n in _statuses.items()],
+        }
+
+
+def flush() -> None:
+    """Write this process's counters to METRICS_DIR (atomically, so readers never see half a file)."""
+    global _last_flush
+    directory = _directory()
+    if directory is None:
+        return
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / f"{os.getpid()}.json"
+    tmp = directory / f".{os.getpid()}.json.tmp"
+    tmp.write_text(json.dumps(_snapshot()))
+    os.replace(tmp, target)
+    _last_flush = time.monotonic()
+
+
+def _maybe_flush() -> None:
+    global _timer
+    if _directory() is None:
+        return
+    wait = getattr(settings, "METRICS_FLUSH_SECONDS", 5) - (time.monotonic() - _last_flush)
+    if wait <= 0:
+        flush()
+        return
+    with _timer_lock:
+        if _timer is None:
+            _timer = threading.Timer(wait, _flush_pending)
+            _timer.daemon = True
+            _timer.start()
+
+
+def _flush_pending() -> None:
+    global _timer
+    with _timer_lock:
+        _timer = None
+    flush()
+
+
+def _forget_timer() -> None:
+    global _timer
+    _timer = None  # the timer thread is not copied into a forked worker
+
+
+os.register_at_fork(after_in_child=_forget_timer)
+atexit.register(lambda: _directory() is not None and flush())
+
+
+def collect() -> tuple[dict, dict]:
+    """Counters of every worker (the snapshots in METRICS_DIR, this process live)."""
+    snapshots = [_snapshot()]
+    directory = _directory()
+    if directory is not None and directory.is_dir():
+        own = f"{os.getpid()}.json"
+        for path in directory.glob("*.json"):
+            if path.name == own:
+                continue
+            try:
+                snapshots.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue  # being replaced right now; the next scrape reads it
+    series, statuses = {}, {}
+    for snap in snapshots:
+        for school, view, s in snap["series"]:
+            total = series.setdefault((school, view), _new_series())
+            for name in TOTALS:
+                total[name] += s[name]
+            total["buckets"] = [a + b for a, b in zip(total["buckets"], s["buckets"])]
+        for *key, n in snap["statuses"]:
+            statuses[tuple(key)] = statuses.get(tuple(key), 0) + n
+    return series, statuses
+
+
+# --- exposition ---
+
+
+def _labels(**labels) -> str:
+    def escape(v):
+        return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _number(v) -> str:
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    series, statuses = collect()
+    lines = [
+        "# HELP erp_http_requests_total Requests by school, URL name, method and status.",
+        "# TYPE erp_http_requests_total counter",
+    ]
+    for (school, view, method, status), n in sorted(statuses.items()):
+        lines.append(f"erp_http_requests_total{_labels(school=school, view=view, method=method, status=status)} {n}")
+
+    lines += [
+        "# HELP erp_http_request_duration_seconds Time to answer a request.",
+        "# TYPE erp_http_request_duration_seconds histogram",
+    ]
+    for (school, view), s in sorted(series.items()):
+        cumulative = 0
+        for le, n in zip((*BUCKETS, "+Inf"), s["buckets"]):
+            cumulative += n
+            lines.append(f"erp_http_request_duration_seconds_bucket{_labels(school=school, view=view, le=le)} {cumulative}")
+        lines.append(f"erp_http_request_duration_seconds_sum{_labels(school=school, view=view)} {_number(s['seconds'])}")
+        lines.append(f"erp_http_request_duration_seconds_count{_labels(school=school, view=view)} {s['requests']}")
+
+    for name, field, help_text in (
+        ("erp_db_queries_total", "queries", "Database queries issued."),
+        ("erp_db_query_seconds_total", "db_seconds", "Time spent in database queries."),
+        ("erp_template_render_seconds_total", "template_seconds", "Time spent rendering templates."),
+        ("erp_http_response_bytes_total", "response_bytes", "Response body bytes sent."),
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for (school, view), s in sorted(series.items()):
+            lines.append(f"{name}{_labels(school=school, view=view)} {_number(s[field])}")
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    """Forget this process's counters (tests)."""
+    with _lock:
+        _series.clear()
+        _statuses.clear()
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import logging
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Sum, Value, When, Window
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from ..models import Notification, NotificationBroadcast
+
+logger = logging.getLogger(__name__)
+
+RECENT_LIMIT = 15
+SUMMARY_TTL = 300  # seconds; signals invalidate sooner on change
+BROADCAST_INLINE_LIMIT = 200  # recipients delivered within the request; larger sends go to the background
+BROADCAST_CHUNK_SIZE = 1000
+
+
+class NotificationService:
+    @staticmethod
+    def _cache_key(school_id: int, user_id: int) -> str:
+        return f"notif-summary:{school_id}:{user_id}"
+
+    @staticmethod
+    def summary(school_id: int, user_id: int) -> dict:
+        """
+        Unread count + most recent notifications for one user in one school.
+        Cached per (school, user); on a miss both come from a single query
+        (the unread total is a window aggregate over the user's rows, computed before LIMIT).
+        """
+        key = NotificationService._cache_key(school_id, user_id)
+        data = cache.get(key)
+        if data is not None:
+            return data
+
+        rows = list(
+            Notification.objects.filter(school_id=school_id, user_id=user_id)
+            .annotate(
+                unread_total=Window(
+                    expression=Sum(
+                        Case(When(read=False, then=Value(1)), default=Value(0), output_field=IntegerField())
+                    ),
+                )
+            )
+            .order_by("-created_at", "-id")
+            .values("id", "title", "message", "read", "created_at", "unread_total")[:RECENT_LIMIT]
+        )
+        data = {
+            "unread_count": (rows[0]["unread_total"] or 0) if rows else 0,
+            "recent": [{k: v for k, v in row.items() if k != "unread_total"} for row in rows],
+        }
+        if not transaction.get_connection().in_atomic_block:
+            # Rows read inside an open transaction may still roll back; don't cache them.
+            cache.set(key, data, SUMMARY_TTL)
+        return data
+
+    @staticmethod
+    def invalidate(school_id: int, user_id: int) -> None:
+        cache.delete(NotificationService._cache_key(school_id, user_id))
+
+    @staticmethod
+    def invalidate_many(school_id: int, user_ids) -> None:
+        cache.delete_many([NotificationService._cache_key(school_id, uid) for uid in user_ids])
+
+    @staticmethod
+    def mark_all_read(school_id: int, user_id: int) -> int:
+        updated = Notification.objects.filter(school_id=school_id, user_id=user_id, read=False).update(read=True)
+        NotificationService.invalidate(school_id, user_id)
+        return updated
+
+    @staticmethod
+    def broadcast(school, title: str, message: str, user_ids, created_by=None) -> NotificationBroadcast:
+        """
+        Record a fan-out of one notification to many users and deliver it.
+        Small audiences are written before returning; larger ones are handed to
+        deliver_notification_broadcast_task and can be polled via the broadcast row.
+        """
+        user_ids = list(dict.fromkeys(user_ids))  # de-duplicate, keep order
+        broadcast = NotificationBroadcast.objects.create(
+            school=school,
+            created_by=created_by,
+            title=title,
+            message=message,
+            recipient_ids=user_ids,
+            total_recipients=len(user_ids),
+        )
+        if len(user_ids) <= BROADCAST_INLINE_LIMIT:
+            return NotificationService.deliver_broadcast(broadcast.pk)
+
+        from ..tasks import deliver_notification_broadcast_task
+        from ..utils import background
+
+        background.submit(deliver_notification_broadcast_task, broadcast.pk)
+        return broadcast
+
+    @staticmethod
+    def deliver_broadcast(broadcast_id: int, chunk_size: int = BROADCAST_CHUNK_SIZE):
+        """
+        Write the Notification rows for a broadcast with chunked bulk_create.
+        Resumable: delivered_count is committed per chunk and a re-run starts after it.
+        """
+        broadcast = NotificationBroadcast.objects.filter(pk=broadcast_id).first()
+        if broadcast is None or broadcast.status == "Done":
+            return broadcast
+        NotificationBroadcast.objects.filter(pk=broadcast.pk).update(status="Running")
+        user_ids = broadcast.recipient_ids
+        try:
+            for start in range(broadcast.delivered_count, len(user_ids), chunk_size):
+                chunk = user_ids[start:start + chunk_size]
+                with transaction.atomic():
+                    Notification.objects.bulk_create(
+                        [
+                            Notification(school_id=broadcast.school_id, user_id=uid, title=broadcast.title, message=broadcast.message)
+                            for uid in chunk
+                        ],
+                        batch_size=chunk_size,
+                    )
+                    NotificationBroadcast.objects.filter(pk=broadcast.pk).update(delivered_count=F("delivered_count") + len(chunk))
+                # bulk_create skips post_save, so drop the navbar summaries here.
+                NotificationService.invalidate_many(broadcast.school_id, chunk)
+        except Exception:
+            logger.exception("Notification broadcast %s failed", broadcast.pk)
+            NotificationBroadcast.objects.filter(pk=broadcast.pk).update(status="Failed")
+            raise
+        NotificationBroadcast.objects.filter(pk=broadcast.pk).update(status="Done", finished_at=timezone.now())
+        broadcast.refresh_from_db()
+        return broadcast
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def _invalidate_notification_summary(sender, instance, **kwargs):
+    NotificationService.invalidate(instance.school_id, instance.user_id)
+    transaction.on_commit(lambda: NotificationService.invalidate(instance.school_id, instance.user_id))
@@ -0,0 +1,516 @@
+"""
+PDF documents (fee receipts, marksheets, salary slips, admission receipts) rendered off
+the request thread and cached by content.
+
+Each document is built in two steps:
+
+- prepare: read the database and produce the renderer's input (the template's HTML for
+  xhtml2pdf documents, the printed values for the reportlab admission receipt);
+- render: turn that input into PDF bytes. This is the slow, CPU-bound part and touches
+  no database, so it can run in a process pool (settings.PDF_RENDER_PROCESSES).
+
+Output is stored in default_storage as pdf_cache/<kind>/<object id>/<sha256 of input>.pdf,
+so a repeat download of an unchanged document is a file read, and any change to what the
+document shows produces a new name (storing it deletes the superseded versions). Saving or
+deleting the source row (FeeTransaction, ExamScore, SalaryTransaction, Member) removes that
+object's stored files. The marksheet's "Report Generated" date is not part of its input:
+it is filled in when the PDF is rendered, so the name stays the same from day to day.
+
+On a cache miss the view queues render_pdf_task (see utils.background) and answers with a
+self-refreshing "preparing" page; with CELERY_TASK_ALWAYS_EAGER it renders inline.
+
+Batch exports (a class's marksheets, a date range of receipts) are PdfExport rows worked
+by render_pdf_export_task: documents are rendered in parallel on worker processes into
+the same cache and copied to pdf_exports/<export id>/, where invalidating the cache cannot
+reach them, then downloaded as a ZIP streamed straight from storage or as one merged PDF
+assembled by the task.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import logging
+import re
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import default_storage
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.shortcuts import render
+from django.template.loader import get_template
+from django.utils import timezone
+
+from ..models import ExamScore, FeeTransaction, Member, PdfExport, SalaryTransaction
+
+logger = logging.getLogger(__name__)
+
+CACHE_ROOT = "pdf_cache"
+EXPORT_ROOT = "pdf_exports"  # per-export copies of the documents (same folder as PdfExport.merged_file)
+PENDING_TTL = 120  # seconds a queued render suppresses duplicate submissions
+EXPORT_CHUNK_SIZE = 50  # documents prepared, rendered and recorded per progress step
+STREAM_BLOCK_SIZE = 64 * 1024
+PRINT_DATE = "__PRINT_DATE__"  # stands in for the print date in the hashed marksheet HTML
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def legacy_subject_marks(score) -> dict:
+    """Return subject name -> marks from legacy columns or subject_marks."""
+    if score.subject_marks:
+        return score.subject_marks
+    return {
+        'Maths': score.maths or 0,
+        'Physics': score.physics or 0,
+        'Chemistry': score.chemistry or 0,
+        'English': score.english or 0,
+        'Computer': score.computer or 0,
+    }
+
+
+def _html_to_pdf(html: str) -> bytes:
+    from xhtml2pdf import pisa
+
+    out = io.BytesIO()
+    status = pisa.CreatePDF(html, dest=out)
+    if status.err:
+        raise ValueError(f"xhtml2pdf reported {status.err} error(s)")
+    return out.getvalue()
+
+
+def _render_marksheet(html: str) -> bytes:
+    return _html_to_pdf(html.replace(PRINT_DATE, date.today().strftime("%d %b %Y")))
+
+
+def _draw_admission_receipt(payload: dict) -> bytes:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    out = io.BytesIO()
+    p = canvas.Canvas(out, pagesize=A4)
+    width, height = A4
+
+    # --- Header ---
+    y = height - 50
+    p.setFont("Helvetica-Bold", 24)
+    p.drawCentredString(width / 2, y, "ABC SCHOOL") # Replace with school.name if available
+
+    y -= 30
+    p.setFont("Helvetica", 12)
+    p.drawCentredString(width / 2, y, "Excellence in Education")
+    p.drawCentredString(width / 2, y - 15, "123 School Road, City, State - 123456")
+
+    y -= 40
+    p.line(50, y, width - 50, y)
+
+    # --- Title ---
+    y -= 40
+    p.setFont("Helvetica-Bold", 18)
+    p.drawCentredString(width / 2, y, "ADMISSION CONFIRMATION RECEIPT")
+
+    # --- Student Details ---
+    y -= 50
+    x_left = 70
+    line_height = 25
+
+    p.setFont("Helvetica-Bold", 12)
+    p.drawString(x_left, y, "Student Information")
+    y -= line_height
+    p.line(x_left, y+5, 200, y+5) # Underline
+
+    for label, value in payload["student"]:
+        y -= line_height
+        p.setFont("Helvetica-Bold", 10)
+        p.drawString(x_left, y, label)
+        p.setFont("Helvetica", 10)
+        p.drawString(x_left + 150, y, value)
+
+    # --- Financial Details ---
+    y -= 40
+    p.setFont("Helvetica-Bold", 12)
+    p.drawString(x_left, y, "Fee Details")
+    y -= line_height
+    p.line(x_left, y+5, 150, y+5)
+
+    p.setFont("Helvetica", 11)
+    for label, value in payload["fees"]:
+        y -= line_height
+        p.drawString(x_left, y, label)
+        p.drawString(x_left + 150, y, value)
+
+    # --- Footer ---
+    y = 100
+    p.setFont("Helvetica-Oblique", 10)
+    p.drawString(x_left, y, "Authorized Signatory")
+    p.drawString(width - 200, y, "Parent/Guardian Signature")
+
+    p.line(x_left, y+10, x_left + 150, y+10)
+    p.line(width - 200, y+10, width - 50, y+10)
+
+    y -= 40
+    p.setFont("Helvetica", 8)
+    p.drawCentredString(width / 2, y, "This is a computer-generated receipt.")
+
+    p.showPage()
+    p.save()
+    return out.getvalue()
+
+
+def _prepare_receipt(t: FeeTransaction):
+    remaining_balance = (t.student.fee_total or 0) - (t.student.fee_paid or 0)
+    return get_template('receipt_pdf.html').render({'t': t, 'school': t.student.school, 'remaining_balance': remaining_balance})
+
+
+def _prepare_marksheet(score: ExamScore):
+    subject_marks_dict = legacy_subject_marks(score)
+    total_obtained = sum(v for k, v in subject_marks_dict.items() if isinstance(v, (int, float)))
+    total_max = len(subject_marks_dict) * 100 if subject_marks_dict else 500
+    percentage = round((total_obtained / total_max) * 100, 2) if total_max > 0 else 0
+    result_status = 'PASS' if total_obtained >= (total_max * 0.33) else 'FAIL'
+    return get_template('marksheet_pdf.html').render({
+        'score': score,
+        'student': score.student,
+        'school': score.school or score.student.school,
+        'subject_marks_dict': subject_marks_dict,
+        'total_obtained': total_obtained,
+        'total_max': total_max,
+        'percentage': percentage,
+        'result_status': result_status,
+        'date': PRINT_DATE,
+    })
+
+
+def _prepare_salary_slip(t: SalaryTransaction):
+    return get_template('salary_slip_pdf.html').render({'t': t, 'school': t.school})
+
+
+def _prepare_admission_receipt(student: Member):
+    address = student.address[:50] + "..." if student.address and len(student.address) > 50 else student.address
+    labels = [
+        ("Admission Number:", student.admission_no),
+        ("Student Name:", f"{student.firstname} {student.lastname}"),
+        ("Class & Section:", str(student.student_class) if student.student_class else "N/A"),
+        ("Date of Birth:", str(student.dob) if student.dob else "N/A"),
+        ("Gender:", student.gender),
+        ("Father's Name:", student.father_name),
+        ("Mobile Number:", student.mobile_number),
+        ("Address:", address),
+        ("Admission Date:", str(student.joined_date)),
+    ]
+    return {
+        "student": [[label, str(value or "N/A")] for label, value in labels],
+        "fees": [
+            ["Total Fee:", f"Rs. {student.fee_total}"],
+            ["Amount Paid:", f"Rs. {student.fee_paid}"],
+            ["Balance Due:", f"Rs. {(student.fee_total or 0) - (student.fee_paid or 0)}"],
+        ],
+    }
+
+
+def _safe_name(*parts) -> str:
+    return "_".join(re.sub(r"[^A-Za-z0-9.-]+", "-", str(p)).strip("-") for p in parts if p not in (None, ""))
+
+
+@dataclass(frozen=True)
+class PdfKind:
+    queryset: object
+    prepare: object
+    render: object
+    archive_name: object = None  # obj -> file name inside a batch export
+
+
+KINDS = {
+    "receipt": PdfKind(
+        FeeTransaction.objects.select_related("student__school"), _prepare_receipt, _html_to_pdf,
+        lambda t: _safe_name(t.receipt_code, t.student.firstname, t.student.lastname) + ".pdf",
+    ),
+    "marksheet": PdfKind(
+        ExamScore.objects.select_related("student__school", "school"), _prepare_marksheet, _render_marksheet,
+        lambda s: _safe_name(s.student.roll_number or s.student_id, s.student.firstname, s.student.lastname, s.exam_name, s.pk) + ".pdf",
+    ),
+    "salary_slip": PdfKind(SalaryTransaction.objects.select_related("staff", "school"), _prepare_salary_slip, _html_to_pdf),
+    "admission_receipt": PdfKind(Member.objects.select_related("student_class"), _prepare_admission_receipt, _draw_admission_receipt),
+}
+
+
+@dataclass(frozen=True)
+class PdfDocument:
+    kind: str
+    object_id: int
+    payload: object
+
+    @property
+    def digest(self) -> str:
+        raw = self.payload if isinstance(self.payload, str) else json.dumps(self.payload, sort_keys=True)
+        return hashlib.sha256(f"{self.kind}\n{raw}".encode()).hexdigest()
+
+    @property
+    def path(self) -> str:
+        return f"{CACHE_ROOT}/{self.kind}/{self.object_id}/{self.digest}.pdf"
+
+
+def _get_pool() -> ProcessPoolExecutor | None:
+    global _pool
+    processes = int(getattr(settings, "PDF_RENDER_PROCESSES", 0))
+    if processes <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=processes)
+        return _pool
+
+
+@contextmanager
+def _export_pool():
+    """The shared render pool if configured, else one scoped to this export (None: render inline)."""
+    shared = _get_pool()
+    if shared is not None:
+        yield shared
+        return
+    processes = int(getattr(settings, "PDF_EXPORT_PROCESSES", 2))
+    if processes <= 1:
+        yield None
+        return
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        yield pool
+
+
+class _ZipSink(io.RawIOBase):
+    """Write-only, unseekable buffer for zipfile: what it writes is drained and yielded as it goes."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class PdfService:
+    @staticmethod
+    def document(kind: str, obj) -> PdfDocument:
+        """Build the document for obj (an instance of the kind's model)."""
+        return PdfDocument(kind, obj.pk, KINDS[kind].prepare(obj))
+
+    @staticmethod
+    def cached(doc: PdfDocument) -> bytes | None:
+        if not default_storage.exists(doc.path):
+            return None
+        with default_storage.open(doc.path, "rb") as fh:
+            return fh.read()
+
+    @staticmethod
+    def render(doc: PdfDocument) -> bytes:
+        """Render and store doc; returns the PDF bytes."""
+        renderer = KINDS[doc.kind].render
+        pool = _get_pool()
+        data = pool.submit(renderer, doc.payload).result() if pool else renderer(doc.payload)
+        PdfService._store(doc, data)
+        return data
+
+    @staticmethod
+    def _store(doc: PdfDocument, data: bytes) -> None:
+        """Save doc's PDF unless already stored, then drop the object's superseded versions."""
+        if default_storage.exists(doc.path):
+            return
+        default_storage.save(doc.path, ContentFile(data))
+        PdfService.invalidate(doc.kind, doc.object_id, keep=doc.digest)
+
+    @staticmethod
+    def render_object(kind: str, object_id: int) -> str | None:
+        """Load the object, render its current document if not stored yet; returns the path."""
+        obj = KINDS[kind].queryset.filter(pk=object_id).first()
+        if obj is None:
+            return None
+        doc = PdfService.document(kind, obj)
+        try:
+            if not default_storage.exists(doc.path):
+                PdfService.render(doc)
+        finally:
+            cache.delete(f"pdf-pending:{doc.path}")
+        return doc.path
+
+    @staticmethod
+    def invalidate(kind: str, object_id: int, keep: str = "") -> int:
+        """Delete every stored version of one object's document (except those of digest keep)."""
+        folder = f"{CACHE_ROOT}/{kind}/{object_id}"
+        try:
+            _, files = default_storage.listdir(folder)
+        except (FileNotFoundError, NotImplementedError):
+            return 0
+        files = [name for name in files if not (keep and name.startswith(keep))]
+        for name in files:
+            default_storage.delete(f"{folder}/{name}")
+        return len(files)
+
+    @staticmethod
+    def respond(request, kind: str, obj, filename: str, attachment: bool = False):
+        """
+        Serve obj's PDF: stored bytes when this exact content was rendered before,
+        otherwise queue the render and return the "preparing" page (HTTP 202), which
+        reloads this URL until the file is ready.
+        """
+        doc = PdfService.document(kind, obj)
+        data = PdfService.cached(doc)
+        if data is None:
+            if not getattr(settings, "CELERY_TASK_ALWAYS_EAGER", False):
+                from ..tasks import render_pdf_task
+                from ..utils import background
+
+                if cache.add(f"pdf-pending:{doc.path}", True, PENDING_TTL):
+                    background.submit(render_pdf_task, kind, obj.pk)
+                return render(request, "pdf_pending.html", {"filename": filename}, status=202)
+            data = PdfService.render(doc)
+
+        response = HttpResponse(data, content_type="application/pdf")
+        disposition = "attachment; " if attachment else ""
+        response["Content-Disposition"] = f'{disposition}filename="{filename}"'
+        return response
+
+
+    @staticmethod
+    def start_export(school, kind: str, object_ids, output: str = "zip", label: str = "", created_by=None) -> PdfExport:
+        """Record a batch export and hand it to render_pdf_export_task; poll the row for progress."""
+        object_ids = list(dict.fromkeys(object_ids))
+        export = PdfExport.objects.create(
+            school=school,
+            created_by=created_by,
+            kind=kind,
+            output=output,
+            label=label,
+            object_ids=object_ids,
+            total=len(object_ids),
+        )
+        from ..tasks import render_pdf_export_task
+        from ..utils import background
+
+        background.submit(render_pdf_export_task, export.pk)
+        return export
+
+    @staticmethod
+    def run_export(export_id: int, chunk_size: int = EXPORT_CHUNK_SIZE):
+        """
+        Render every document of an export, chunk by chunk: the chunk's rows are read and
+        prepared here, documents not already stored are rendered in parallel on worker
+        processes, and progress is committed per chunk. Resumable: a re-run starts after
+        the recorded documents. Merged-PDF exports are then assembled into merged_file.
+        """
+        export = PdfExport.objects.filter(pk=export_id).first()
+        if export is None or export.status == "Done":
+            return export
+        PdfExport.objects.filter(pk=export.pk).update(status="Running")
+        kind = KINDS[export.kind]
+        documents = list(export.documents)
+        try:
+            with _export_pool() as pool:
+                for start in range(export.rendered_count, export.total, chunk_size):
+                    ids = export.object_ids[start:start + chunk_size]
+                    rows = kind.queryset.filter(pk__in=ids, school_id=export.school_id).in_bulk()
+                    batch = [(kind.archive_name(rows[pk]), PdfService.document(export.kind, rows[pk])) for pk in ids if pk in rows]
+                    missing = [doc for _, doc in batch if not default_storage.exists(doc.path)]
+                    payloads = [doc.payload for doc in missing]
+                    rendered = pool.map(kind.render, payloads) if pool else map(kind.render, payloads)
+                    for doc, data in zip(missing, rendered):
+                        PdfService._store(doc, data)
+                    documents += [[name, PdfService._export_copy(export.pk, name, doc)] for name, doc in batch]
+                    PdfExport.objects.filter(pk=export.pk).update(
+                        documents=documents, rendered_count=F("rendered_count") + len(ids)
+                    )
+            if export.output == "pdf":
+                PdfService._merge(export, documents)
+                for _, path in documents:  # the merged file replaces the copies
+                    default_storage.delete(path)
+        except Exception:
+            logger.exception("PDF export %s failed", export.pk)
+            PdfExport.objects.filter(pk=export.pk).update(status="Failed")
+            raise
+        PdfExport.objects.filter(pk=export.pk).update(status="Done", finished_at=timezone.now())
+        export.refresh_from_db()
+        return export
+
+    @staticmethod
+    def _export_copy(export_id: int, name: str, doc: PdfDocument) -> str:
+        """Copy a stored document into the export's own folder; returns the copy's path."""
+        target = f"{EXPORT_ROOT}/{export_id}/{name}"
+        try:
+            with default_storage.open(doc.path, "rb") as src:
+                return default_storage.save(target, File(src))
+        except FileNotFoundError:  # invalidated right after it was stored: the export keeps this version
+            return default_storage.save(target, ContentFile(KINDS[doc.kind].render(doc.payload)))
+
+    @staticmethod
+    def _merge(export: PdfExport, documents) -> None:
+        from pypdf import PdfWriter
+
+        writer = PdfWriter()
+        for _, path in documents:
+            with default_storage.open(path, "rb") as fh:
+                writer.append(fh)  # pages are copied into the writer; the file is read, not loaded whole
+        with tempfile.TemporaryFile() as tmp:
+            writer.write(tmp)
+            writer.close()
+            tmp.seek(0)
+            export.merged_file.save(f"{export.get_kind_display()}_{export.pk}.pdf".replace(" ", "_"), File(tmp), save=False)
+        PdfExport.objects.filter(pk=export.pk).update(merged_file=export.merged_file.name)
+
+    @staticmethod
+    def iter_zip(documents):
+        """Yield a ZIP (stored, not recompressed: PDFs are already compressed) of the documents, block by block."""
+        sink = _ZipSink()
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as archive:
+            for name, path in documents:
+                with default_storage.open(path, "rb") as src, archive.open(name, "w") as dest:
+                    for block in iter(lambda: src.read(STREAM_BLOCK_SIZE), b""):
+                        dest.write(block)
+                        yield sink.drain()
+        yield sink.drain()
+
+
+@receiver(post_save, sender=FeeTransaction)
+@receiver(post_delete, sender=FeeTransaction)
+def _fee_transaction_pdf_stale(sender, instance, raw=False, **kwargs):
+    if not raw:
+        PdfService.invalidate("receipt", instance.pk)
+
+
+@receiver(post_save, sender=ExamScore)
+@receiver(post_delete, sender=ExamScore)
+def _exam_score_pdf_stale(sender, instance, raw=False, update_fields=None, **kwargs):
+    # generate_marksheet_pdf_task saves only generated_report; the marks are unchanged
+    if not raw and update_fields != frozenset({"generated_report"}):
+        PdfService.invalidate("marksheet", instance.pk)
+
+
+@receiver(post_save, sender=SalaryTransaction)
+@receiver(post_delete, sender=SalaryTransaction)
+def _salary_pdf_stale(sender, instance, raw=False, **kwargs):
+    if not raw:
+        PdfService.invalidate("salary_slip", instance.pk)
+
+
+@receiver(post_save, sender=Member)
+@receiver(post_delete, sender=Member)
+def _member_pdf_stale(sender, instance, raw=False, **kwargs):
+    if not raw:
+        PdfService.invalidate("admission_receipt", instance.pk)
@@ -0,0 +1,590 @@
+"""
+Bulk fixture engine behind seed_all_schools and the demo school generator.
+
+Rows are generated in memory and written with chunked bulk_create, one transaction per
+school, so seeding costs a few statements per table rather than one INSERT per row:
+
+    SchoolSeeder(school, students=20000, seed=7).run()
+
+Counts scale with the number of students (about 40 per section; fee payments, library
+loans, transport, exam scores and timetable grow in step). bulk_create sends no signals,
+so finish() rebuilds what the signal handlers would have kept: attendance rollups, the
+dashboard snapshot, the student search index and the notification counters.
+
+seed_schools() seeds several schools, in parallel worker processes if asked to.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, time, timedelta
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+
+from ..models import (
+    AcademicYear, AdmissionEnquiry, Attendance, Book, ClassRoom, ExamScore, ExamType, Expense,
+    FeeStructure, FeeTransaction, LibraryTransaction, Member, MemberProfile, Notice, Notification,
+    SalaryTransaction, School, Staff, StudentTransport, StudyMaterial, Subject, TimeSlot,
+    TimetableEntry, TransportRoute, UserProfile, search_text,
+)
+
+BATCH_SIZE = 2000
+MAX_STUDENTS = 100_000
+STUDENTS_PER_SECTION = 40
+
+FIRST_NAMES_MALE = [
+    "Arjun", "Rahul", "Vikram", "Amit", "Rohit", "Karan", "Varun", "Ravi",
+    "Sachin", "Ramesh", "Suresh", "Manoj", "Deepak", "Nitin", "Ajay", "Sunil",
+    "Prakash", "Anil", "Rajesh", "Sanjay", "Vivek", "Gaurav", "Aditya", "Kunal",
+    "Yash", "Ritvik", "Arnav", "Aarav", "Kabir", "Ishaan", "Dev", "Reyansh",
+]
+FIRST_NAMES_FEMALE = [
+    "Priya", "Sneha", "Anita", "Kavita", "Meera", "Pooja", "Neha", "Swati",
+    "Divya", "Kirti", "Pallavi", "Anjali", "Shweta", "Ritu", "Preeti", "Nidhi",
+    "Komal", "Simran", "Rekha", "Sapna", "Kavya", "Ishita", "Tanvi", "Nisha",
+    "Ananya", "Aisha", "Diya", "Isha", "Kiara", "Riya", "Saanvi", "Aaradhya",
+]
+LAST_NAMES = [
+    "Kumar", "Sharma", "Patel", "Singh", "Gupta", "Verma", "Yadav", "Reddy",
+    "Joshi", "Malhotra", "Nair", "Desai", "Iyer", "Kapoor", "Shah", "Rao",
+    "Mehta", "Pillai", "Sinha", "Chopra", "Dubey", "Mishra", "Jain", "Saxena",
+    "Bose", "Banerjee", "Chatterjee", "Mukherjee", "Das", "Roy",
+]
+ADDRESSES = [
+    "Sector 15, Block A, Gurgaon, Haryana - 122001",
+    "Sector 22, Rohini, Delhi - 110085",
+    "Koramangala 5th Block, Bangalore - 560034",
+    "Powai, Near IIT, Mumbai - 400076",
+    "Saket, Block C, New Delhi - 110017",
+    "Indiranagar, 100ft Road, Bangalore - 560038",
+    "Andheri West, Link Road, Mumbai - 400058",
+    "Karol Bagh, Delhi - 110005",
+    "Palam Vihar, Gurgaon - 122017",
+    "Jubilee Hills, Hyderabad - 500033",
+    "Salt Lake, Sector 5, Kolkata - 700091",
+    "Anna Nagar, Chennai - 600040",
+    "Vastrapur, Ahmedabad - 380015",
+    "MG Road, Pune - 411001",
+    "Civil Lines, Jaipur - 302006",
+]
+OCCUPATIONS = [
+    "Government Service", "Private Sector", "Business", "Doctor", "Engineer",
+    "Teacher", "Bank Officer", "CA", "Architect", "Software Professional",
+]
+RELIGIONS = ["Hindu", "Sikh", "Christian", "Muslim", "Buddhist", "Jain"]
+PREVIOUS_SCHOOLS = [
+    "St. Xavier's Academy", "Delhi Public School", "Kendriya Vidyalaya",
+    "DAV Public School", "Bharatiya Vidya Bhavan", "Navodaya Vidyalaya",
+]
+CITY_ROUTES = [
+    ("Central Route", "MH-12-AB", "Rajesh Kumar"),
+    ("East Zone Route", "MH-14-CD", "Amit Sharma"),
+    ("West Zone Route", "DL-01-EF", "Vikram Singh"),
+    ("North Route", "KA-01-GH", "Suresh Patel"),
+]
+STAFF = [
+    ("Principal", "Principal"),
+    ("Rahul", "Physics Teacher"),
+    ("Priya", "Mathematics Teacher"),
+    ("Amit", "Chemistry Teacher"),
+    ("Sneha", "English Teacher"),
+    ("Vikram", "Computer Teacher"),
+    ("Admin", "Administrator"),
+    ("Librarian", "Librarian"),
+    ("Transport", "Transport In-charge"),
+]
+BOOKS = [
+    ("Physics Class 10", "NCERT", "Physics"),
+    ("Chemistry Class 10", "NCERT", "Chemistry"),
+    ("Mathematics Class 10", "R.D. Sharma", "Mathematics"),
+    ("English Grammar", "Wren & Martin", "English"),
+    ("Computer Science", "Sumita Arora", "Computer"),
+    ("The Alchemist", "Paulo Coelho", "Fiction"),
+    ("Wings of Fire", "APJ Abdul Kalam", "Biography"),
+    ("Hindi Vyakaran", "NCERT", "Hindi"),
+    ("History of India", "NCERT", "History"),
+]
+NOTICES = [
+    ("Fee Due Feb 2026", "कृपया फरवरी शुल्क 10 फरवरी 2026 तक जमा करें। Late fine applicable."),
+    ("Sports Day", "Annual Sports Day on 15th March 2026. All students must participate."),
+    ("Parent-Teacher Meeting", "PTM on 20th Feb 2026, 10 AM to 2 PM. Parents requested to attend."),
+    ("Library New Arrivals", "New books added. Students can issue from tomorrow."),
+    ("Holiday List", "School will remain closed on 26th Jan and 15th Aug."),
+    ("Exam Schedule", "Final exam schedule will be displayed on notice board by 1st March."),
+]
+EXPENSES = [
+    ("Sports equipment", 15000),
+    ("Library books", 25000),
+    ("Lab chemicals", 12000),
+    ("Electricity bill", 8000),
+    ("Water bill", 3000),
+    ("Cleaning supplies", 5000),
+    ("Annual day decoration", 18000),
+]
+TIME_SLOTS = [
+    (time(8, 0), time(8, 45)),
+    (time(8, 45), time(9, 30)),
+    (time(9, 30), time(10, 15)),
+    (time(10, 15), time(11, 0)),
+    (time(11, 15), time(12, 0)),
+    (time(12, 0), time(12, 45)),
+]
+SUBJECTS = ["Maths", "Physics", "Chemistry", "English", "Hindi", "Computer"]
+EXAMS = ["Unit Test 1", "Mid-Term", "Unit Test 2", "Final Exam"]
+
+
+def bulk_insert(model, objs, batch_size: int = BATCH_SIZE, keep: bool = True, **options):
+    """
+    bulk_create an iterable of unsaved objects batch_size at a time. Returns the created
+    objects (pks set) when keep, else only how many were written, so a generator of
+    millions of rows never sits in memory at once.
+    """
+    created, written, chunk = [], 0, []
+    for obj in objs:
+        chunk.append(obj)
+        if len(chunk) >= batch_size:
+            saved = model.objects.bulk_create(chunk, **options)
+            created.extend(saved if keep else ())
+            written += len(saved)
+            chunk = []
+    if chunk:
+        saved = model.objects.bulk_create(chunk, **options)
+        created.extend(saved if keep else ())
+        written += len(saved)
+    return created if keep else written
+
+
+def finish_school(school_id: int, user_ids=()) -> None:
+    """Rebuild the derived data that per-row signals would have maintained."""
+    from .attendance import AttendanceService
+    from .dashboard import DashboardService
+    from .notifications import NotificationService
+    from .student_search import StudentSearchService
+
+    AttendanceService.rebuild_rollups(school_id)
+    DashboardService.rebuild(school_id)
+    StudentSearchService.invalidate(school_id)
+    NotificationService.invalidate_many(school_id, user_ids)
+
+
+def school_prefix(school) -> str:
+    """3-4 character prefix from the school code, for class names and admission numbers."""
+    code = (school.code or school.school_code or "SCH")[:6]
+    return code.replace("-", "")[:4].upper() or "SCH"
+
+
+def _section_label(n: int) -> str:
+    """0 -> A, 25 -> Z, 26 -> AA (spreadsheet-style)."""
+    label = ""
+    n += 1
+    while n:
+        n, rem = divmod(n - 1, 26)
+        label = chr(65 + rem) + label
+    return label
+
+
+def demo_password_hash(password: str = "demo123") -> str:
+    """Hash once, reuse for every seeded account (hashing per user dominates small seeds)."""
+    return make_password(password)
+
+
+def create_school_user(username: str, password_hash: str, school, role: str, **fields) -> User:
+    """A login for school with the given role (the post_save handler creates its UserProfile)."""
+    user = User.objects.create(username=username, password=password_hash, **fields)
+    # Through the cached profile: User's post_save re-saves it whenever the user is saved
+    profile = user.userprofile
+    profile.school, profile.role = school, role
+    profile.save(update_fields=["school", "role"])
+    return user
+
+
+class SchoolSeeder:
+    """Realistic data for every ERP module of one school, sized by the number of students."""
+
+    def __init__(self, school, students: int = 100, seed: int | None = None, batch_size: int = BATCH_SIZE, log=None):
+        if not 1 <= students <= MAX_STUDENTS:
+            raise ValueError(f"students must be between 1 and {MAX_STUDENTS}")
+        self.school = school
+        self.students = students
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+        self.scale = max(1.0, students / 100)  # the original fixture was sized for 100 students
+        self.prefix = school_prefix(school)
+        self.domain = school.code.replace("-", "")[:6].lower() if school.code else "school"
+        self.counts = {}
+
+    def _insert(self, model, objs, keep=True, **options):
+        result = bulk_insert(model, objs, self.batch_size, keep=keep, **options)
+        written = len(result) if keep else result
+        self.counts[model.__name__] = self.counts.get(model.__name__, 0) + written
+        return result
+
+    def run(self) -> dict:
+        """Seed everything in one transaction; returns rows written per model."""
+        with transaction.atomic():
+            classes = self.classes()
+            subjects = self.academics()
+            student_ids = self.students_and_profiles(classes)
+            staff = self.staff()
+            self.fees(classes, student_ids)
+            self.library(student_ids)
+            self.transport(student_ids)
+            self.attendance(student_ids)
+            self.exam_scores(student_ids)
+            self.office(staff)
+            self.timetable(classes, subjects, staff)
+            user_ids = self.notifications()
+            self.log("  Rebuilding rollups and dashboard...")
+            finish_school(self.school.id, user_ids)
+        return self.counts
+
+    # --- structure ---
+
+    def classes(self) -> list:
+        self.log(f"  Creating classes for {self.school.name}...")
+        p = self.prefix
+        wanted = [
+            (f"{p} 6", "A"), (f"{p} 7", "A"), (f"{p} 8", "A"), (f"{p} 9", "A"), (f"{p} 10", "A"),
+            (f"{p} 11", "Science"), (f"{p} 12", "Science"), (f"{p} 11", "Commerce"), (f"{p} 12", "Commerce"),
+        ]
+        # Larger schools get more sections (B, C, ... AA ...) of classes 6-10
+        extra = math.ceil(self.students / STUDENTS_PER_SECTION) - len(wanted)
+        for i in range(max(0, extra)):
+            wanted.append((f"{p} {6 + i % 5}", _section_label(1 + i // 5)))
+        existing = set(ClassRoom.objects.filter(school=self.school).values_list("name", "section"))
+        self._insert(ClassRoom, (ClassRoom(school=self.school, name=n, section=s) for n, s in wanted if (n, s) not in existing))
+        by_key = {(c.name, c.section): c for c in ClassRoom.objects.filter(school=self.school)}
+        return [by_key[key] for key in wanted]
+
+    def academics(self) -> list:
+        ay, _ = AcademicYear.objects.get_or_create(
+            school=self.school,
+            name="2025-26",
+            defaults={"start_date": date(2025, 4, 1), "end_date": date(2026, 3, 31), "is_active": True},
+        )
+        AcademicYear.objects.filter(school=self.school).exclude(id=ay.id).update(is_active=False)
+        subjects = [
+            Subject.objects.get_or_create(school=self.school, name=name, defaults={"code": name[:3].upper()})[0]
+            for name in SUBJECTS
+        ]
+        for name in ["Unit Test", "Mid-Term", "Final"]:
+            ExamType.objects.get_or_create(school=self.school, name=name)
+        return subjects
+
+    # --- students ---
+
+    def students_and_profiles(self, classes) -> list:
+        self.log(f"  Creating {self.students} students...")
+        rng, count = self.rng, self.students
+        base_admission = 1000 + Member.objects.filter(school=self.school).count()
+        # Every section gets its share; roll numbers run per section
+        per_class = math.ceil(count / len(classes))
+        student_ids = []
+        for start in range(0, count, self.batch_size):
+            members, profiles = [], []
+            for i in range(start, min(start + self.batch_size, count)):
+                gender = rng.choice(["Male", "Female"])
+                first = rng.choice(FIRST_NAMES_FEMALE if gender == "Female" else FIRST_NAMES_MALE)
+                last = rng.choice(LAST_NAMES)
+                admission_no = f"{self.prefix}2025{base_admission + i}"
+                members.append(Member(
+                    school=self.school,
+                    admission_no=admission_no,
+                    firstname=first,
+                    lastname=last,
+                    father_name=f"{rng.choice(FIRST_NAMES_MALE)} {rng.choice(LAST_NAMES)}",
+                    mobile_number=f"98{rng.randint(500000000, 999999999)}",
+                    email=f"{first.lower()}.{last.lower()}{i}@{self.domain}.edu.in",
+                    student_class=classes[i // per_class],
+                    roll_number=str(i % per_class + 1),
+                    gender=gender,
+                    dob=date(2008 + rng.randint(0, 5), rng.randint(1, 12), rng.randint(1, 25)),
+                    address=rng.choice(ADDRESSES),
+                    blood_group=rng.choice(["A+", "B+", "O+", "AB+", "A-", "B-", "O-"]),
+                    fee_total=22000,
+                    fee_paid=rng.randint(0, 22000),
+                    search_key=search_text(first, last, admission_no),
+                ))
+                profiles.append(dict(
+                    mother_name=f"{rng.choice(FIRST_NAMES_FEMALE)} {rng.choice(LAST_NAMES)}",
+                    mother_mobile=f"98{rng.randint(500000000, 999999999)}",
+                    father_occupation=rng.choice(OCCUPATIONS),
+                    mother_occupation=rng.choice(OCCUPATIONS),
+                    caste_category=rng.choice(["General", "OBC", "SC", "ST", "EWS"]),
+                    religion=rng.choice(RELIGIONS),
+                    previous_school=rng.choice(PREVIOUS_SCHOOLS) if rng.random() < 0.6 else None,
+                    previous_class=rng.choice(["5", "6", "7", "8"]) if rng.random() < 0.5 else None,
+                ))
+            members = self._insert(Member, members)
+            self._insert(MemberProfile, (MemberProfile(member_id=m.pk, **p) for m, p in zip(members, profiles)), keep=False)
+            student_ids.extend(m.pk for m in members)
+        return student_ids
+
+    def _sample(self, ids, k: int) -> list:
+        return self.rng.sample(ids, min(k, len(ids)))
+
+    def fees(self, classes, student_ids) -> None:
+        self.log("  Creating fee structures and transactions...")
+        rng = self.rng
+        existing = set(FeeStructure.objects.filter(school=self.school).values_list("class_room_id", "title"))
+        self._insert(FeeStructure, (
+            FeeStructure(school=self.school, class_room=c, title=f"{c.name} Annual Fee", amount=22000, due_date=date(2026, 4, 30))
+            for c in {c.pk: c for c in classes}.values()
+            if (c.pk, f"{c.name} Annual Fee") not in existing
+        ))
+        payers = self._sample(student_ids, len(student_ids) // 2 + 10)
+        self._insert(FeeTransaction, (
+            FeeTransaction(
+                student_id=sid,
+                school=self.school,
+                amount_paid=rng.choice([1000, 1500, 2000, 2500, 5000]),
+                month_year=f"{month} 2026",
+                payment_mode=rng.choice(["Cash", "UPI", "Bank Transfer"]),
+                status="Paid",
+            )
+            for sid in payers
+            for month in ["January", "February", "March", "April"]
+        ), keep=False)
+
+    def library(self, student_ids) -> None:
+        self.log("  Creating library books and transactions...")
+        rng = self.rng
+        copies = max(1, round(self.scale))
+        books = self._insert(Book, (
+            Book(
+                school=self.school,
+                title=title,
+                author=author,
+                isbn=f"ISBN-{self.prefix}-{rng.randint(1000000, 9999999)}",
+                category=category,
+                total_copies=1,
+                available_copies=rng.choice([0, 1]),
+            )
+            for title, author, category in BOOKS
+            for _ in range(rng.randint(2, 5) * copies)
+        ))
+        loans = min(round(45 * self.scale), len(books) * 3)
+
+        def rows():
+            for _ in range(loans):
+                issue_date = date.today() - timedelta(days=rng.randint(1, 30))
+                yield LibraryTransaction(
+                    school=self.school,
+                    student_id=rng.choice(student_ids),
+                    book=rng.choice(books),
+                    issue_date=issue_date,
+                    due_date=issue_date + timedelta(days=14),
+                    status=rng.choice(["Issued", "Returned"]),
+                    fine_amount=rng.choice([0, 0, 10, 20]),
+                )
+
+        self._insert(LibraryTransaction, rows(), keep=False)
+
+    def transport(self, student_ids) -> None:
+        self.log("  Creating transport routes and assignments...")
+        rng = self.rng
+        routes = self._insert(TransportRoute, (
+            TransportRoute(
+                school=self.school,
+                route_name=name,
+                vehicle_number=f"{vprefix}-{rng.randint(1000, 9999)}",
+                driver_name=driver,
+                driver_phone=f"98{rng.randint(500000000, 999999999)}",
+            )
+            for name, vprefix, driver in CITY_ROUTES
+        ))
+        riders = self._sample(student_ids, round(35 * self.scale))
+        self._insert(StudentTransport, (
+            StudentTransport(
+                school=self.school,
+                student_id=sid,
+                route=rng.choice(routes),
+                pickup_point=f"Stop {rng.randint(1, 10)}",
+                monthly_fee=rng.choice([1000, 1500, 2000]),
+            )
+            for sid in riders
+        ), keep=False)
+
+    def attendance(self, student_ids) -> None:
+        self.log("  Creating attendance records...")
+        rng = self.rng
+        days = [d for d in (date.today() - timedelta(days=n) for n in range(1, 19)) if d.weekday() < 5]
+        self._insert(Attendance, (
+            Attendance(
+                student_id=sid,
+                school=self.school,
+                date=day,
+                status=rng.choice(["Present", "Present", "Present", "Absent"]),
+            )
+            for sid in student_ids
+            for day in days
+        ), keep=False, ignore_conflicts=True)
+
+    def exam_scores(self, student_ids) -> None:
+        self.log("  Creating exam scores...")
+        rng = self.rng
+        self._insert(ExamScore, (
+            ExamScore(
+                student_id=sid,
+                school=self.school,
+                exam_name=exam,
+                maths=rng.randint(55, 100),
+                physics=rng.randint(50, 100),
+                chemistry=rng.randint(50, 100),
+                english=rng.randint(60, 100),
+                computer=rng.randint(65, 100),
+            )
+            for sid in self._sample(student_ids, round(75 * self.scale))
+            for exam in rng.sample(EXAMS, rng.randint(2, 3))
+        ), keep=False)
+
+    # --- staff and office ---
+
+    def staff(self) -> list:
+        self.log("  Creating staff...")
+        rng = self.rng
+        # One extra teacher per 300 students beyond the first 100
+        roles = STAFF + [("Teacher", "Subject Teacher")] * max(0, round((self.students - 100) / 300))
+
+        def rows():
+            for n, (first, designation) in enumerate(roles):
+                last = rng.choice(LAST_NAMES)
+                yield Staff(
+                    school=self.school,
+                    first_name=first,
+                    last_name=last,
+                    email=f"{first.lower().replace(' ', '.')}.{last.lower()}{n}@{self.domain}.edu.in",
+                    phone=f"98{rng.randint(500000000, 999999999)}",
+                    designation=designation,
+                    salary=rng.randint(28000, 65000),
+                    join_date=date(2023, rng.randint(1, 12), rng.randint(1, 28)),
+                    is_active=True,
+                )
+
+        staff = self._insert(Staff, rows())
+        self._insert(SalaryTransaction, (
+            SalaryTransaction(
+                school=self.school,
+                staff=st,
+                amount_paid=st.salary,
+                payment_date=date(2026, month, 5),
+                month_year=f"{month_name} 2026",
+                payment_mode=rng.choice(["Bank Transfer", "Cash", "Cheque"]),
+            )
+            for st in staff
+            for month, month_name in [(1, "January"), (2, "February"), (3, "March")]
+        ), keep=False)
+        return staff
+
+    def office(self, staff) -> None:
+        self.log("  Creating notices, expenses, study materials and enquiries...")
+        rng, p = self.rng, self.prefix
+        self._insert(Notice, (Notice(school=self.school, title=t, message=m) for t, m in NOTICES))
+        self._insert(Expense, (
+            Expense(school=self.school, description=d, amount=a, date=date.today() - timedelta(days=rng.randint(1, 60)))
+            for d, a in EXPENSES
+        ))
+        self._insert(StudyMaterial, (
+            StudyMaterial(
+                school=self.school,
+                title=title,
+                subject=subject,
+                class_name=class_name,
+                video_link="https://www.youtube.com/watch?v=example" if rng.choice([True, False]) else "",
+            )
+            for title, subject, class_name in [
+                ("Algebra Basics", "Mathematics", f"{p} 8"),
+                ("Light and Reflection", "Physics", f"{p} 10"),
+                ("Organic Chemistry Intro", "Chemistry", f"{p} 11"),
+                ("Essay Writing", "English", f"{p} 9"),
+                ("Python Basics", "Computer", f"{p} 10"),
+            ]
+        ))
+
+        def enquiries():
+            for i in range(round(12 * self.scale)):
+                gender = rng.choice(["Male", "Female"])
+                first = rng.choice(FIRST_NAMES_FEMALE if gender == "Female" else FIRST_NAMES_MALE)
+                yield AdmissionEnquiry(
+                    school=self.school,
+                    name=f"{first} {rng.choice(LAST_NAMES)}",
+                    phone=f"98{rng.randint(500000000, 999999999)}",
+                    email=f"enquiry{i}@{self.domain}.example.com",
+                    class_applying=rng.choice(["6", "7", "8", "9", "10"]),
+                    source=rng.choice(["Website", "Referral", "Walk-in", "Facebook", "Google"]),
+                    status=rng.choice(["New", "Contacted", "Visited", "Admitted", "Lost"]),
+                    notes="Interested in admission" if i % 2 else "",
+                )
+
+        self._insert(AdmissionEnquiry, enquiries(), keep=False)
+
+    def timetable(self, classes, subjects, staff) -> None:
+        self.log("  Creating timetable...")
+        rng = self.rng
+        slots = [
+            TimeSlot.objects.get_or_create(school=self.school, start_time=s, end_time=e, defaults={"order": order})[0]
+            for order, (s, e) in enumerate(TIME_SLOTS)
+        ]
+        teachers = [s for s in staff if "Teacher" in s.designation or s.designation == "Principal"]
+        taken = set(TimetableEntry.objects.filter(school=self.school).values_list("class_room_id", "day_of_week", "time_slot_id"))
+        timetabled = classes[:max(3, round(3 * self.scale))]
+        self._insert(TimetableEntry, (
+            TimetableEntry(
+                school=self.school,
+                class_room=c,
+                subject=rng.choice(subjects),
+                staff=rng.choice(teachers),
+                day_of_week=day,
+                time_slot=slot,
+            )
+            for c in timetabled
+            for day in range(1, 6)
+            for slot in slots[:5]
+            if (c.pk, day, slot.pk) not in taken
+        ), keep=False)
+
+    def notifications(self) -> list:
+        profile = UserProfile.objects.filter(school=self.school).first()
+        if not profile:
+            return []
+        self._insert(Notification, (
+            Notification(school=self.school, user_id=profile.user_id, title=title, message=message, read=False)
+            for title, message in [
+                (f"Welcome to {self.school.name} ERP", "Your school data has been seeded successfully."),
+                ("Fee reminder", "February fee due by 10th. Please collect from parents."),
+            ]
+        ))
+        return [profile.user_id]
+
+
+def _seed_one(school_id: int, students: int, seed: int | None, batch_size: int) -> tuple:
+    school = School.objects.get(pk=school_id)
+    counts = SchoolSeeder(school, students, seed=seed, batch_size=batch_size).run()
+    return school.name, counts
+
+
+def seed_schools(school_ids, students: int, workers: int = 1, seed: int | None = None, batch_size: int = BATCH_SIZE, log=None):
+    """
+    Seed each school (one transaction each). With workers > 1 the schools are seeded in
+    that many processes at once, which needs a database that takes concurrent writers
+    (PostgreSQL); yields (school name, counts) as each school finishes.
+    """
+    log = log or (lambda message: None)
+    seeds = {pk: (None if seed is None else seed + pk) for pk in school_ids}
+    if workers <= 1:
+        for pk in school_ids:
+            school = School.objects.get(pk=pk)
+            log(f"Seeding {school.name} ({school.code})...")
+            yield school.name, SchoolSeeder(school, students, seed=seeds[pk], batch_size=batch_size, log=log).run()
+        return
+    connections.close_all()  # forked workers must open their own connections
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+        futures = [pool.submit(_seed_one, pk, students, seeds[pk], batch_size) for pk in school_ids]
+        for future in futures:
+            yield future.result()
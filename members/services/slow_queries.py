@@ -0,0 +1,181 @@
+"""
+Slow-query sampler (opt-in: settings.SLOW_QUERY_MS > 0).
+
+SlowQueryMiddleware times every statement of a sampled request (SLOW_QUERY_SAMPLE_RATE)
+with connection.execute_wrapper. Statements that take SLOW_QUERY_MS or longer are kept
+in a ring buffer of the last SLOW_QUERY_BUFFER entries with:
+
+    fingerprint  the SQL with literals and IN lists collapsed, so repeats group together
+    frame        the members.views frame (file:line function) that issued it
+    source       the innermost members frame, when that is a service or model rather than the view
+    school, view the tenant code and URL name of the request
+
+Only the SQL text is kept, never its parameters. Like the request metrics, workers
+write their buffer to METRICS_DIR/slow-queries/<pid>.json (once at the end of each request
+that added to it) so the super-admin page and the dump_slow_queries command see every
+worker; without METRICS_DIR each process only knows its own.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from collections import deque
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+SQL_MAX_LENGTH = 4000
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.\"])-?\d+(?:\.\d+)?\b")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ROWS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_SPACE = re.compile(r"\s+")
+
+_buffer: deque | None = None
+_lock = threading.Lock()
+_dirty = False
+
+
+def fingerprint(sql: str) -> str:
+    """SQL with values replaced by ?, value lists by (...) and whitespace collapsed."""
+    text = _STRING.sub("?", sql).replace("%s", "?")
+    text = _NUMBER.sub("?", text)
+    text = _ROWS.sub("(...)", _LIST.sub("(...)", text))
+    return _SPACE.sub(" ", text).strip()
+
+
+def fingerprint_id(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()[:12]
+
+
+def _frames() -> tuple[str, str]:
+    """(members.views frame, innermost members frame) of the current stack, as "path:line function"."""
+    view = source = ""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("members.") and not module.startswith(("members.middleware", "members.services.slow_queries")):
+            where = f"{module.replace('.', '/')}.py:{frame.f_lineno} {frame.f_code.co_name}"
+            if not source:
+                source = where
+            if module.startswith("members.views."):
+                view = where
+                break
+        frame = frame.f_back
+    return view, source if source != view else ""
+
+
+def _get_buffer() -> deque:
+    global _buffer
+    if _buffer is None:
+        _buffer = deque(maxlen=getattr(settings, "SLOW_QUERY_BUFFER", 500))
+    return _buffer
+
+
+def record(sql: str, ms: float, school: str = "", view: str = "") -> None:
+    """Keep one slow statement (called from the execute wrapper, with the caller on the stack)."""
+    global _dirty
+    frame, source = _frames()
+    text = fingerprint(sql)
+    entry = {
+        "at": timezone.now().isoformat(),
+        "ms": round(ms, 2),
+        "fingerprint": text,
+        "id": fingerprint_id(text),
+        "sql": sql[:SQL_MAX_LENGTH],
+        "school": school,
+        "view": view,
+        "frame": frame,
+        "source": source,
+        "pid": os.getpid(),
+    }
+    with _lock:
+        _get_buffer().append(entry)
+        _dirty = True
+
+
+# --- sharing between worker processes ---
+
+
+def _directory() -> Path | None:
+    path = getattr(settings, "METRICS_DIR", "")
+    return Path(path) / "slow-queries" if path else None
+
+
+def flush() -> None:
+    global _dirty
+    directory = _directory()
+    if directory is None:
+        return
+    with _lock:
+        entries = list(_get_buffer())
+        _dirty = False
+    directory.mkdir(parents=True, exist_ok=True)
+    tmp = directory / f".{os.getpid()}.json.tmp"
+    tmp.write_text(json.dumps(entries))
+    os.replace(tmp, directory / f"{os.getpid()}.json")
+
+
+def flush_if_dirty() -> None:
+    """Write the buffer if statements were recorded since the last write (SlowQueryMiddleware, per request)."""
+    if _dirty and _directory() is not None:
+        flush()
+
+
+atexit.register(flush_if_dirty)
+
+
+def recent(school: str | None = None, min_ms: float = 0, limit: int | None = None) -> list:
+    """Slow statements of all workers, newest first."""
+    with _lock:
+        entries = list(_get_buffer())
+    directory = _directory()
+    if directory is not None and directory.is_dir():
+        own = f"{os.getpid()}.json"
+        for path in directory.glob("*.json"):
+            if path.name == own:
+                continue
+            try:
+                entries.extend(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue
+    entries = [e for e in entries if e["ms"] >= min_ms and (school is None or e["school"] == school)]
+    entries.sort(key=lambda e: e["at"], reverse=True)
+    return entries[:limit] if limit else entries
+
+
+def grouped(entries: list) -> list:
+    """One row per fingerprint (count, total/max/mean ms, schools, latest frame), slowest total first."""
+    groups = {}
+    for e in entries:  # newest first, so the first entry of a group is its latest
+        g = groups.get(e["id"])
+        if g is None:
+            g = groups[e["id"]] = {
+                "id": e["id"], "fingerprint": e["fingerprint"], "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "schools": set(), "frame": e["frame"], "source": e["source"], "view": e["view"], "last_at": e["at"],
+            }
+        g["count"] += 1
+        g["total_ms"] += e["ms"]
+        g["max_ms"] = max(g["max_ms"], e["ms"])
+        if e["school"]:
+            g["schools"].add(e["school"])
+    rows = sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True)
+    for g in rows:
+        g["total_ms"] = round(g["total_ms"], 2)
+        g["mean_ms"] = round(g["total_ms"] / g["count"], 2)
+        g["schools"] = sorted(g["schools"])
+    return rows
+
+
+def reset() -> None:
+    """Forget this process's samples (tests)."""
+    with _lock:
+        _get_buffer().clear()
@@ -0,0 +1,311 @@
+"""
+Bulk student import from a CSV or XLSX sheet (row 1 = headers, one student per row).
+
+Rows are streamed from the file and handled batch_size at a time: each batch is validated
+in memory against maps loaded once up front (classes, transport routes) and one set
+lookup per batch for admission numbers and Aadhaar values already taken, then inserted
+with bulk_create. Bad rows are reported with their sheet row number and left out; they
+never abort the rest of the batch.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Upper
+
+from ..models import ClassRoom, Member, MemberProfile, StudentTransport, TransportRoute, search_text
+
+BATCH_SIZE = 500
+MAX_ERRORS = 1000  # reported rows; further errors are only counted
+
+# Member field -> accepted header spellings (compared lower-case, spaces/underscores ignored)
+HEADERS = {
+    "admission_no": ("admission no", "admission number", "adm no"),
+    "firstname": ("first name", "firstname", "name"),
+    "lastname": ("last name", "lastname", "surname"),
+    "class_name": ("class",),
+    "section": ("section",),
+    "roll_number": ("roll no", "roll number", "roll"),
+    "mobile_number": ("mobile", "mobile number", "phone"),
+    "fee_total": ("total fee", "fee total"),
+    "fee_paid": ("paid fee", "fee paid", "paid"),
+    "father_name": ("father name", "father's name"),
+    "mother_name": ("mother name", "mother's name"),
+    "gender": ("gender",),
+    "dob": ("dob", "date of birth"),
+    "email": ("email",),
+    "address": ("address",),
+    "aadhaar_number": ("aadhaar", "aadhaar number", "aadhaar no"),
+    "route": ("transport route", "route"),
+    "pickup_point": ("pickup point",),
+}
+# Positional fallback (the column order shown on the import page) when row 1 is unlabeled.
+DEFAULT_ORDER = ["firstname", "lastname", "class_name", "section", "roll_number", "mobile_number", "fee_total", "fee_paid"]
+DATE_FORMATS = ("%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y", "%d.%m.%Y")
+
+
+def _key(header) -> str:
+    return re.sub(r"[\s_]+", " ", str(header or "").strip().lower())
+
+
+_ALIASES = {alias: name for name, aliases in HEADERS.items() for alias in aliases}
+
+
+@dataclass
+class StudentImportResult:
+    created: int = 0
+    classes_created: int = 0
+    transport_assigned: int = 0
+    error_count: int = 0
+    errors: list = field(default_factory=list)  # (sheet row number, message), at most MAX_ERRORS
+
+    def add_error(self, row: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append((row, message))
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # spreadsheet numbers: roll 12.0, mobile 9.87e9
+    return str(value).strip()
+
+
+def _date(value):
+    if value in (None, ""):
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(str(value).strip(), fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognised date {value!r} (use YYYY-MM-DD or DD-MM-YYYY)")
+
+
+def _amount(value, label: str) -> Decimal:
+    if value in (None, ""):
+        return Decimal("0")
+    try:
+        amount = Decimal(_text(value).replace(",", ""))
+    except InvalidOperation:
+        raise ValueError(f"{label} must be a number")
+    if amount < 0:
+        raise ValueError(f"{label} cannot be negative")
+    return amount
+
+
+def read_sheet(upload, filename: str | None = None):
+    """Yield the rows (lists of cell values) of an uploaded .csv or .xlsx, header row first."""
+    name = (filename or getattr(upload, "name", "") or "").lower()
+    if name.endswith(".csv"):
+        text = io.TextIOWrapper(upload, encoding="utf-8-sig", newline="")
+        yield from csv.reader(text)
+        return
+    if not name.endswith(".xlsx"):
+        raise ValueError("Upload a .xlsx or .csv file")
+    from openpyxl import load_workbook
+
+    wb = load_workbook(upload, read_only=True, data_only=True)
+    try:
+        for row in wb.active.iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        wb.close()
+
+
+class StudentImportService:
+    @staticmethod
+    def import_rows(school, rows, batch_size: int = BATCH_SIZE) -> StudentImportResult:
+        """Import students into school from an iterable of rows whose first row holds the headers."""
+        result = StudentImportResult()
+        rows = iter(rows)
+        header = next(rows, None)
+        if header is None:
+            raise ValueError("The file is empty")
+        columns = [_ALIASES.get(_key(h)) for h in header]
+        if "firstname" not in columns:
+            if any(columns):
+                raise ValueError("A 'First Name' column is required")
+            columns = DEFAULT_ORDER  # no recognised headers: assume the documented order
+
+        classes = {
+            (name.lower(), section.lower()): pk
+            for pk, name, section in ClassRoom.objects.filter(school=school).values_list("id", "name", "section")
+        }
+        routes = {name.strip().lower(): pk for pk, name in TransportRoute.objects.filter(school=school).values_list("id", "route_name")}
+        seen_admission, seen_aadhaar = set(), set()
+
+        batch = []
+        for number, raw in enumerate(rows, start=2):
+            values = {name: raw[i] for i, name in enumerate(columns) if name and i < len(raw)}
+            if not any(_text(v) for v in values.values()):
+                continue  # blank line
+            batch.append((number, values))
+            if len(batch) >= batch_size:
+                StudentImportService._import_batch(school, batch, classes, routes, seen_admission, seen_aadhaar, result)
+                batch = []
+        if batch:
+            StudentImportService._import_batch(school, batch, classes, routes, seen_admission, seen_aadhaar, result)
+
+        if result.created:
+            from .dashboard import DashboardService
+            from .student_search import StudentSearchService
+
+            # bulk_create sends no post_save
+            DashboardService.rebuild(school.id)
+            StudentSearchService.invalidate(school.id)
+        return result
+
+    @staticmethod
+    def _clean(values: dict, routes: dict) -> dict:
+        """Validate one row; returns Member field values plus class / route keys, or raises ValueError."""
+        data = {
+            name: _text(values.get(name)) or None
+            for name in ("admission_no", "firstname", "lastname", "roll_number", "mobile_number",
+                         "father_name", "mother_name", "email", "address", "aadhaar_number")
+        }
+        if not data["firstname"]:
+            raise ValueError("first name is required")
+        data["lastname"] = data["lastname"] or ""
+        gender = _text(values.get("gender")).capitalize() or "Male"
+        if gender in ("M", "F"):
+            gender = {"M": "Male", "F": "Female"}[gender]
+        if gender not in ("Male", "Female"):
+            raise ValueError(f"gender must be Male or Female, not {gender!r}")
+        data["gender"] = gender
+        data["dob"] = _date(values.get("dob"))
+        data["fee_total"] = _amount(values.get("fee_total"), "total fee")
+        data["fee_paid"] = _amount(values.get("fee_paid"), "paid fee")
+        if data["aadhaar_number"]:
+            data["aadhaar_number"] = data["aadhaar_number"].replace(" ", "")
+            if not re.fullmatch(r"\d{12}", data["aadhaar_number"]):
+                raise ValueError("Aadhaar must be 12 digits")
+        if data["mobile_number"] and len(data["mobile_number"]) > 15:
+            raise ValueError("mobile number is too long")
+        if data["email"]:
+            try:
+                validate_email(data["email"])
+            except ValidationError:
+                raise ValueError(f"invalid email {data['email']!r}")
+        for name, limit in (("admission_no", 50), ("roll_number", 20)):
+            if data[name] and len(data[name]) > limit:
+                raise ValueError(f"{name.replace('_', ' ')} is longer than {limit} characters")
+
+        class_name = _text(values.get("class_name"))
+        data["class_key"] = (class_name, _text(values.get("section")) or "A") if class_name else None
+        route = _text(values.get("route"))
+        if route:
+            if route.lower() not in routes:
+                raise ValueError(f"unknown transport route {route!r}")
+            data["route_id"] = routes[route.lower()]
+            data["pickup_point"] = _text(values.get("pickup_point"))
+        return data
+
+    @staticmethod
+    def _import_batch(school, batch, classes, routes, seen_admission, seen_aadhaar, result) -> None:
+        cleaned = []
+        for number, values in batch:
+            try:
+                cleaned.append((number, StudentImportService._clean(values, routes)))
+            except ValueError as e:
+                result.add_error(number, str(e))
+
+        # One lookup each for identifiers already in the database, then the in-file duplicates.
+        # Admission numbers compare case-insensitively, as in addrecord and check_admission_number.
+        admission_nos = {d["admission_no"].upper() for _, d in cleaned if d["admission_no"]}
+        aadhaars = {d["aadhaar_number"] for _, d in cleaned if d["aadhaar_number"]}
+        taken_admission = set(
+            Member.objects.filter(school=school)
+            .annotate(admission_key=Upper("admission_no"))
+            .filter(admission_key__in=admission_nos)
+            .values_list("admission_key", flat=True)
+        ) if admission_nos else set()
+        taken_aadhaar = set(
+            Member.objects.filter(aadhaar_number__in=aadhaars).values_list("aadhaar_number", flat=True)
+        ) if aadhaars else set()
+
+        rows = []
+        for number, data in cleaned:
+            adm, aadhaar = data["admission_no"], data["aadhaar_number"]
+            if adm and (adm.upper() in taken_admission or adm.upper() in seen_admission):
+                result.add_error(number, f"admission no {adm} already exists")
+                continue
+            if aadhaar and (aadhaar in taken_aadhaar or aadhaar in seen_aadhaar):
+                result.add_error(number, f"Aadhaar {aadhaar} already exists")
+                continue
+            if adm:
+                seen_admission.add(adm.upper())
+            if aadhaar:
+                seen_aadhaar.add(aadhaar)
+            rows.append((number, data))
+        if not rows:
+            return
+
+        with transaction.atomic():
+            # Classes named in the sheet but not yet set up are created, like addrecord does.
+            # Spellings differing only in case are one class (the first one in the sheet names it).
+            missing = {}
+            for _, d in rows:
+                key = d["class_key"]
+                if key and (key[0].lower(), key[1].lower()) not in classes:
+                    missing.setdefault((key[0].lower(), key[1].lower()), key)
+            if missing:
+                created = ClassRoom.objects.bulk_create(
+                    [ClassRoom(school=school, name=n, section=s) for n, s in sorted(missing.values())]
+                )
+                for room in created:
+                    classes[(room.name.lower(), room.section.lower())] = room.pk
+                result.classes_created += len(created)
+
+            members = []
+            for _, d in rows:
+                key = d["class_key"]
+                members.append(Member(
+                    school=school,
+                    student_class_id=classes[(key[0].lower(), key[1].lower())] if key else None,
+                    transport_mode="School Bus" if d.get("route_id") else "Self",
+                    search_key=search_text(d["firstname"], d["lastname"], d["admission_no"]),
+                    **{k: v for k, v in d.items() if k not in ("class_key", "route_id", "pickup_point", "mother_name")},
+                ))
+            saved = list(zip(rows, members))
+            try:
+                with transaction.atomic():
+                    Member.objects.bulk_create(members)
+            except IntegrityError:
+                # Someone else took an identifier meanwhile: insert one by one to pin it down.
+                saved = []
+                for (number, d), member in zip(rows, members):
+                    member.pk = None
+                    try:
+                        with transaction.atomic():
+                            member.save()
+                        saved.append(((number, d), member))
+                    except IntegrityError:
+                        result.add_error(number, "admission no or Aadhaar already exists")
+
+            MemberProfile.objects.bulk_create(
+                [MemberProfile(member=member, mother_name=d["mother_name"]) for (_, d), member in saved if d["mother_name"]]
+            )
+            transports = [
+                StudentTransport(school=school, student=member, route_id=d["route_id"], pickup_point=d["pickup_point"])
+                for (_, d), member in saved
+                if d.get("route_id")
+            ]
+            StudentTransport.objects.bulk_create(transports)
+            result.created += len(saved)
+            result.transport_assigned += len(transports)
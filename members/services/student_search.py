@@ -0,0 +1,172 @@
+"""
+Typeahead student search over Member.search_key ("firstname lastname admission_no",
+lower-case, accent-free; see models.search_text).
+
+Every word of the query must match the start of a word of the key, so "ra ku" finds
+"Ravi Kumar" and "adm 10" finds admission no ADM-1042. On PostgreSQL this is one
+LIKE query served by the trigram / pattern-ops indexes from migration 0046. Elsewhere
+(SQLite in development) each school's keys are held in a sorted in-memory word list that
+is searched by bisection and rebuilt when a student is saved or deleted.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ..models import Member, search_text
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+INDEX_MAX_AGE = 60  # seconds; also bounds staleness across worker processes
+RESULT_FIELDS = (
+    "id", "firstname", "lastname", "admission_no", "roll_number",
+    "student_class__name", "student_class__section", "fee_total", "fee_paid",
+)
+
+
+def _rank(key: str, terms: list) -> int:
+    """0: the key starts with the whole query, 1: with its first word, 2: matches elsewhere."""
+    if key.startswith(" ".join(terms)):
+        return 0
+    return 1 if key.startswith(terms[0]) else 2
+
+
+class _PrefixIndex:
+    """Sorted (word, student id) pairs for one school."""
+
+    def __init__(self, rows):
+        self.keys = {}
+        pairs = []
+        for pk, key in rows:
+            self.keys[pk] = key
+            pairs.extend((word, pk) for word in set(key.split()))
+        pairs.sort()
+        self.words = [w for w, _ in pairs]
+        self.ids = [pk for _, pk in pairs]
+        self.built_at = time.monotonic()
+
+    def _matching(self, prefix: str) -> set:
+        start = bisect.bisect_left(self.words, prefix)
+        end = bisect.bisect_left(self.words, prefix + "\uffff")
+        return set(self.ids[start:end])
+
+    def search(self, terms: list, limit: int, allowed=None) -> list:
+        found = None
+        for term in sorted(terms, key=len, reverse=True):  # longest term narrows most
+            found = self._matching(term) if found is None else found & self._matching(term)
+            if not found:
+                return []
+        if allowed is not None:
+            found &= allowed
+        return sorted(found, key=lambda pk: (_rank(self.keys[pk], terms), self.keys[pk], pk))[:limit]
+
+
+_indexes: dict = {}
+_lock = threading.Lock()
+
+
+def _version_key(school_id: int) -> str:
+    return f"student-search-version:{school_id}"
+
+
+class StudentSearchService:
+    @staticmethod
+    def search(school_id: int, query: str, limit: int = DEFAULT_LIMIT, class_id: int | None = None) -> list:
+        """Top matches for query as dicts (id, name, admission_no, roll_number, class, due)."""
+        terms = search_text(query).split()
+        if not terms:
+            return []
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        qs = Member.objects.filter(school_id=school_id)
+        if class_id:
+            qs = qs.filter(student_class_id=class_id)
+
+        if connections[qs.db].vendor == "postgresql":
+            for term in terms:
+                qs = qs.filter(Q(search_key__startswith=term) | Q(search_key__contains=f" {term}"))
+            rows = list(
+                qs.annotate(rank=Case(
+                    When(search_key__startswith=" ".join(terms), then=Value(0)),
+                    When(search_key__startswith=terms[0], then=Value(1)),
+                    default=Value(2),
+                    output_field=IntegerField(),
+                ))
+                .order_by("rank", "search_key", "id")
+                .values(*RESULT_FIELDS)[:limit]
+            )
+        else:
+            allowed = set(qs.values_list("id", flat=True)) if class_id else None
+            ids = StudentSearchService._index(school_id).search(terms, limit, allowed)
+            by_id = {row["id"]: row for row in Member.objects.filter(id__in=ids).values(*RESULT_FIELDS)}
+            rows = [by_id[pk] for pk in ids if pk in by_id]
+        return [StudentSearchService._result(row) for row in rows]
+
+    @staticmethod
+    def _result(row: dict) -> dict:
+        name = " ".join(p for p in (row["firstname"], row["lastname"]) if p)
+        cls = f"{row['student_class__name']} - {row['student_class__section']}" if row["student_class__name"] else ""
+        return {
+            "id": row["id"],
+            "name": name,
+            "admission_no": row["admission_no"] or "",
+            "roll_number": row["roll_number"] or "",
+            "class": cls,
+            "due": str((row["fee_total"] or 0) - (row["fee_paid"] or 0)),
+        }
+
+    @staticmethod
+    def _index(school_id: int) -> _PrefixIndex:
+        version = cache.get(_version_key(school_id), 0)
+        entry = _indexes.get(school_id)
+        if entry and entry[0] == version and time.monotonic() - entry[1].built_at < INDEX_MAX_AGE:
+            return entry[1]
+        with _lock:
+            index = _PrefixIndex(Member.objects.filter(school_id=school_id).values_list("id", "search_key").iterator(chunk_size=5000))
+            _indexes[school_id] = (version, index)
+        return index
+
+    @staticmethod
+    def invalidate(school_id: int | None) -> None:
+        """Drop the in-memory index of one school (after saves, deletes, bulk imports)."""
+        if school_id is None:
+            return
+        _indexes.pop(school_id, None)
+        try:
+            cache.incr(_version_key(school_id))
+        except ValueError:
+            cache.set(_version_key(school_id), 1, None)
+
+    @staticmethod
+    def refresh_keys(school_id: int, batch_size: int = 2000) -> int:
+        """Recompute search_key for rows written without save() (bulk loads); returns rows changed."""
+        changed, last_pk = 0, 0
+        qs = Member.objects.filter(school_id=school_id).order_by("pk").only("id", "firstname", "lastname", "admission_no", "search_key")
+        while True:
+            batch = list(qs.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            stale = []
+            for m in batch:
+                key = search_text(m.firstname, m.lastname, m.admission_no)
+                if key != m.search_key:
+                    m.search_key = key
+                    stale.append(m)
+            Member.objects.bulk_update(stale, ["search_key"])
+            changed += len(stale)
+            last_pk = batch[-1].pk
+        StudentSearchService.invalidate(school_id)
+        return changed
+
+
+@receiver(post_save, sender=Member)
+@receiver(post_delete, sender=Member)
+def _member_changed(sender, instance, **kwargs):
+    StudentSearchService.invalidate(instance.school_id)
@@ -1,7 +1,5 @@
 from celery import shared_task
-from django.template.loader import get_template
 from django.core.files.base import ContentFile
-from xhtml2pdf import pisa
 from .models import ExamScore, StudyMaterial
 
 @shared_task
@@ -11,36 +9,55 @@ def generate_marksheet_pdf_task(score_id):
     It generates the PDF and saves it to the database 
     so the user can download it later.
     """
+    from .services.pdf import PdfService
+
     try:
-        # 1. Fetch Data
-        score = ExamScore.objects.get(id=score_id)
-        
-        # 2. Calculate Logic (Same as before)
-        total_obtained = score.maths + score.physics + score.chemistry + score.english + score.computer
-        percentage = round((total_obtained / 500) * 100, 2)
-        
-        context = {
-            'score': score, 'student': score.student, 
-            'total_obtained': total_obtained, 'percentage': percentage,
-            'school': score.student.school
-        }
-
-        # 3. Render HTML
-        template = get_template('marksheet_pdf.html')
-        html = template.render(context)
-
-        # 4. Generate PDF
-        pdf_file = ContentFile(b'')
-        pisa_status = pisa.CreatePDF(html, dest=pdf_file)
-
-        if not pisa_status.err:
-            # Save the PDF to the model field
-            filename = f"Report_{score.student.firstname}_{score.exam_name}.pdf"
-            score.generated_report.save(filename, pdf_file)
-            score.save()
-            
-            print(f"✅ PDF Saved to Database: {filename}")
-            return f"Saved: {filename}"
-            
+        score = ExamScore.objects.select_related("student__school", "school").get(id=score_id)
     except ExamScore.DoesNotExist:
         return "Error: Score not found"
+
+    doc = PdfService.document("marksheet", score)
+    data = PdfService.cached(doc) or PdfService.render(doc)
+    filename = f"Report_{score.student.firstname}_{score.exam_name}.pdf"
+    score.generated_report.save(filename, ContentFile(data), save=False)
+    score.save(update_fields=["generated_report"])
+    return f"Saved: {filename}"
+
+
+@shared_task
+def render_pdf_task(kind, object_id):
+    """Render and store one document for PdfService (cache miss on a download)."""
+    from .services.pdf import PdfService
+
+    return PdfService.render_object(kind, object_id) or f"Error: {kind} {object_id} not found"
+
+
+@shared_task
+def render_pdf_export_task(export_id):
+    """Render the documents of one PdfExport (see PdfService.start_export)."""
+    from .services.pdf import PdfService
+
+    export = PdfService.run_export(export_id)
+    return f"{export.rendered_count}/{export.total}" if export else "Error: Export not found"
+
+
+@shared_task
+def deliver_notification_broadcast_task(broadcast_id):
+    """Write the Notification rows for one NotificationBroadcast (see NotificationService.broadcast)."""
+    from .services.notifications import NotificationService
+
+    broadcast = NotificationService.deliver_broadcast(broadcast_id)
+    return f"{broadcast.delivered_count}/{broadcast.total_recipients}" if broadcast else "Error: Broadcast not found"
+
+
+@shared_task
+def populate_demo_school_task(school_id):
+    """Fill a new demo school with sample data (see DemoDataGenerator.generate_data)."""
+    from .models import School
+    from .utils.demo_data_generator import DemoDataGenerator
+
+    school = School.objects.filter(pk=school_id, is_demo=True).first()
+    if school is None:
+        return "Error: Demo school not found"
+    result = DemoDataGenerator(school).generate_data()
+    return f"{result['students_count']} students, {result['staff_count']} staff"
@@ -4,8 +4,19 @@ register = template.Library()
 
 
 @register.simple_tag
-def pagination_query(request, page_number):
-    """Return query string for pagination, preserving existing GET params."""
+def pagination_query(request, page_number=None, cursor=None):
+    """
+    Return query string for pagination, preserving existing GET params.
+    Page-number lists pass page_number; keyset lists pass cursor= ("" for the first page).
+    """
     get = request.GET.copy()
-    get['page'] = page_number
+    if cursor is not None:
+        get.pop('page', None)
+        if cursor:
+            get['cursor'] = cursor
+        else:
+            get.pop('cursor', None)
+    else:
+        get.pop('cursor', None)
+        get['page'] = page_number
     return get.urlencode()
@@ -2,7 +2,7 @@
 from django.contrib.auth.models import User
 from django.test import TestCase
 
-from ..models import School, ClassRoom, Member, Attendance, Notice, Expense
+from ..models import School, ClassRoom, Member, MemberQuerySet, MemberProfile, LibraryTransaction, Book, Attendance, Notice, Expense
 
 
 class SchoolModelTest(TestCase):
@@ -51,6 +51,44 @@ class MemberModelTest(TestCase):
         self.assertEqual(m.firstname, "John")
         self.assertEqual(m.fee_total - m.fee_paid, 1000)
 
+    def test_profile_fields_read_and_write_through(self):
+        m = Member.objects.create(school=self.school, firstname="Asha", lastname="Rao", mother_name="Meera", annual_income=1000)
+        self.assertEqual(MemberProfile.objects.get(member=m).mother_name, "Meera")
+
+        plain = Member.objects.create(school=self.school, firstname="Bala", lastname="K")
+        self.assertEqual((plain.caste_category, plain.communication_consent), ("General", True))
+        self.assertFalse(MemberProfile.objects.filter(member=plain).exists())  # nothing set, no row
+
+        m = Member.objects.get(pk=m.pk)
+        m.fee_paid = 10
+        m.save(update_fields=["fee_paid"])  # profile untouched: no write
+        m.guardian_name = "Ravi"
+        m.save(update_fields=["guardian_name"])
+        m = Member.objects.select_related("profile").get(pk=m.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual((m.mother_name, m.guardian_name, m.fee_paid), ("Meera", "Ravi", 10))
+
+    def test_list_and_picker_projections(self):
+        cls = ClassRoom.objects.create(school=self.school, name="5", section="B")
+        m = Member.objects.create(school=self.school, firstname="Asha", lastname="Rao", student_class=cls, address="Long text")
+        Member.objects.create(school=self.school, firstname="Bala", lastname="K")
+
+        with self.assertNumQueries(1):
+            row = Member.objects.filter(school=self.school).for_list().get(pk=m.pk)
+            self.assertEqual((row.firstname, str(row.student_class), row.fee_paid), ("Asha", "5 - B", 0))
+        self.assertIn("address", row.get_deferred_fields())
+
+        with self.assertNumQueries(1):
+            rows = Member.objects.filter(school=self.school).for_picker()
+        self.assertEqual([(r.firstname, r.student_class) for r in rows], [("Asha", "5 - B"), ("Bala", "")])
+
+        book = Book.objects.create(school=self.school, title="B", author="A", total_copies=1, available_copies=1)
+        LibraryTransaction.objects.create(school=self.school, student=m, book=book, due_date="2030-01-01")
+        with self.assertNumQueries(1):
+            t = LibraryTransaction.objects.select_related("student").defer(*MemberQuerySet.related_defer("student")).get()
+            self.assertEqual(str(t.student), "Asha Rao")
+        self.assertEqual(t.student.get_deferred_fields() & {"firstname", "lastname"}, set())
+
 
 class AttendanceModelTest(TestCase):
     """Tests for Attendance model."""
@@ -79,3 +117,18 @@ class AttendanceModelTest(TestCase):
                 date=d,
                 status="Absent",
             )
+
+    def test_school_copied_from_student_on_save(self):
+        from datetime import date
+        row = Attendance.objects.create(student=self.student, date=date(2025, 2, 7), status="Present")
+        self.assertEqual(row.school_id, self.school.id)
+
+    def test_backfill_fills_missing_school(self):
+        from datetime import date
+        from io import StringIO
+        from django.core.management import call_command
+        row = Attendance.objects.create(student=self.student, date=date(2025, 2, 7), status="Present")
+        Attendance.objects.filter(pk=row.pk).update(school=None)
+        call_command("backfill_student_school", "--batch-size", "1", stdout=StringIO())
+        row.refresh_from_db()
+        self.assertEqual(row.school_id, self.school.id)
@@ -1,10 +1,38 @@
 """Service layer tests."""
-from datetime import date
+import gzip
+import io
+import shutil
+import tempfile
+import zipfile
+from datetime import date, datetime, timezone as dt_timezone
+from unittest.mock import patch
 
-from django.test import TestCase
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Q
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 
-from ..models import School, ClassRoom, Member, Book
+from ..models import (
+    School, ClassRoom, Member, Book, AcademicYear, FeeInstallment, FeePaymentAllocation,
+    Notification, NotificationBroadcast, DashboardSnapshot, LibraryTransaction, Attendance,
+    AttendanceMonthly, FeeTransaction, PdfExport, SchoolRestore, SchoolRestoreIdMap, StudentTransport,
+    TransportRoute, MemberProfile, ExamScore, LateFeePolicy, UserProfile,
+)
+from ..services.backup import BackupService
+from ..services.attendance import AttendanceService
+from ..services.dashboard import DashboardService
 from ..services.finance import FinanceService
+from ..services.notifications import NotificationService
+from ..services.pdf import PdfService
+from ..services.seeding import SchoolSeeder, create_school_user
+from ..services.student_import import StudentImportService, read_sheet
+from ..services.student_search import StudentSearchService
+from ..utils.aggregates import count_buckets, count_values
+from ..utils.keyset import KeysetPaginator
 
 
 class FinanceServiceTest(TestCase):
@@ -44,3 +72,572 @@ class FinanceServiceTest(TestCase):
                 amount=0,
                 mode="Cash",
             )
+
+
+class InstallmentEngineTest(TestCase):
+    """Tests for FinanceService.generate_installments."""
+
+    def setUp(self):
+        self.school = School.objects.create(
+            name="Test School",
+            address="123 Test St",
+            school_code="TEST001",
+            code="test",
+        )
+        AcademicYear.objects.create(
+            school=self.school,
+            name="2025-26",
+            start_date=date(2025, 4, 1),
+            end_date=date(2026, 3, 31),
+            is_active=True,
+        )
+        for i in range(3):
+            Member.objects.create(school=self.school, firstname=f"S{i}", lastname="X", fee_total=4000)
+
+    def test_creates_four_installments_per_student(self):
+        result = FinanceService.generate_installments(self.school.id, as_of=date(2025, 4, 1))
+        self.assertEqual(result.created, 12)
+        self.assertEqual(FeeInstallment.objects.filter(school=self.school).count(), 12)
+        self.assertEqual(FeeInstallment.objects.filter(school=self.school).first().principal_amount, 1000)
+
+    def test_rerun_is_idempotent(self):
+        FinanceService.generate_installments(self.school.id, as_of=date(2025, 4, 1))
+        result = FinanceService.generate_installments(self.school.id, as_of=date(2025, 4, 1))
+        self.assertEqual((result.created, result.updated), (0, 0))
+        self.assertEqual(FeeInstallment.objects.filter(school=self.school).count(), 12)
+
+    def test_rerun_with_late_fees_is_idempotent(self):
+        LateFeePolicy.objects.create(school=self.school, grace_days=5, per_day_amount="1.25", cap_amount="100.00")
+        FinanceService.generate_installments(self.school.id, as_of=date(2025, 12, 1))
+        result = FinanceService.generate_installments(self.school.id, as_of=date(2025, 12, 1))
+        self.assertEqual((result.created, result.updated), (0, 0))
+        self.assertTrue(FeeInstallment.objects.filter(school=self.school, late_fee_amount__gt=0).exists())
+
+    def test_collect_fee_allocates_oldest_installment_first(self):
+        student = Member.objects.filter(school=self.school).first()
+        FinanceService.collect_fee(
+            school_id=self.school.id,
+            student_id=student.id,
+            amount=1500,
+            mode="Cash",
+            date=date(2025, 4, 1),
+        )
+        q1, q2 = FeeInstallment.objects.filter(student=student).order_by("due_date")[:2]
+        self.assertEqual((q1.status, q1.paid_amount), ("Paid", 1000))
+        self.assertEqual((q2.status, q2.paid_amount), ("Partial", 500))
+        self.assertEqual(FeePaymentAllocation.objects.filter(installment__student=student).count(), 2)
+
+
+class NotificationSummaryTest(TransactionTestCase):
+    """Tests for the cached NotificationService.summary."""
+
+    def setUp(self):
+        self.school = School.objects.create(
+            name="Test School",
+            address="123 Test St",
+            school_code="TEST001",
+            code="test",
+        )
+        self.user = User.objects.create_user(username="parent", password="testpass123")
+        for i in range(3):
+            Notification.objects.create(school=self.school, user=self.user, title=f"N{i}", read=(i == 0))
+
+    def test_summary_counts_unread_and_is_cached(self):
+        summary = NotificationService.summary(self.school.id, self.user.id)
+        self.assertEqual(summary["unread_count"], 2)
+        self.assertEqual(len(summary["recent"]), 3)
+        with self.assertNumQueries(0):
+            NotificationService.summary(self.school.id, self.user.id)
+
+    def test_mark_read_invalidates(self):
+        NotificationService.summary(self.school.id, self.user.id)
+        n = Notification.objects.filter(user=self.user, read=False).first()
+        n.read = True
+        n.save(update_fields=["read"])
+        self.assertEqual(NotificationService.summary(self.school.id, self.user.id)["unread_count"], 1)
+        NotificationService.mark_all_read(self.school.id, self.user.id)
+        self.assertEqual(NotificationService.summary(self.school.id, self.user.id)["unread_count"], 0)
+
+    def test_broadcast_fans_out_and_invalidates(self):
+        other = User.objects.create_user(username="parent2", password="testpass123")
+        NotificationService.summary(self.school.id, self.user.id)
+        broadcast = NotificationService.broadcast(self.school, "Holiday", "School closed", [self.user.id, other.id, self.user.id])
+        self.assertEqual(broadcast.status, "Done")
+        self.assertEqual(broadcast.total_recipients, 2)
+        self.assertEqual(broadcast.delivered_count, 2)
+        self.assertEqual(Notification.objects.filter(title="Holiday").count(), 2)
+        self.assertEqual(NotificationService.summary(self.school.id, self.user.id)["unread_count"], 3)
+
+    def test_deliver_broadcast_in_chunks(self):
+        users = [User.objects.create_user(username=f"u{i}") for i in range(5)]
+        broadcast = NotificationBroadcast.objects.create(
+            school=self.school, title="Fees due", recipient_ids=[u.id for u in users], total_recipients=5
+        )
+        NotificationService.deliver_broadcast(broadcast.pk, chunk_size=2)
+        broadcast.refresh_from_db()
+        self.assertEqual((broadcast.status, broadcast.delivered_count), ("Done", 5))
+        self.assertEqual(Notification.objects.filter(title="Fees due").count(), 5)
+
+
+class DashboardSnapshotTest(TestCase):
+    """Tests for the signal-maintained DashboardSnapshot."""
+
+    def setUp(self):
+        self.school = School.objects.create(
+            name="Test School",
+            address="123 Test St",
+            school_code="TEST001",
+            code="test",
+        )
+        Member.objects.create(school=self.school, firstname="A", lastname="One", gender="Male", fee_total=1000)
+        DashboardService.get(self.school.id)
+
+    def assertMatchesRebuild(self):
+        snapshot = DashboardSnapshot.objects.get(school=self.school)
+        fields = ["total_students", "male_count", "female_count", "new_admissions", "fee_expected", "fee_collected", "books_issued"]
+        live = {f: getattr(snapshot, f) for f in fields}
+        rebuilt = DashboardService.rebuild(self.school.id)
+        self.assertEqual(live, {f: getattr(rebuilt, f) for f in fields})
+
+    def test_incremental_updates_match_rebuild(self):
+        student = Member.objects.create(school=self.school, firstname="B", lastname="Two", gender="Female", fee_total=500)
+        FinanceService.collect_fee(school_id=self.school.id, student_id=student.id, amount=200, mode="Cash", date=date.today())
+        snapshot = DashboardSnapshot.objects.get(school=self.school)
+        self.assertEqual((snapshot.total_students, snapshot.female_count), (2, 1))
+        self.assertEqual(float(snapshot.fee_collected), 200)
+        self.assertMatchesRebuild()
+
+        book = Book.objects.create(school=self.school, title="Maths", author="X", isbn="1")
+        tx = LibraryTransaction.objects.create(school=self.school, student=student, book=book, due_date=date.today())
+        self.assertEqual(DashboardSnapshot.objects.get(school=self.school).books_issued, 1)
+        tx.status = "Returned"
+        tx.save()
+        student.delete()
+        self.assertMatchesRebuild()
+        self.assertEqual(DashboardSnapshot.objects.get(school=self.school).total_students, 1)
+
+    def test_updates_apply_deltas_without_recounting(self):
+        student = Member.objects.get(school=self.school)
+        # Loaded before the payment: its fee_paid is stale, and a name edit must not undo the payment
+        FinanceService.collect_fee(school_id=self.school.id, student_id=student.id, amount=300, mode="Cash", date=date.today())
+        with CaptureQueriesContext(connection) as queries:
+            student.firstname = "Renamed"
+            student.save(update_fields=["firstname"])
+        self.assertFalse([q for q in queries if "dashboardsnapshot" in q["sql"].lower()])
+
+        student.gender = "Female"
+        student.fee_total = "1500"
+        student.save()
+        snapshot = DashboardSnapshot.objects.get(school=self.school)
+        self.assertEqual((snapshot.male_count, snapshot.female_count, float(snapshot.fee_expected)), (0, 1, 1500))
+        self.assertMatchesRebuild()
+
+
+class ConditionalAggregateTest(TestCase):
+    """Tests for members.utils.aggregates."""
+
+    def setUp(self):
+        self.school = School.objects.create(name="Test School", address="123 Test St", school_code="TEST001", code="test")
+        self.a = Member.objects.create(school=self.school, firstname="A", lastname="One")
+        self.b = Member.objects.create(school=self.school, firstname="B", lastname="Two")
+        for student, statuses in ((self.a, ["Present", "Present", "Absent"]), (self.b, ["Absent"])):
+            for day, status in enumerate(statuses, start=1):
+                Attendance.objects.create(student=student, date=date(2026, 1, day), status=status)
+
+    def test_count_values_single_query(self):
+        with self.assertNumQueries(1):
+            counts = count_values(Attendance.objects.all(), "status", ["Present", "Absent", "Late"])
+        self.assertEqual(counts, {"Present": 2, "Absent": 2, "Late": 0})
+
+    def test_count_values_grouped(self):
+        with self.assertNumQueries(1):
+            counts = count_values(Attendance.objects.all(), "status", ["Present", "Absent"], group_by="student_id")
+        self.assertEqual(counts, {self.a.id: {"Present": 2, "Absent": 1}, self.b.id: {"Present": 0, "Absent": 1}})
+
+    def test_count_buckets_with_total(self):
+        counts = count_buckets(Member.objects.filter(school=self.school), total=None, named_a=Q(firstname="A"))
+        self.assertEqual(counts, {"total": 2, "named_a": 1})
+
+
+class AttendanceBulkSaveTest(TestCase):
+    """Tests for AttendanceService.save_day."""
+
+    def setUp(self):
+        self.school = School.objects.create(name="Test School", address="123 Test St", school_code="TEST001", code="test")
+        self.classroom = ClassRoom.objects.create(school=self.school, name="5", section="A")
+        self.students = [
+            Member.objects.create(school=self.school, firstname=f"S{i}", lastname="X", student_class=self.classroom)
+            for i in range(3)
+        ]
+        self.day = date(2026, 2, 2)
+
+    def test_creates_updates_and_skips(self):
+        a, b, c = (s.id for s in self.students)
+        Attendance.objects.create(student_id=a, date=self.day, status="Present")
+        Attendance.objects.create(student_id=b, date=self.day, status="Present")
+        outsider = Member.objects.create(school=self.school, firstname="Other", lastname="Class")
+
+        result = AttendanceService.save_day(
+            self.school.id,
+            self.day,
+            {a: "Present", b: "Absent", c: "Late", outsider.id: "Present", 999999: "Absent"},
+            class_id=self.classroom.id,
+        )
+        self.assertEqual((result.created, result.updated, result.unchanged), (1, 1, 1))
+        self.assertEqual(sorted(result.skipped), sorted([outsider.id, 999999]))
+        self.assertEqual(
+            dict(Attendance.objects.filter(date=self.day).values_list("student_id", "status")),
+            {a: "Present", b: "Absent", c: "Late"},
+        )
+
+    def test_rollup_follows_saves_and_deletes(self):
+        a, b, _ = (s.id for s in self.students)
+        AttendanceService.save_day(self.school.id, self.day, {a: "Present", b: "Absent"})
+        AttendanceService.save_day(self.school.id, date(2026, 2, 3), {a: "Late", b: "Absent"})
+        Attendance.objects.create(student_id=a, date=date(2026, 3, 1), status="Present")
+        totals = AttendanceService.totals([a, b])
+        self.assertEqual(totals[a], {"present": 2, "absent": 0, "late": 1, "total": 3})
+        self.assertEqual(totals[b], {"present": 0, "absent": 2, "late": 0, "total": 2})
+
+        Attendance.objects.get(student_id=b, date=self.day).delete()
+        feb = AttendanceMonthly.objects.get(student_id=b, month=date(2026, 2, 1))
+        self.assertEqual((feb.absent, feb.total), (1, 1))
+
+        summary = AttendanceService.class_month_summary(self.school.id, self.classroom.id, date(2026, 2, 15))
+        self.assertEqual([row["total"] for row in summary], [2, 1, 0])
+
+        self.students[0].delete()  # cascade must not resurrect rollup rows
+        self.assertFalse(AttendanceMonthly.objects.filter(student_id=a).exists())
+
+
+class PdfCacheTest(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.school = School.objects.create(name="S", address="A", school_code="PDF1", code="pdf1")
+        self.student = Member.objects.create(school=self.school, firstname="Asha", lastname="K", fee_total=1000, fee_paid=0)
+        self.tx = FeeTransaction.objects.create(student=self.student, amount_paid=500, month_year="April 2026", payment_mode="Cash")
+
+    def test_render_is_stored_by_content_and_reused(self):
+        doc = PdfService.document("receipt", self.tx)
+        self.assertIsNone(PdfService.cached(doc))
+        data = PdfService.render(doc)
+        self.assertTrue(data.startswith(b"%PDF"))
+        self.assertEqual(PdfService.cached(PdfService.document("receipt", self.tx)), data)
+
+    def test_changed_inputs_get_a_new_path(self):
+        before = PdfService.document("receipt", self.tx).path
+        Member.objects.filter(pk=self.student.pk).update(fee_paid=500)
+        self.tx.refresh_from_db()
+        self.assertNotEqual(PdfService.document("receipt", self.tx).path, before)
+
+    def test_saving_source_row_removes_stored_files(self):
+        doc = PdfService.document("receipt", self.tx)
+        PdfService.render(doc)
+        self.tx.payment_mode = "UPI"
+        self.tx.save()
+        self.assertFalse(default_storage.exists(doc.path))
+
+    def test_new_version_replaces_superseded_file(self):
+        old = PdfService.document("receipt", self.tx)
+        PdfService.render(old)
+        Member.objects.filter(pk=self.student.pk).update(fee_paid=500)  # no signal: the old file stays until replaced
+        self.tx.refresh_from_db()
+        new = PdfService.document("receipt", self.tx)
+        PdfService.render(new)
+        self.assertTrue(default_storage.exists(new.path))
+        self.assertFalse(default_storage.exists(old.path))
+
+    def test_marksheet_path_does_not_change_with_the_date(self):
+        score = ExamScore.objects.create(student=self.student, exam_name="Term 1", maths=80)
+        with patch("django.utils.timezone.now", return_value=datetime(2026, 3, 1, 10, tzinfo=dt_timezone.utc)):
+            first = PdfService.document("marksheet", score).path
+        with patch("django.utils.timezone.now", return_value=datetime(2026, 3, 2, 10, tzinfo=dt_timezone.utc)):
+            self.assertEqual(PdfService.document("marksheet", score).path, first)
+
+    @override_settings(PDF_EXPORT_PROCESSES=1)
+    def test_export_renders_all_and_streams_zip(self):
+        second = FeeTransaction.objects.create(student=self.student, amount_paid=200, month_year="May 2026", payment_mode="UPI")
+        export = PdfExport.objects.create(school=self.school, kind="receipt", object_ids=[self.tx.pk, second.pk], total=2)
+        export = PdfService.run_export(export.pk, chunk_size=1)
+        self.assertEqual((export.status, export.rendered_count, len(export.documents)), ("Done", 2, 2))
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(PdfService.iter_zip(export.documents))))
+        self.assertEqual(archive.namelist(), [name for name, _ in export.documents])
+        self.assertTrue(archive.read(archive.namelist()[0]).startswith(b"%PDF"))
+
+    @override_settings(PDF_EXPORT_PROCESSES=1)
+    def test_finished_zip_export_survives_cache_invalidation(self):
+        export = PdfExport.objects.create(school=self.school, kind="receipt", object_ids=[self.tx.pk], total=1)
+        export = PdfService.run_export(export.pk)
+        self.tx.payment_mode = "UPI"
+        self.tx.save()  # deletes the receipt's cached file
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(PdfService.iter_zip(export.documents))))
+        self.assertTrue(archive.read(archive.namelist()[0]).startswith(b"%PDF"))
+
+    @override_settings(PDF_EXPORT_PROCESSES=1)
+    def test_merged_export_writes_one_pdf(self):
+        from pypdf import PdfReader
+
+        second = FeeTransaction.objects.create(student=self.student, amount_paid=200, month_year="May 2026", payment_mode="UPI")
+        export = PdfExport.objects.create(school=self.school, kind="receipt", output="pdf", object_ids=[self.tx.pk, second.pk], total=2)
+        export = PdfService.run_export(export.pk)
+        pages = sum(len(PdfReader(io.BytesIO(PdfService.render(PdfService.document("receipt", t)))).pages) for t in (self.tx, second))
+        with export.merged_file.open("rb") as fh:
+            self.assertEqual(len(PdfReader(fh).pages), pages)
+        self.assertFalse(any(default_storage.exists(path) for _, path in export.documents))
+
+
+class SchoolBackupTest(TestCase):
+    def setUp(self):
+        self.school = School.objects.create(name="Old", address="A", school_code="BK1", code="bk1")
+        self.classroom = ClassRoom.objects.create(school=self.school, name="5", section="A")
+        self.students = [
+            Member.objects.create(school=self.school, firstname=f"S{i}", lastname="X", student_class=self.classroom, fee_total=1000)
+            for i in range(3)
+        ]
+        Attendance.objects.create(student=self.students[0], date=date(2026, 2, 2), status="Present")
+        FeeTransaction.objects.create(student=self.students[1], amount_paid=300, month_year="April 2026", payment_mode="Cash")
+        School.objects.create(name="Other", address="B", school_code="BK2", code="bk2")
+
+    def _lines(self, **kwargs):
+        return b"".join(BackupService.iter_ndjson(self.school, **kwargs)).decode().splitlines()
+
+    def test_backup_resumes_after_a_row(self):
+        lines = self._lines(chunk_size=2)
+        member_lines = [i for i, line in enumerate(lines) if '"members.member"' in line]
+        self.assertEqual(len(member_lines), 3)
+        cut = member_lines[0]
+        pk = self.students[0].pk
+        rest = b"".join(BackupService.iter_ndjson(self.school, after=("members.member", pk))).decode().splitlines()
+        self.assertEqual(lines[:cut + 1] + rest, lines)
+
+    def test_gzip_round_trip_restores_with_new_ids(self):
+        data = gzip.decompress(b"".join(BackupService.iter_ndjson(self.school, compress=True)))
+        records = list(BackupService.read_records(data.decode().splitlines()))
+        restore = BackupService.start_restore(records[0][1], "bk1.ndjson.gz", code="bk1-copy", school_code="BK1C")
+        restore = BackupService.restore_records(restore, iter(records[1:]), batch_size=2)
+
+        copy = restore.school
+        self.assertEqual((restore.status, restore.rows_restored), ("Done", 6))
+        self.assertEqual(copy.name, "Old")
+        self.assertFalse(SchoolRestoreIdMap.objects.filter(restore=restore).exists())
+        self.assertEqual(Member.objects.filter(school=copy, student_class__school=copy).count(), 3)
+        tx = FeeTransaction.objects.get(school=copy)
+        self.assertEqual((tx.student.firstname, tx.student.school_id), ("S1", copy.pk))
+        self.assertTrue(AttendanceMonthly.objects.filter(student__school=copy).exists())
+        self.assertEqual(Member.objects.filter(school=self.school).count(), 3)  # source untouched
+
+    def test_interrupted_restore_resumes(self):
+        records = list(BackupService.read_records(self._lines()))
+        restore = BackupService.start_restore(records[0][1], "bk1.ndjson", code="bk1-copy", school_code="BK1C")
+        with self.assertRaises(ValueError):  # truncated: no end marker
+            BackupService.restore_records(restore, iter(records[1:4]), batch_size=1)
+        restore.refresh_from_db()
+        self.assertEqual((restore.status, restore.lines_done), ("Failed", 4))
+
+        restore = BackupService.restore_records(restore, iter(records[1:]), batch_size=1)
+        self.assertEqual(restore.status, "Done")
+        self.assertEqual(Member.objects.filter(school=restore.school).count(), 3)
+        self.assertEqual(SchoolRestore.objects.count(), 1)
+
+    def test_restore_next_to_the_original_clears_taken_aadhaar_numbers(self):
+        Member.objects.filter(pk=self.students[0].pk).update(aadhaar_number="123412341234")
+        records = list(BackupService.read_records(self._lines()))
+        restore = BackupService.start_restore(records[0][1], "bk1.ndjson", code="bk1-copy", school_code="BK1C")
+        restore = BackupService.restore_records(restore, iter(records[1:]), batch_size=1)
+
+        copy = Member.objects.get(school=restore.school, firstname="S0")
+        self.assertEqual(restore.status, "Done")
+        self.assertIsNone(copy.aadhaar_number)
+        self.assertEqual(restore.aadhaar_cleared, [copy.pk])
+        self.assertEqual(Member.objects.get(pk=self.students[0].pk).aadhaar_number, "123412341234")
+
+    def test_resume_from_a_header_only_partial_writes_one_header(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        output = f"{tmp}/bk1.ndjson"
+        with open(output + ".partial", "w") as fh:
+            fh.write(self._lines()[0] + "\n")
+        call_command("backup_school", "bk1", output=output, resume=True, stdout=io.StringIO())
+        with open(output) as fh:
+            lines = fh.read().splitlines()
+        self.assertEqual(lines, self._lines())
+
+    def test_restore_rejects_lines_that_are_not_rows(self):
+        records = list(BackupService.read_records(self._lines()))
+        restore = BackupService.start_restore(records[0][1], "bk1.ndjson", code="bk1-copy", school_code="BK1C")
+        with self.assertRaisesRegex(ValueError, "Line 2: not a backup row"):
+            BackupService.restore_records(restore, iter([(2, records[0][1])] + records[1:]))
+
+    def test_version_1_member_lines_restore_their_profile(self):
+        records = list(BackupService.read_records(self._lines()))
+        records[0][1]["version"] = 1
+        for _, record in records:
+            if record.get("model") == "members.member" and record["fields"]["firstname"] == "S0":
+                record["fields"].update(mother_name="Meera", sibling_in_school=True)
+        restore = BackupService.start_restore(records[0][1], "v1.ndjson", code="bk1-copy", school_code="BK1C")
+        restore = BackupService.restore_records(restore, iter(records[1:]))
+
+        copy = Member.objects.get(school=restore.school, firstname="S0")
+        self.assertEqual((copy.mother_name, copy.sibling_in_school, copy.nationality), ("Meera", True, "Indian"))
+        self.assertFalse(Member.objects.get(school=restore.school, firstname="S1").sibling_in_school)
+
+
+class StudentImportTest(TestCase):
+    def setUp(self):
+        self.school = School.objects.create(name="S", address="A", school_code="IMP1", code="imp1")
+        self.classroom = ClassRoom.objects.create(school=self.school, name="5", section="A")
+        self.route = TransportRoute.objects.create(school=self.school, route_name="North", vehicle_number="V1", driver_name="D", driver_phone="1")
+        Member.objects.create(school=self.school, firstname="Old", lastname="One", admission_no="A1", aadhaar_number="111122223333")
+
+    def test_imports_valid_rows_and_reports_the_rest(self):
+        csv_data = (
+            "First Name,Last Name,Class,Section,Admission No,Aadhaar,DOB,Total Fee,Transport Route\n"
+            "Asha,K,5,a,A2,,01-04-2015,1200,north\n"
+            "Ravi,M,6,B,A3,123456789012,,,\n"
+            ",Nameless,5,A,A4,,,,\n"
+            "Dup,Adm,5,A,A1,,,,\n"
+            "Dup,File,5,A,A3,,,,\n"
+            "Dup,Aadhaar,5,A,A5,1111 2222 3333,,,\n"
+            "Bad,Date,5,A,A6,,2015-31-12,,\n"
+            "Bad,Route,5,A,A7,,,,South\n"
+            "\n"
+            "Neha,S,,,,,,,\n"
+        )
+        result = StudentImportService.import_rows(self.school, read_sheet(io.BytesIO(csv_data.encode()), "students.csv"), batch_size=3)
+
+        self.assertEqual((result.created, result.classes_created, result.transport_assigned), (3, 1, 1))
+        self.assertEqual([row for row, _ in result.errors], [4, 5, 6, 7, 8, 9])
+        asha = Member.objects.get(admission_no="A2")
+        self.assertEqual((asha.student_class_id, asha.dob, asha.fee_total), (self.classroom.id, date(2015, 4, 1), 1200))
+        self.assertEqual(StudentTransport.objects.get(student=asha).route_id, self.route.id)
+        self.assertEqual(Member.objects.get(admission_no="A3").student_class.name, "6")
+        self.assertIsNone(Member.objects.get(firstname="Neha").student_class_id)
+        self.assertEqual(DashboardSnapshot.objects.get(school=self.school).total_students, 4)
+
+    def test_class_spellings_differing_in_case_create_one_class(self):
+        csv_data = "First Name,Last Name,Class,Section\nAsha,K,10,a\nRavi,M,10,A\n"
+        result = StudentImportService.import_rows(self.school, read_sheet(io.BytesIO(csv_data.encode()), "students.csv"))
+        self.assertEqual((result.created, result.classes_created), (2, 1))
+        self.assertEqual(Member.objects.filter(school=self.school, student_class__name="10").values("student_class").distinct().count(), 1)
+
+    def test_admission_numbers_are_compared_without_case(self):
+        csv_data = "First Name,Last Name,Admission No\nTaken,X,a1\nFirst,Y,b7\nSecond,Z,B7\n"
+        result = StudentImportService.import_rows(self.school, read_sheet(io.BytesIO(csv_data.encode()), "students.csv"))
+        self.assertEqual(result.created, 1)
+        self.assertEqual([row for row, _ in result.errors], [2, 4])
+
+    def test_unlabeled_xlsx_uses_documented_column_order(self):
+        from openpyxl import Workbook
+
+        wb = Workbook()
+        wb.active.append(["Naam", "Upnaam", "Kaksha", "Varg"])
+        wb.active.append(["Asha", "K", 5, "A", 12.0, 9876543210.0, 1000, 200])
+        buf = io.BytesIO()
+        wb.save(buf)
+        buf.seek(0)
+        result = StudentImportService.import_rows(self.school, read_sheet(buf, "students.xlsx"))
+        self.assertEqual(result.created, 1)
+        asha = Member.objects.get(firstname="Asha")
+        self.assertEqual((asha.student_class_id, asha.roll_number, asha.mobile_number), (self.classroom.id, "12", "9876543210"))
+
+
+class KeysetPaginatorTest(TestCase):
+    def setUp(self):
+        self.school = School.objects.create(name="S", address="A", school_code="KS1", code="ks1")
+        # 12 rows over 4 days, 3 per day, so pages split inside a day
+        for i in range(12):
+            student = Member.objects.create(school=self.school, firstname=f"S{i:02}", lastname="X")
+            Attendance.objects.create(student=student, date=date(2026, 2, 1 + i // 3), status="Present")
+
+    def _paginator(self, count="exact"):
+        return KeysetPaginator(Attendance.objects.filter(school=self.school), 5, ordering=("-date", "id"), count=count)
+
+    def test_walks_forward_and_back_without_gaps(self):
+        expected = list(Attendance.objects.filter(school=self.school).order_by("-date", "id").values_list("id", flat=True))
+        pages, cursor = [], None
+        while True:
+            page = self._paginator().get_page(cursor)
+            pages.append(page)
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+        self.assertEqual([p.number for p in pages], [1, 2, 3])
+        self.assertEqual([o.id for p in pages for o in p], expected)
+
+        back = self._paginator().get_page(pages[2].previous_cursor)
+        self.assertEqual(([o.id for o in back], back.number), ([o.id for o in pages[1]], 2))
+        self.assertEqual(pages[1].previous_cursor, "")
+
+    def test_last_page_and_totals(self):
+        first = self._paginator().get_page(None)
+        self.assertEqual((first.paginator.count, first.paginator.num_pages), (12, 3))
+        last = self._paginator().get_page(first.last_cursor)
+        self.assertEqual((last.number, len(last), last.has_next()), (3, 2, False))
+        self.assertIsNone(self._paginator(count=None).get_page(None).last_cursor)
+        self.assertEqual(self._paginator().get_page("not-a-cursor").number, 1)
+
+
+class StudentSearchTest(TestCase):
+    def setUp(self):
+        self.school = School.objects.create(name="S", address="A", school_code="SR1", code="sr1")
+        self.classroom = ClassRoom.objects.create(school=self.school, name="5", section="A")
+        self.ravi = Member.objects.create(school=self.school, firstname="Ravi", lastname="Kumar", admission_no="ADM-1042", student_class=self.classroom)
+        Member.objects.create(school=self.school, firstname="Rávya", lastname="Sharma", admission_no="ADM-2001")
+        Member.objects.create(school=self.school, firstname="Kumar", lastname="Ravindran", admission_no="ADM-3001")
+        other = School.objects.create(name="O", address="B", school_code="SR2", code="sr2")
+        Member.objects.create(school=other, firstname="Ravi", lastname="Other")
+
+    def _names(self, query, **kwargs):
+        return [r["name"] for r in StudentSearchService.search(self.school.id, query, **kwargs)]
+
+    def test_word_prefixes_accents_and_admission_numbers(self):
+        self.assertEqual(self.ravi.search_key, "ravi kumar adm 1042")
+        self.assertEqual(self._names("ra"), ["Ravi Kumar", "Rávya Sharma", "Kumar Ravindran"])
+        self.assertEqual(self._names("rav ku"), ["Ravi Kumar", "Kumar Ravindran"])
+        self.assertEqual(self._names("adm-10"), ["Ravi Kumar"])
+        self.assertEqual(self._names("ra", class_id=self.classroom.id, limit=1), ["Ravi Kumar"])
+        self.assertEqual(self._names("zzz"), [])
+        self.assertEqual(StudentSearchService.search(self.school.id, "ravi k")[0]["class"], "5 - A")
+
+    def test_saves_and_deletes_refresh_the_index(self):
+        self.assertEqual(self._names("nikhil"), [])
+        self.ravi.firstname = "Nikhil"
+        self.ravi.save(update_fields=["firstname"])
+        self.assertEqual(self._names("nikhil"), ["Nikhil Kumar"])
+        self.ravi.delete()
+        self.assertEqual(self._names("nikhil"), [])
+
+
+class SchoolSeederTest(TestCase):
+    def _seed(self, code, students):
+        school = School.objects.create(name=code, address="A", school_code=code.upper(), code=code)
+        with CaptureQueriesContext(connection) as queries:
+            counts = SchoolSeeder(school, students, seed=3, batch_size=50).run()
+        return school, counts, len(queries)
+
+    def test_seeds_every_module_in_bulk(self):
+        school, counts, queries = self._seed("small", 30)
+        self.assertEqual(Member.objects.filter(school=school).count(), 30)
+        self.assertEqual(MemberProfile.objects.filter(member__school=school).count(), 30)
+        self.assertFalse(Member.objects.filter(school=school, search_key="").exists())
+        self.assertFalse(Attendance.objects.filter(student__school=school, school__isnull=True).exists())
+        self.assertTrue(ExamScore.objects.filter(school=school).exists())
+        self.assertTrue(AttendanceMonthly.objects.filter(school=school).exists())
+        self.assertEqual(DashboardSnapshot.objects.get(school=school).total_students, 30)
+        self.assertEqual(counts["Member"], 30)
+
+        # Three times the students: more rows per INSERT batch, not more statements per row
+        _, _, bigger = self._seed("large", 90)
+        self.assertLess(bigger - queries, 40)
+
+    def test_seeded_login_keeps_its_role(self):
+        school = School.objects.create(name="Seeded", address="A", school_code="SEED1", code="seed1")
+        user = create_school_user("seed1_teacher_1", make_password("pw-123"), school, "TEACHER")
+        self.assertTrue(Client().login(username="seed1_teacher_1", password="pw-123"))  # saves last_login
+        user.save()
+        profile = UserProfile.objects.get(user=user)
+        self.assertEqual((profile.role, profile.school_id), ("TEACHER", school.pk))
@@ -1,9 +1,29 @@
 """View and access control tests."""
+import io
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import date
+from unittest.mock import patch
+
 from django.contrib.auth.models import User
-from django.test import Client, TestCase
-from django.urls import reverse
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import resolve, reverse
 
-from ..models import School, UserProfile
+from ..models import (
+    School, UserProfile, ClassRoom, Member, Attendance, FeeTransaction, Notification, PdfExport, StudyMaterial,
+)
+from ..management.commands.benchmark_views import bench_users, scenarios
+from ..services import metrics as request_metrics
+from ..services import slow_queries as slow_query_log
+from ..services.finance import FinanceService
+from ..services.seeding import SchoolSeeder
+from ..utils.query_budget import QueryBudget, QueryBudgetExceeded
 
 
 class DashboardAccessTest(TestCase):
@@ -33,3 +53,334 @@ class DashboardAccessTest(TestCase):
         client.force_login(self.user)
         resp = client.get("/", HTTP_HOST="test.localhost:8000")
         self.assertEqual(resp.status_code, 200)
+
+
+class AttendanceBulkSaveViewTest(TestCase):
+    """JSON bulk attendance endpoint."""
+
+    def setUp(self):
+        self.school = School.objects.create(name="Test School", address="123 Test St", school_code="TEST001", code="test")
+        self.classroom = ClassRoom.objects.create(school=self.school, name="5", section="A")
+        self.student = Member.objects.create(school=self.school, firstname="A", lastname="B", student_class=self.classroom)
+        self.user = User.objects.create_user(username="teacher", password="testpass123")
+        UserProfile.objects.filter(user=self.user).update(school=self.school, role="TEACHER")
+
+    def test_saves_class_in_one_call(self):
+        client = Client()
+        client.force_login(self.user)
+        payload = {"date": "2026-02-02", "class_id": self.classroom.id, "records": [{"student_id": self.student.id, "status": "Absent"}]}
+        resp = client.post(
+            reverse("attendance_bulk_save"), data=json.dumps(payload), content_type="application/json", HTTP_HOST="test.localhost:8000"
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["created"], 1)
+        self.assertEqual(Attendance.objects.get(student=self.student).status, "Absent")
+
+    def test_rejects_malformed_body(self):
+        client = Client()
+        client.force_login(self.user)
+        resp = client.post(reverse("attendance_bulk_save"), data="{}", content_type="application/json", HTTP_HOST="test.localhost:8000")
+        self.assertEqual(resp.status_code, 400)
+
+    def test_register_page_renders_saved_statuses(self):
+        Attendance.objects.create(student=self.student, date="2026-02-02", status="Absent")
+        client = Client()
+        client.force_login(self.user)
+        resp = client.get(
+            "/attendance/", {"class_id": self.classroom.id, "date": "2026-02-02"}, HTTP_HOST="test.localhost:8000"
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertTemplateUsed(resp, "attendance.html")
+        self.assertEqual([s.current_status for s in resp.context["students"]], ["Absent"])
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True, PDF_EXPORT_PROCESSES=1)
+class ReceiptExportViewTest(TestCase):
+    """Batch receipt export: start, then stream the ZIP."""
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=media)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.school = School.objects.create(name="Test School", address="123 Test St", school_code="TEST001", code="test")
+        student = Member.objects.create(school=self.school, firstname="A", lastname="B", fee_total=1000)
+        self.tx = FeeTransaction.objects.create(student=student, amount_paid=100, month_year="June 2026", payment_mode="Cash")
+        self.user = User.objects.create_user(username="accountant", password="testpass123")
+        UserProfile.objects.filter(user=self.user).update(school=self.school, role="ACCOUNTANT")
+        self.client = Client(HTTP_HOST="test.localhost:8000")
+        self.client.force_login(self.user)
+
+    def test_export_then_download_zip(self):
+        day = self.tx.payment_date.isoformat()
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(reverse("receipt_export"), {"start_date": day, "end_date": day, "output": "zip"})
+        export = PdfExport.objects.get(school=self.school)
+        self.assertRedirects(resp, reverse("pdf_export_detail", args=[export.pk]), fetch_redirect_response=False)
+        self.assertEqual(self.client.get(reverse("pdf_export_status", args=[export.pk])).json()["status"], "Done")
+        resp = self.client.get(reverse("pdf_export_download", args=[export.pk]))
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(resp.streaming_content)))
+        self.assertEqual(len(archive.namelist()), 1)
+
+
+class SpreadsheetExportViewTest(TestCase):
+    """Streaming CSV / XLSX exports."""
+
+    def setUp(self):
+        self.school = School.objects.create(name="Test School", address="123 Test St", school_code="TEST001", code="test")
+        self.classroom = ClassRoom.objects.create(school=self.school, name="5", section="A")
+        self.student = Member.objects.create(school=self.school, firstname="Ravi", lastname="K", student_class=self.classroom)
+        Attendance.objects.create(student=self.student, date="2026-02-02", status="Present")
+        self.user = User.objects.create_user(username="owner", password="testpass123")
+        UserProfile.objects.filter(user=self.user).update(school=self.school, role="OWNER")
+        self.client = Client(HTTP_HOST="test.localhost:8000")
+        self.client.force_login(self.user)
+
+    def test_student_register_csv(self):
+        resp = self.client.get(reverse("export_students"), {"format": "csv"})
+        lines = b"".join(resp.streaming_content).decode("utf-8-sig").splitlines()
+        self.assertEqual(lines[0].split(",")[:3], ["Admission No", "Roll No", "First Name"])
+        self.assertIn("Ravi", lines[1])
+        self.assertIn("5 - A", lines[1])
+
+    def test_attendance_xlsx(self):
+        from openpyxl import load_workbook
+
+        resp = self.client.get(reverse("export_attendance"), {"class_id": self.classroom.id})
+        rows = list(load_workbook(io.BytesIO(b"".join(resp.streaming_content))).active.values)
+        self.assertEqual(rows[0][0], "Date")
+        self.assertEqual(rows[1][3:], ("Ravi K", "5 - A", "Present"))
+
+
+class SchoolBackupViewTest(TestCase):
+    """Streaming NDJSON backup download."""
+
+    def setUp(self):
+        self.school = School.objects.create(name="Test School", address="123 Test St", school_code="TEST001", code="test")
+        self.student = Member.objects.create(school=self.school, firstname="Ravi", lastname="K")
+        self.user = User.objects.create_user(username="owner", password="testpass123")
+        UserProfile.objects.filter(user=self.user).update(school=self.school, role="OWNER")
+        self.client = Client(HTTP_HOST="test.localhost:8000")
+        self.client.force_login(self.user)
+
+    def test_streams_ndjson_and_resumes(self):
+        resp = self.client.get(reverse("school_backup_json"))
+        lines = [json.loads(line) for line in b"".join(resp.streaming_content).splitlines()]
+        self.assertEqual(lines[0]["school"]["code"], "test")
+        self.assertEqual(lines[-1], {"end": True})
+        self.assertIn({"model": "members.member", "pk": self.student.pk}, [{k: r.get(k) for k in ("model", "pk")} for r in lines])
+
+        resp = self.client.get(reverse("school_backup_json"), {"after": f"members.member:{self.student.pk}"})
+        self.assertNotIn(b'"members.member"', b"".join(resp.streaming_content))
+        self.assertEqual(self.client.get(reverse("school_backup_json"), {"after": "nope"}).status_code, 400)
+
+
+class StudentImportViewTest(TestCase):
+    """Bulk student import upload."""
+
+    def setUp(self):
+        self.school = School.objects.create(name="Test School", address="123 Test St", school_code="TEST001", code="test")
+        self.user = User.objects.create_user(username="owner", password="testpass123")
+        UserProfile.objects.filter(user=self.user).update(school=self.school, role="OWNER")
+        self.client = Client(HTTP_HOST="test.localhost:8000")
+        self.client.force_login(self.user)
+
+    def test_upload_csv_lists_skipped_rows(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        upload = SimpleUploadedFile("students.csv", b"First Name,Last Name,Class\nRavi,K,5\n,Nameless,5\n", content_type="text/csv")
+        resp = self.client.post(reverse("import_students"), {"excel_file": upload})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.context["result"].created, 1)
+        self.assertEqual(resp.context["result"].errors, [(3, "first name is required")])
+        self.assertTrue(Member.objects.filter(school=self.school, firstname="Ravi", student_class__name="5").exists())
+
+
+class StudentSearchViewTest(TestCase):
+    """Typeahead endpoint for the student pickers."""
+
+    def setUp(self):
+        self.school = School.objects.create(name="Test School", address="123 Test St", school_code="TEST001", code="test")
+        self.student = Member.objects.create(school=self.school, firstname="Ravi", lastname="K", admission_no="A-77", fee_total=500)
+        self.user = User.objects.create_user(username="acct", password="testpass123")
+        UserProfile.objects.filter(user=self.user).update(school=self.school, role="ACCOUNTANT")
+        self.client = Client(HTTP_HOST="test.localhost:8000")
+        self.client.force_login(self.user)
+
+    def test_returns_matches_as_json(self):
+        resp = self.client.get(reverse("student_search"), {"q": "a 77"})
+        self.assertEqual(resp.json()["results"], [{
+            "id": self.student.id, "name": "Ravi K", "admission_no": "A-77", "roll_number": "", "class": "", "due": "500.00",
+        }])
+        self.assertEqual(self.client.get(reverse("student_search"), {"q": ""}).json(), {"results": []})
+
+    def test_fee_page_lists_only_dues(self):
+        Member.objects.create(school=self.school, firstname="Paid", lastname="Up")
+        resp = self.client.get(reverse("fee_home"))
+        self.assertEqual([s.id for s in resp.context["students"]], [self.student.id])
+
+
+class StudentPortalViewTest(TestCase):
+    def test_lists_class_materials_newest_first(self):
+        school = School.objects.create(name="Test School", address="123 Test St", school_code="TEST001", code="test")
+        classroom = ClassRoom.objects.create(school=school, name="5", section="A")
+        student = Member.objects.create(school=school, firstname="Ravi", lastname="K", student_class=classroom)
+        older = StudyMaterial.objects.create(school=school, title="Fractions", subject="Maths", class_name="5")
+        newer = StudyMaterial.objects.create(school=school, title="Plants", subject="Science", class_name="5")
+        user = User.objects.create_user(username="ravi", password="testpass123")
+        profile = user.userprofile  # the instance login re-saves: set the role on it, not behind it
+        profile.school, profile.role, profile.member = school, "STUDENT", student
+        profile.save()
+        client = Client(HTTP_HOST="test.localhost:8000")
+        client.force_login(user)
+        resp = client.get(reverse("student_portal"))
+        self.assertEqual([m["obj"].id for m in resp.context["materials"]], [newer.id, older.id])
+
+
+class BenchmarkViewsCommandTest(TestCase):
+    def test_reports_every_hot_view(self):
+        school = School.objects.create(name="Test", address="A", school_code="T1", code="test")
+        SchoolSeeder(school, 20, seed=1).run()
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        out = f"{tmp}/bench.json"
+        fees = FeeTransaction.objects.count()
+        call_command("benchmark_views", school="test", iterations=2, warmup=0, output=out, stderr=io.StringIO())
+
+        with open(out) as fh:
+            report = json.load(fh)
+        self.assertEqual(report["meta"]["students"], 20)
+        self.assertIn("attendance GET", report["views"])
+        self.assertIn("parent_dashboard", report["views"])
+        for name, view in report["views"].items():
+            self.assertTrue(all(s < 400 for s in view["status"]), name)
+            self.assertLessEqual(view["ms"]["p50"], view["ms"]["max"])
+        # Writes were rolled back and the benchmark's users removed with their rows
+        self.assertFalse(User.objects.filter(username__startswith="bench-").exists())
+        self.assertFalse(Notification.objects.filter(school=school).exists())
+        self.assertFalse(Session.objects.exists())
+        self.assertEqual(FeeTransaction.objects.count(), fees)
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class QueryBudgetTest(TestCase):
+    """The hot views stay within their @query_budget and issue as many queries at 1,000 students as at 40."""
+
+    def _queries_per_view(self, students):
+        cache.clear()  # cached list totals (KeysetPaginator) would hide a COUNT
+        code = f"budget{students}"
+        school = School.objects.create(name=code, address="A", school_code=code.upper(), code=code)
+        SchoolSeeder(school, students, seed=1).run()
+        FinanceService.generate_installments(school.id, as_of=date.today())
+        counts = {}
+        for name, user, method, url, data in scenarios(school, bench_users(school)):
+            client = Client(HTTP_HOST=f"{code}.localhost")
+            client.force_login(user)
+            response = getattr(client, method)(url, data or {})
+            self.assertLess(response.status_code, 400, name)
+            self.assertIsNotNone(response.wsgi_request.query_budget, name)
+            counts[name] = response.wsgi_request.query_stats.queries
+        return counts
+
+    def test_query_counts_do_not_grow_with_the_school(self):
+        # 40 rather than 10 students, so all_students has a second page (and its COUNT) in both
+        self.assertEqual(self._queries_per_view(40), self._queries_per_view(1000))
+
+    def test_over_budget_raises_when_strict(self):
+        school = School.objects.create(name="Test", address="A", school_code="T1", code="test")
+        user = User.objects.create_user("owner", password="x")
+        UserProfile.objects.filter(user=user).update(school=school, role="OWNER")
+        client = Client(HTTP_HOST="test.localhost")
+        client.force_login(user)
+        view = resolve(reverse("notification_list")).func
+        with patch.object(view, "query_budget", QueryBudget(1)):
+            with self.assertRaises(QueryBudgetExceeded), self.assertLogs("django.request", "ERROR"):
+                client.get(reverse("notification_list"))
+
+
+class MetricsEndpointTest(TestCase):
+    def setUp(self):
+        self.school = School.objects.create(name="Test", address="A", school_code="T1", code="test")
+        self.user = User.objects.create_user("owner", password="x")
+        UserProfile.objects.filter(user=self.user).update(school=self.school, role="OWNER")
+        self.client = Client(HTTP_HOST="test.localhost")
+        self.client.force_login(self.user)
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        request_metrics.reset()
+        self.addCleanup(request_metrics.reset)
+
+    def test_counts_requests_per_school_and_view_across_workers(self):
+        with override_settings(METRICS_DIR=self.dir, METRICS_TOKEN="s3cret"):
+            self.client.get(reverse("notification_list"))
+            self.client.get(reverse("all_students"))
+            # Another worker's snapshot
+            series = request_metrics._new_series()
+            series.update(requests=2, seconds=0.5, queries=10)
+            series["buckets"][-1] = 2
+            with open(f"{self.dir}/999999.json", "w") as fh:
+                json.dump({"series": [["test", "notification_list", series]],
+                           "statuses": [["test", "notification_list", "GET", "200", 2]]}, fh)
+
+            self.assertEqual(self.client.get("/metrics").status_code, 403)
+            resp = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret")
+        self.assertEqual(resp.status_code, 200)
+        body = resp.content.decode()
+        self.assertIn('erp_http_requests_total{school="test",view="notification_list",method="GET",status="200"} 3', body)
+        self.assertIn('erp_http_request_duration_seconds_bucket{school="test",view="notification_list",le="+Inf"} 3', body)
+        self.assertIn('erp_http_request_duration_seconds_count{school="test",view="notification_list"} 3', body)
+        self.assertNotIn('view="metrics"', body)
+        self.assertRegex(body, r'erp_db_queries_total\{school="test",view="all_students"\} [1-9]')
+        rendered = [l for l in body.splitlines() if l.startswith('erp_template_render_seconds_total{school="test",view="all_students"}')]
+        self.assertGreater(float(rendered[0].split()[-1]), 0)
+
+    def test_counts_recorded_inside_the_flush_window_are_written_when_it_ends(self):
+        with override_settings(METRICS_DIR=self.dir, METRICS_FLUSH_SECONDS=0.5):
+            request_metrics.flush()
+            request_metrics.record("test", "index", "GET", 200, 0.01)  # too soon to write; a timer does it
+            request_metrics._timer.join()
+            with open(f"{self.dir}/{os.getpid()}.json") as fh:
+                snapshot = json.load(fh)
+        self.assertEqual(snapshot["statuses"], [["test", "index", "GET", "200", 1]])
+
+
+class SlowQuerySamplerTest(TestCase):
+    def setUp(self):
+        self.school = School.objects.create(name="Test", address="A", school_code="T1", code="test")
+        self.user = User.objects.create_user("owner", password="x")
+        UserProfile.objects.filter(user=self.user).update(school=self.school, role="OWNER")
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        slow_query_log.reset()
+        self.addCleanup(slow_query_log.reset)
+
+    def test_fingerprint_collapses_values(self):
+        self.assertEqual(
+            slow_query_log.fingerprint('SELECT "t1"."id" FROM "t1"  WHERE "t1"."code" = \'x\'\n AND "t1"."id" IN (%s, %s, %s) LIMIT 21'),
+            'SELECT "t1"."id" FROM "t1" WHERE "t1"."code" = ? AND "t1"."id" IN (...) LIMIT ?',
+        )
+
+    def test_records_statement_with_view_frame_and_tenant(self):
+        with override_settings(SLOW_QUERY_MS=0.0001, METRICS_DIR=self.dir):
+            client = Client(HTTP_HOST="test.localhost")
+            client.force_login(self.user)
+            self.assertEqual(client.get(reverse("all_students")).status_code, 200)
+            with open(f"{self.dir}/slow-queries/{os.getpid()}.json") as fh:  # written as the request ended
+                self.assertTrue(json.load(fh))
+
+            entries = slow_query_log.recent(school="test")
+            from_view = [e for e in entries if e["view"] == "all_students" and "members_member" in e["sql"]]
+            self.assertTrue(from_view)
+            self.assertRegex(from_view[0]["frame"], r"^members/views/students\.py:\d+ all_students$")
+
+            out = io.StringIO()
+            call_command("dump_slow_queries", group=True, json=True, school="test", stdout=out)
+            self.assertIn(from_view[0]["id"], {row["id"] for row in json.loads(out.getvalue())})
+
+        admin = User.objects.create_superuser("root", "root@example.com", "x")
+        client = Client()
+        client.force_login(admin)
+        resp = client.get(reverse("super_admin:slow_queries"), {"school": "test"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "members/views/students.py")
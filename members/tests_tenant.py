@@ -11,12 +11,13 @@ Checklist:
 
 from unittest.mock import Mock
 
-from django.test import TestCase, RequestFactory
+from django.test import TestCase, TransactionTestCase, RequestFactory
 from django.http import Http404
 
 from members.models import School
 from members.utils.domain import extract_subdomain
 from members.middleware.tenant import TenantMiddleware
+from members.utils import tenant_registry
 
 
 # --- extract_subdomain ---
@@ -104,6 +105,42 @@ class TenantMiddlewareTests(TestCase):
             self.mw.process_request(req)
 
 
+# --- Tenant registry cache ---
+
+
+class TenantRegistryTests(TransactionTestCase):
+    """Verify School lookups are cached and invalidated on save/delete."""
+
+    def setUp(self):
+        tenant_registry.clear()
+        self.school = School.objects.create(
+            name="Cached School",
+            address="Somewhere",
+            school_code="SC002",
+            code="cached",
+        )
+
+    def tearDown(self):
+        tenant_registry.clear()
+
+    def test_second_lookup_costs_no_queries(self):
+        tenant_registry.get_school_by_code("cached")
+        with self.assertNumQueries(0):
+            self.assertEqual(tenant_registry.get_school_by_code("cached").id, self.school.id)
+            self.assertEqual(tenant_registry.get_school_by_id(self.school.id).code, "cached")
+
+    def test_save_invalidates(self):
+        tenant_registry.get_school_by_code("cached")
+        self.school.name = "Renamed"
+        self.school.save()
+        self.assertEqual(tenant_registry.get_school_by_code("cached").name, "Renamed")
+
+    def test_delete_invalidates(self):
+        tenant_registry.get_school_by_code("cached")
+        self.school.delete()
+        self.assertIsNone(tenant_registry.get_school_by_code("cached"))
+
+
 # --- Root views never break when request.school missing ---
 
 
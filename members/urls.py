@@ -17,6 +17,7 @@ timetable_views = import_module("members.views.timetable")
 admissions_views = import_module("members.views.admissions")
 parent_views = import_module("members.views.parent_portal")
 notification_views = import_module("members.views.notifications")
+export_views = import_module("members.views.exports")
 
 urlpatterns = [
     path("", landing, name="landing"),
@@ -24,6 +25,9 @@ urlpatterns = [
     path("members/", index, name="members"),
 
     path("students/all/", students.all_students, name="all_students"),
+    path("students/export/", students.export_students, name="export_students"),
+    path("students/import/", students.import_students, name="import_students"),
+    path("students/search/", students.student_search, name="student_search"),
     path("students/profile/<int:id>/", students.student_profile, name="student_profile"),
     path("students/create-login/<int:id>/", students.create_student_login, name="create_student_login"),
     path("students/update/<int:id>/", students.update, name="update_student"),
@@ -36,7 +40,9 @@ urlpatterns = [
     path("students/receipt/<int:id>/", students.admission_receipt_pdf, name="admission_receipt_pdf"),
 
     path("attendance/", academic.attendance, name="attendance"),
+    path("attendance/bulk-save/", academic.attendance_bulk_save, name="attendance_bulk_save"),
     path("attendance_records/", academic.attendance_records, name="attendance_records"),
+    path("attendance_records/export/", academic.export_attendance, name="export_attendance"),
 
     path("library/", library_views.library, name="library_home"),
     path("library/add_book/", library_views.add_book, name="add_book"),
@@ -52,6 +58,7 @@ urlpatterns = [
     path("add_marks/", academic.add_marks, name="add_marks"),
     path("report_card/", academic.report_card, name="report_card"),
     path("marksheet_pdf/<int:id>/", academic.marksheet_pdf, name="marksheet_pdf"),
+    path("marksheets/export/", academic.marksheet_export, name="marksheet_export"),
     path("academic/subjects/", academic.subject_list, name="subject_list"),
     path("academic/subjects/<int:pk>/edit/", academic.subject_edit, name="subject_edit"),
     path("academic/exam-types/", academic.exam_type_list, name="exam_type_list"),
@@ -62,11 +69,14 @@ urlpatterns = [
     path("finance/config/", finance.fee_config, name="fee_config"),
     path("finance/get-fee/", finance.get_fee_amount, name="get_fee_amount"),
     path("finance/receipt/<int:id>/", finance.receipt_pdf, name="receipt_pdf"),
+    path("finance/receipts/export/", finance.receipt_export, name="receipt_export"),
+    path("finance/transactions/export/", finance.export_fee_transactions, name="export_fee_transactions"),
     path("finance/delete/<int:id>/", finance.delete_fee, name="delete_fee"),
     path("finance/student-receipt/<int:student_id>/", finance.student_receipt_pdf, name="student_receipt_pdf"),
     path("finance/add-expense/", finance.add_expense, name="add_expense"),
     path("finance/generate-invoices/", finance.generate_monthly_dues, name="generate_monthly_dues"),
     path("finance/installments/", finance.fee_installments, name="fee_installments"),
+    path("finance/installments/generate/", finance.fee_installments_generate, name="fee_installments_generate"),
     path("finance/discounts/", finance.fee_discounts, name="fee_discounts"),
     path("finance/discounts/add/", finance.fee_discount_add, name="fee_discount_add"),
     path("finance/discounts/<int:pk>/edit/", finance.fee_discount_edit, name="fee_discount_edit"),
@@ -74,6 +84,7 @@ urlpatterns = [
     path("finance/concessions/", finance.fee_concessions, name="fee_concessions"),
     path("finance/late-fee-policy/", finance.fee_late_fee_policy, name="fee_late_fee_policy"),
     path("finance/receipts/", finance.fee_receipts, name="fee_receipts"),
+    path("finance/receipts/sheet/", finance.export_fee_receipts, name="export_fee_receipts"),
     path("finance/receipts/<int:receipt_id>/refund/", finance.fee_refund_request, name="fee_refund_request"),
     path("finance/refunds/", finance.fee_refunds, name="fee_refunds"),
     path("finance/refunds/<int:refund_id>/process/", finance.fee_refund_process, name="fee_refund_process"),
@@ -102,6 +113,11 @@ urlpatterns = [
     path("notifications/<int:pk>/read/", notification_views.notification_mark_read, name="notification_mark_read"),
     path("notifications/read-all/", notification_views.notification_mark_all_read, name="notification_mark_all_read"),
     path("notifications/send/", notification_views.notification_send, name="notification_send"),
+    path("notifications/broadcasts/<int:pk>/", notification_views.notification_broadcast_status, name="notification_broadcast_status"),
+
+    path("exports/<int:pk>/", export_views.pdf_export_detail, name="pdf_export_detail"),
+    path("exports/<int:pk>/status/", export_views.pdf_export_status, name="pdf_export_status"),
+    path("exports/<int:pk>/download/", export_views.pdf_export_download, name="pdf_export_download"),
 
     path("hr/staff/", hr.staff_list, name="staff_list"),
     path("hr/staff/add/", hr.add_staff, name="add_staff"),
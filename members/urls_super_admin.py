@@ -10,6 +10,7 @@ from members.views.super_admin import (
     populate_demo_data,
     school_list,
     toggle_school_status,
+    slow_queries,
 )
 
 app_name = 'super_admin'
@@ -21,4 +22,5 @@ urlpatterns = [
     path('schools/create-demo/', create_demo_school, name='create_demo'),
     path('schools/<int:school_id>/populate/', populate_demo_data, name='populate_demo_data'),
     path('schools/<int:school_id>/toggle-status/', toggle_school_status, name='toggle_status'),
+    path('slow-queries/', slow_queries, name='slow_queries'),
 ]
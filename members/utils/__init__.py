@@ -4,14 +4,20 @@ from .domain import extract_subdomain, build_school_base_url
 
 
 def get_current_school(request):
-    """Get the current school from request user's profile"""
+    """Get the current school: request.school (set by TenantMiddleware), else the user's profile school"""
+    from . import tenant_registry
+
+    school = getattr(request, 'school', None)
+    if school is not None:
+        return school
+
     if hasattr(request, 'user') and request.user.is_authenticated:
-        if hasattr(request.user, 'userprofile') and request.user.userprofile.school:
-            return request.user.userprofile.school
-    
+        profile = getattr(request.user, 'userprofile', None)
+        if profile and profile.school_id:
+            return tenant_registry.get_school_by_id(profile.school_id)
+
     # Fallback: get first school if exists
-    from members.models import School
-    return School.objects.first()
+    return tenant_registry.get_default_school()
 
 
 __all__ = [
@@ -0,0 +1,55 @@
+"""
+Conditional aggregates: count several buckets of a queryset in one query.
+
+Instead of one `.filter(...).count()` per bucket, each bucket becomes a
+COUNT(*) FILTER (WHERE ...) column (CASE WHEN on backends without FILTER):
+
+    count_buckets(AdmissionEnquiry.objects.filter(school=school),
+                  new=Q(status="New"), lost=Q(status="Lost"), total=None)
+    -> {"new": 3, "lost": 1, "total": 9}
+
+    count_values(qs, "status", ["New", "Lost"])             -> {"New": 3, "Lost": 1}
+    count_values(qs, "status", ["Present"], group_by="student_id")
+                                                              -> {student_id: {"Present": n}, ...}
+
+group_by may also be a tuple of fields; the result is then keyed by value tuples.
+"""
+
+from __future__ import annotations
+
+from django.db.models import Count, Q
+
+
+def _bucket_expressions(buckets: dict) -> dict:
+    # None means "no filter", i.e. the plain row count.
+    return {name: Count("pk", filter=cond) if cond is not None else Count("pk") for name, cond in buckets.items()}
+
+
+def count_buckets(queryset, *, group_by: str | tuple | None = None, extra: dict | None = None, **buckets: Q | None) -> dict:
+    """
+    Count each named bucket (a Q, or None for all rows) of queryset in a single query.
+    extra adds other named aggregates (e.g. Sum) to the same query.
+    With group_by, returns {group value: {name: value}}; groups with no rows are absent.
+    """
+    expressions = {**_bucket_expressions(buckets), **(extra or {})}
+    if group_by is None:
+        return queryset.aggregate(**expressions)
+    if isinstance(group_by, str):
+        rows = queryset.order_by().values(group_by).annotate(**expressions)
+        return {row[group_by]: {name: row[name] for name in expressions} for row in rows}
+    rows = queryset.order_by().values(*group_by).annotate(**expressions)
+    return {tuple(row[f] for f in group_by): {name: row[name] for name in expressions} for row in rows}
+
+
+def count_values(queryset, field: str, values, *, group_by: str | tuple | None = None) -> dict:
+    """count_buckets with one bucket per value of field, keyed by the value itself."""
+    values = list(values)
+    aliases = {f"_n{i}": Q(**{field: value}) for i, value in enumerate(values)}
+    counts = count_buckets(queryset, group_by=group_by, **aliases)
+
+    def by_value(row):
+        return {value: row[f"_n{i}"] for i, value in enumerate(values)}
+
+    if group_by is None:
+        return by_value(counts)
+    return {group: by_value(row) for group, row in counts.items()}
@@ -0,0 +1,62 @@
+"""
+Run a Celery task off the request thread.
+
+- settings.CELERY_BROKER_URL set: the task is queued with .delay() for the worker pool.
+- no broker (local / single-box deploys): the task body runs in a small process-local
+  thread pool; each job closes its DB connection when done.
+- CELERY_TASK_ALWAYS_EAGER: run inline (tests, debugging).
+
+Dispatch waits for the surrounding transaction to commit, so the job never reads rows
+that are not visible yet (or that get rolled back).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def broker_configured() -> bool:
+    return bool(getattr(settings, "CELERY_BROKER_URL", ""))
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = int(getattr(settings, "BACKGROUND_WORKERS", 2))
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bg-task")
+        return _executor
+
+
+def _run_in_thread(task, args):
+    close_old_connections()
+    try:
+        task(*args)
+    except Exception:
+        logger.exception("Background task %s%r failed", getattr(task, "name", task), args)
+    finally:
+        connection.close()
+
+
+def _dispatch(task, args):
+    if getattr(settings, "CELERY_TASK_ALWAYS_EAGER", False):
+        task(*args)
+    elif broker_configured():
+        task.delay(*args)
+    else:
+        _get_executor().submit(_run_in_thread, task, args)
+
+
+def submit(task, *args) -> None:
+    """Schedule task(*args) after the current transaction commits (immediately if none)."""
+    transaction.on_commit(lambda: _dispatch(task, args))
@@ -6,10 +6,12 @@ Generates realistic sample data for demo schools
 import random
 from datetime import datetime, timedelta
 from django.contrib.auth.models import User
+from django.db import transaction
 from members.models import (
-    School, Member, ClassRoom, AcademicYear, 
-    Attendance, Book
+    School, Member, MemberProfile, ClassRoom, AcademicYear,
+    Attendance, Book, search_text
 )
+from members.services.seeding import bulk_insert, create_school_user, demo_password_hash, finish_school
 
 
 class DemoDataGenerator:
@@ -45,52 +47,65 @@ class DemoDataGenerator:
         ('Art', 'Art Teacher'),
     ]
     
+    STUDENTS = 50
+    STAFF = 8
+    CLASSES = 5
+    PASSWORD = 'demo123'
+
     def __init__(self, school):
         self.school = school
         self.created_users = []
-        
+        self._password_hash = None
+
+    @property
+    def password_hash(self):
+        # Hashing is deliberately slow: do it once for every demo account
+        if self._password_hash is None:
+            self._password_hash = demo_password_hash(self.PASSWORD)
+        return self._password_hash
+
     def generate_all(self):
-        """Generate all demo data"""
-        print(f"🏫 Generating demo data for {self.school.name}...")
-        
-        # 1. Create academic year
-        academic_year = self.create_academic_year()
-        print(f"✅ Created academic year: {academic_year.name}")
-        
-        #  2. Create classes
-        classes = self.create_classes()
-        print(f"✅ Created {len(classes)} classes")
-        
-        # 3. Create admin user
+        """Generate all demo data, including the school admin login"""
         admin_user = self.create_admin_user()
         print(f"✅ Created admin: {admin_user.username}")
-        
-        # 4. Create staff
-        staff = self.create_staff(8)
-        print(f"✅ Created {len(staff)} staff members")
-        
-        # 5. Create students
-        students = self.create_students(50, classes)
-        print(f"✅ Created {len(students)} students")
-        
-        # 6. Create attendance
-        attendance_count = self.create_attendance(students, days=30)
-        print(f"✅ Created {attendance_count} attendance records")
-        
-        # 7. Create library books
-        books = self.create_books(10)
-        print(f"✅ Created {len(books)} library books")
-        
+        result = self.generate_data()
+        result.update(admin_username=admin_user.username, admin_password=self.PASSWORD)
+        return result
+
+    def generate_data(self):
+        """Classes, staff, students, attendance and books, written in bulk in one transaction"""
+        print(f"🏫 Generating demo data for {self.school.name}...")
+
+        with transaction.atomic():
+            academic_year = self.create_academic_year()
+            print(f"✅ Created academic year: {academic_year.name}")
+
+            classes = self.create_classes()
+            print(f"✅ Created {len(classes)} classes")
+
+            staff = self.create_staff(self.STAFF)
+            print(f"✅ Created {len(staff)} staff members")
+
+            students = self.create_students(self.STUDENTS, classes)
+            print(f"✅ Created {len(students)} students")
+
+            attendance_count = self.create_attendance(students, days=30)
+            print(f"✅ Created {attendance_count} attendance records")
+
+            books = self.create_books(10)
+            print(f"✅ Created {len(books)} library books")
+
+            # bulk_create sends no signals: rollups, dashboard and search index in one pass
+            finish_school(self.school.id)
+
         print(f"\n🎉 Demo data generation complete!")
-        
+
         return {
-            'admin_username': admin_user.username,
-            'admin_password': 'demo123',
             'students_count': len(students),
             'staff_count': len(staff),
             'classes_count': len(classes),
         }
-    
+
     def create_academic_year(self):
         """Create current academic year"""
         current_year = datetime.now().year
@@ -108,7 +123,7 @@ class DemoDataGenerator:
     def create_classes(self):
         """Create class 1 to 5"""
         classes = []
-        for i in range(1, 6):
+        for i in range(1, self.CLASSES + 1):
             cls, _ = ClassRoom.objects.get_or_create(
                 school=self.school,
                 name=f"Class {i}",
@@ -125,21 +140,14 @@ class DemoDataGenerator:
         if User.objects.filter(username=username).exists():
             username = f"{self.school.code}_admin_{random.randint(100, 999)}"
         
-        user = User.objects.create_user(
-            username=username,
-            password='demo123',
+        user = create_school_user(
+            username, self.password_hash, self.school, 'ADMIN',
             email=f"admin@{self.school.code}.edu",
             first_name='School',
             last_name='Admin',
-            is_staff=True
+            is_staff=True,
         )
         
-        # Create user profile
-        if hasattr(user, 'userprofile'):
-            user.userprofile.school = self.school
-            user.userprofile.role = 'ADMIN'
-            user.userprofile.save()
-        
         self.created_users.append(user)
         return user
     
@@ -156,25 +164,19 @@ class DemoDataGenerator:
             if User.objects.filter(username=username).exists():
                 username = f"{username}_{random.randint(100, 999)}"
             
-            user = User.objects.create_user(
-                username=username,
-                password='demo123',
+            user = create_school_user(
+                username, self.password_hash, self.school, 'TEACHER',
                 first_name=first_name,
-                last_name=last_name
+                last_name=last_name,
             )
             
-            if hasattr(user, 'userprofile'):
-                user.userprofile.school = self.school
-                user.userprofile.role = 'TEACHER'
-                user.userprofile.save()
-            
             staff_members.append(user)
         
         return staff_members
     
     def create_students(self, count, classes):
         """Create student members"""
-        students = []
+        students, mothers = [], []
         
         for i in range(count):
             # Random gender
@@ -183,35 +185,35 @@ class DemoDataGenerator:
                 self.FIRST_NAMES_BOYS if gender == 'Male' else self.FIRST_NAMES_GIRLS
             )
             last_name = random.choice(self.LAST_NAMES)
-            
-            # Random class
-            classroom = random.choice(classes)
+            admission_no = f"{self.school.school_code}{1000+i}"
             
             # Random age (6-12 years old)
             age = random.randint(6, 12)
             dob = datetime.now() - timedelta(days=age*365 + random.randint(0,  364))
             
-            student = Member.objects.create(
+            students.append(Member(
                 school=self.school,
-                admission_no=f"{self.school.school_code}{1000+i}",
+                admission_no=admission_no,
                 firstname=first_name,
                 lastname=last_name,
                 gender=gender,
                 dob=dob.date(),
-                student_class=classroom,
+                student_class=random.choice(classes),
                 address=f"{random.randint(1, 999)} {random.choice(['MG Road', 'Park Street', 'Main Street'])}",
                 mobile_number=f"98{random.randint(10000000, 99999999)}",
                 email=f"{first_name.lower()}.{last_name.lower()}@student.edu",
                 father_name=f"{random.choice(self.FIRST_NAMES_BOYS)} {last_name}",
-                mother_name=f"{random.choice(self.FIRST_NAMES_GIRLS)} {last_name}",
-            )
-            students.append(student)
+                search_key=search_text(first_name, last_name, admission_no),
+            ))
+            mothers.append(f"{random.choice(self.FIRST_NAMES_GIRLS)} {last_name}")
         
+        students = bulk_insert(Member, students)
+        bulk_insert(MemberProfile, (MemberProfile(member=s, mother_name=m) for s, m in zip(students, mothers)), keep=False)
         return students
     
     def create_attendance(self, students, days=30):
         """Create attendance records for last 30 days"""
-        count = 0
+        records = []
         
         for day in range(days):
             date = datetime.now().date() - timedelta(days=day)
@@ -223,16 +225,9 @@ class DemoDataGenerator:
             for student in students:
                 # 90% attendance rate
                 status = 'Present' if random.random() < 0.9 else 'Absent'
-                
-                Attendance.objects.create(
-                    student=student,
-                    date=date,
-                    status=status
-                )
-
-                count += 1
+                records.append(Attendance(student=student, school=self.school, date=date, status=status))
         
-        return count
+        return bulk_insert(Attendance, records, keep=False)
     
     def create_books(self, count=10):
         """Create library books"""
@@ -254,7 +249,7 @@ class DemoDataGenerator:
         for title, author in book_titles[:count]:
             copies = random.randint(2, 5)
             
-            book = Book.objects.create(
+            books.append(Book(
                 school=self.school,
                 title=title,
                 author=author,
@@ -262,7 +257,6 @@ class DemoDataGenerator:
                 category=random.choice(['Fiction', 'Non-Fiction', 'Science', 'History']),
                 total_copies=copies,
                 available_copies=copies
-            )
-            books.append(book)
+            ))
         
-        return books
+        return bulk_insert(Book, books)
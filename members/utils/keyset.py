@@ -0,0 +1,227 @@
+"""
+Keyset (cursor) pagination for long lists.
+
+Django's Paginator runs COUNT(*) over the whole filtered join and then OFFSET n, so deep
+pages cost more the further you go. KeysetPaginator instead remembers the sort key of the
+last row shown and asks for the rows after it:
+
+    WHERE date < :d OR (date = :d AND id > :id) ORDER BY date DESC, id LIMIT 51
+
+which an index on the sort columns answers in the same time on page 1 and page 5,000.
+The ordering must be unique (end it with id) and its columns must not be NULL.
+
+    paginator = KeysetPaginator(qs, 50, ordering=("-date", "id"), count="cached")
+    page_obj = paginator.get_page(request.GET.get("cursor"))
+
+Pages are addressed by an opaque ?cursor= token (see the pagination_query tag). The total
+is optional: count=None skips it, "cached" is an exact COUNT kept in the cache for a few
+minutes, "estimate" is the query planner's row estimate on PostgreSQL (exact elsewhere).
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import math
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+COUNT_TTL = 300  # seconds a "cached" total is reused
+COUNT_MODES = (None, "exact", "cached", "estimate")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _field_path(model, path: str):
+    """The model field at the end of a lookup path like "student__firstname"."""
+    field = None
+    for part in path.split("__"):
+        field = model._meta.get_field(part)
+        model = field.related_model
+    return field
+
+
+class KeysetPage:
+    """One page; quacks like django.core.paginator.Page where the templates need it."""
+
+    cursor_based = True
+
+    def __init__(self, object_list, paginator, number, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.number = number
+        self.has_next_page = has_next
+        self.has_previous_page = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.has_next_page
+
+    def has_previous(self):
+        return self.has_previous_page
+
+    def has_other_pages(self):
+        return self.has_next_page or self.has_previous_page
+
+    @property
+    def next_cursor(self):
+        if not self.has_next_page:
+            return None
+        return self.paginator.encode_cursor("n", self.object_list[-1], self.number + 1)
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous_page:
+            return None
+        if self.number == 2:
+            return ""  # back to the first page: no cursor at all
+        return self.paginator.encode_cursor("p", self.object_list[0], self.number - 1)
+
+    @property
+    def last_cursor(self):
+        """Only offered when the total is known, so the last page has a number."""
+        if not self.has_next_page or self.paginator.count is None:
+            return None
+        return self.paginator.encode_cursor("last", None, None)
+
+
+class KeysetPaginator:
+    def __init__(self, queryset, per_page: int, ordering, count: str | None = "cached"):
+        if count not in COUNT_MODES:
+            raise ValueError(f"count must be one of {COUNT_MODES}")
+        self.queryset = queryset.order_by(*ordering)
+        self.per_page = per_page
+        self.ordering = [(o.lstrip("-"), o.startswith("-")) for o in ordering]
+        self.count_mode = count
+        self.fields = [_field_path(queryset.model, path) for path, _ in self.ordering]
+
+    # --- cursors ---
+
+    def _key(self, obj) -> list:
+        values = []
+        for path, _ in self.ordering:
+            value = obj
+            for part in path.split("__"):
+                value = getattr(value, part)
+            values.append(value)
+        return values
+
+    def encode_cursor(self, direction: str, obj, number: int | None) -> str:
+        payload = {"d": direction, "n": number}
+        if obj is not None:
+            payload["k"] = self._key(obj)
+        raw = json.dumps(payload, cls=DjangoJSONEncoder, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, token: str) -> dict:
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+            if payload["d"] == "last":
+                return payload
+            if payload["d"] not in ("n", "p") or len(payload["k"]) != len(self.fields) or int(payload["n"]) < 1:
+                raise ValueError
+            payload["k"] = [
+                field.target_field.to_python(v) if field.is_relation else field.to_python(v)
+                for field, v in zip(self.fields, payload["k"])
+            ]
+            return payload
+        except Exception as e:
+            raise InvalidCursor(str(e)) from e
+
+    def _after(self, key, reverse: bool = False) -> Q:
+        """Rows strictly after key in this ordering (before it when reverse)."""
+        condition = Q()
+        for i, ((path, desc), value) in enumerate(zip(self.ordering, key)):
+            op = "lt" if desc != reverse else "gt"
+            term = Q(**{f"{path}__{op}": value})
+            for (prev_path, _), prev_value in zip(self.ordering[:i], key[:i]):
+                term &= Q(**{prev_path: prev_value})
+            condition |= term
+        return condition
+
+    def _reversed(self):
+        return self.queryset.order_by(*[(path if desc else f"-{path}") for path, desc in self.ordering])
+
+    # --- pages ---
+
+    def get_page(self, cursor: str | None) -> KeysetPage:
+        """The page a ?cursor= token points at; the first page for a missing or invalid token."""
+        payload = None
+        if cursor:
+            try:
+                payload = self.decode_cursor(cursor)
+            except InvalidCursor:
+                payload = None
+
+        n = self.per_page
+        if payload is None:
+            rows = list(self.queryset[: n + 1])
+            return KeysetPage(rows[:n], self, 1, len(rows) > n, False)
+        if payload["d"] == "n":
+            rows = list(self.queryset.filter(self._after(payload["k"]))[: n + 1])
+            return KeysetPage(rows[:n], self, payload["n"], len(rows) > n, True)
+        if payload["d"] == "p":
+            rows = list(self._reversed().filter(self._after(payload["k"], reverse=True))[: n + 1])
+            has_previous = len(rows) > n
+            return KeysetPage(rows[:n][::-1], self, payload["n"] if has_previous else 1, True, has_previous)
+        # last page: the tail of the list, read backwards
+        total = self.count
+        if total is None:
+            rows = list(self.queryset[: n + 1])
+            return KeysetPage(rows[:n], self, 1, len(rows) > n, False)
+        last = self.num_pages
+        size = (total - (last - 1) * n) or n
+        rows = list(self._reversed()[: size + 1])
+        has_previous = len(rows) > size
+        return KeysetPage(rows[:size][::-1], self, last if has_previous else 1, False, has_previous)
+
+    # --- optional total ---
+
+    @cached_property
+    def count(self) -> int | None:
+        mode = self.count_mode
+        if mode is None:
+            return None
+        if mode == "exact":
+            return self.queryset.count()
+        if mode == "estimate":
+            return self._estimate()
+        sql, params = self.queryset.query.sql_with_params()
+        key = "keyset-count:" + hashlib.sha256(repr((sql, params)).encode()).hexdigest()
+        total = cache.get(key)
+        if total is None:
+            total = self.queryset.count()
+            cache.set(key, total, COUNT_TTL)
+        return total
+
+    def _estimate(self) -> int:
+        if connections[self.queryset.db].vendor != "postgresql":
+            return self.queryset.count()
+        plan = self.queryset.order_by().explain(format="json")
+        return int(json.loads(plan)[0]["Plan"]["Plan Rows"])
+
+    @property
+    def num_pages(self) -> int | None:
+        total = self.count
+        if total is None:
+            return None
+        return max(1, math.ceil(total / self.per_page))
+
+    @property
+    def count_is_estimate(self) -> bool:
+        return self.count_mode == "estimate"
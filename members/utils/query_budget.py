@@ -0,0 +1,59 @@
+"""
+Per-view query budgets.
+
+    @login_required
+    @require_roles("OWNER", "ADMIN")
+    @query_budget(12)
+    def all_students(request): ...
+
+QueryBudgetMiddleware counts every query of a request (session, auth and tenant lookups
+included) and the time spent in the database. A view that goes over its budget is logged
+on the "members.query_budget" logger; with settings.QUERY_BUDGET_STRICT it raises
+QueryBudgetExceeded instead, which is how the test suite turns an N+1 into a failure.
+Budgets are fixed numbers on purpose: a view whose query count grows with the number of
+students will cross any of them once the school is large enough.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    queries: int
+    db_ms: float | None = None
+
+    def check(self, stats: "QueryStats") -> str | None:
+        """A description of what went over the budget, or None."""
+        problems = []
+        if stats.queries > self.queries:
+            problems.append(f"{stats.queries} queries (budget {self.queries})")
+        if self.db_ms is not None and stats.db_ms > self.db_ms:
+            problems.append(f"{stats.db_ms:.1f} ms in the database (budget {self.db_ms:g})")
+        return ", ".join(problems) or None
+
+
+@dataclass
+class QueryStats:
+    queries: int = 0
+    db_ms: float = 0.0
+
+
+def query_budget(queries: int, db_ms: float | None = None):
+    """Declare the most queries (and optionally DB milliseconds) one request to the view may use."""
+
+    def decorator(view_func):
+        # functools.wraps copies __dict__, so the outer login/role decorators keep it
+        view_func.query_budget = QueryBudget(queries, db_ms)
+        return view_func
+
+    return decorator
+
+
+def get_query_budget(view_func) -> QueryBudget | None:
+    return getattr(view_func, "query_budget", None)
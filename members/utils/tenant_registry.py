@@ -0,0 +1,119 @@
+"""
+Process-local registry of School rows for tenant resolution.
+
+TenantMiddleware, get_current_school() and the branding context processor resolve
+the school on every request. The registry keeps School rows keyed by code and by id
+so that steady-state resolution costs zero queries:
+
+- Entries expire after settings.TENANT_CACHE_TTL seconds (default 300). The TTL bounds
+  staleness across gunicorn workers, since signals only reach the local process.
+- post_save / post_delete on School clear the local registry immediately (and again on
+  commit, so a concurrent reader cannot re-cache the pre-commit row).
+- Rows read inside an open transaction are returned but not cached: they may still be
+  rolled back (this also keeps TestCase isolation intact).
+
+Callers receive a shallow copy, so mutating the returned School never leaks into the cache.
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+_DEFAULT_KEY = "__default__"
+_MISSING = object()
+
+_lock = threading.Lock()
+_by_code: dict[str, tuple[float, object]] = {}
+_by_id: dict[int, tuple[float, object]] = {}
+
+
+def _ttl() -> float:
+    return float(getattr(settings, "TENANT_CACHE_TTL", 300))
+
+
+def _lookup(store, key):
+    entry = store.get(key)
+    if entry is None:
+        return _MISSING
+    expires, school = entry
+    if expires < time.monotonic():
+        return _MISSING
+    return school
+
+
+def _remember(school, *codes):
+    """Cache school (or None for a negative lookup) under the given code keys and its id."""
+    if transaction.get_connection().in_atomic_block:
+        return
+    expires = time.monotonic() + _ttl()
+    with _lock:
+        for code in codes:
+            _by_code[code] = (expires, school)
+        if school is not None:
+            _by_id[school.pk] = (expires, school)
+            _by_code[school.code] = (expires, school)
+
+
+def _copy(school):
+    return copy.copy(school) if school is not None else None
+
+
+def get_school_by_code(code: str | None):
+    """Return the School with this subdomain code, or None."""
+    if not code:
+        return None
+    code = code.lower()
+    school = _lookup(_by_code, code)
+    if school is _MISSING:
+        from members.models import School
+
+        school = School.objects.filter(code=code).first()
+        _remember(school, code)
+    return _copy(school)
+
+
+def get_school_by_id(school_id: int | None):
+    """Return the School with this primary key, or None."""
+    if not school_id:
+        return None
+    school = _lookup(_by_id, school_id)
+    if school is _MISSING:
+        from members.models import School
+
+        school = School.objects.filter(pk=school_id).first()
+        if school is not None:
+            _remember(school)
+    return _copy(school)
+
+
+def get_default_school():
+    """Cached equivalent of School.objects.first() (localhost / single-tenant fallback)."""
+    school = _lookup(_by_code, _DEFAULT_KEY)
+    if school is _MISSING:
+        from members.models import School
+
+        school = School.objects.first()
+        _remember(school, _DEFAULT_KEY)
+    return _copy(school)
+
+
+def clear() -> None:
+    """Drop every cached entry in this process."""
+    with _lock:
+        _by_code.clear()
+        _by_id.clear()
+
+
+@receiver(post_save, sender="members.School")
+@receiver(post_delete, sender="members.School")
+def _invalidate_school(sender, instance, **kwargs):
+    # Any School change can affect the default school and negative lookups: clear all.
+    clear()
+    transaction.on_commit(clear)
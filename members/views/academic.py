@@ -1,18 +1,24 @@
+import json
 from datetime import date
-from django.core.paginator import Paginator
 from django.db.models import Q
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponse
-from django.template.loader import get_template
+from django.http import JsonResponse
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.utils.html import format_html
-from xhtml2pdf import pisa
+from django.views.decorators.http import require_POST
 from ..models import Member, Attendance, ClassRoom, ExamScore, Subject, ExamType
 from ..utils import get_current_school
+from ..utils.keyset import KeysetPaginator
 from ..utils.role_guards import require_roles
+from ..services.attendance import AttendanceService
+from ..services.pdf import PdfService, legacy_subject_marks as _get_legacy_subject_marks
+from ..utils.tabular_export import Column, class_label, export_response, full_name
+from ..utils.query_budget import query_budget
 
 @login_required
 @require_roles("OWNER", "ADMIN", "TEACHER", "STAFF")
+@query_budget(15)
 def attendance(request):
     """Crash-Proof Attendance Register"""
     school = get_current_school(request)
@@ -34,7 +40,7 @@ def attendance(request):
     if selected_class_id:
         students = Member.objects.filter(school=school, student_class_id=selected_class_id).order_by('firstname')
         existing_records = Attendance.objects.filter(
-            student__school=school, 
+            school=school,
             student__student_class_id=selected_class_id, 
             date=selected_date
         )
@@ -50,16 +56,13 @@ def attendance(request):
             class_input = ''
             
         student_ids = request.POST.getlist('student_ids')
-        if student_ids:
-            students_to_mark = Member.objects.filter(school=school, id__in=student_ids)
-            for student in students_to_mark:
-                status = request.POST.get(f'status_{student.id}')
-                if status:
-                    Attendance.objects.update_or_create(
-                        student=student,
-                        date=date_input,
-                        defaults={'status': status}
-                    )
+        try:
+            day = date.fromisoformat(date_input or '')
+        except ValueError:
+            day = None
+        if student_ids and day:
+            statuses = {sid: request.POST.get(f'status_{sid}') for sid in student_ids}
+            AttendanceService.save_day(school.id, day, {sid: s for sid, s in statuses.items() if s})
         return redirect(f'/attendance/?class_id={class_input}&date={date_input}')
 
     context = {
@@ -70,45 +73,88 @@ def attendance(request):
     }
     return render(request, 'attendance.html', context)
 
+
 @login_required
 @require_roles("OWNER", "ADMIN", "TEACHER", "STAFF")
-def attendance_records(request):
-    """View Historical Attendance Logs"""
+@require_POST
+def attendance_bulk_save(request):
+    """
+    JSON: save a whole class for one day in one call.
+    Body: {"date": "YYYY-MM-DD", "class_id": 3, "records": [{"student_id": 1, "status": "Present"}, ...]}
+    """
     school = get_current_school(request)
-    date_filter = request.GET.get('date')
-    class_filter = request.GET.get('class_id')
-    
-    records = Attendance.objects.filter(student__school=school).select_related('student', 'student__student_class').order_by('-date', 'student__firstname')
-    
+    if not school:
+        return JsonResponse({"ok": False, "error": "No school context"}, status=403)
+    try:
+        payload = json.loads(request.body or b"{}")
+        day = date.fromisoformat(payload["date"])
+        class_id = int(payload["class_id"]) if payload.get("class_id") not in (None, "") else None
+        statuses = {rec["student_id"]: rec["status"] for rec in payload["records"]}
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({"ok": False, "error": "Expected JSON with date, class_id and records"}, status=400)
+    result = AttendanceService.save_day(school.id, day, statuses, class_id=class_id)
+    return JsonResponse({
+        "ok": True,
+        "created": result.created,
+        "updated": result.updated,
+        "unchanged": result.unchanged,
+        "skipped": result.skipped,
+    })
+
+
+def _filtered_attendance(school, params):
+    """Attendance of the school narrowed by the attendance_records filters (date, class_id)."""
+    records = Attendance.objects.filter(school=school)
+    date_filter = params.get('date')
+    class_filter = params.get('class_id')
     if date_filter:
         records = records.filter(date=date_filter)
     if class_filter and class_filter not in ['None', '']:
         records = records.filter(student__student_class_id=class_filter)
+    return records
+
+
+@login_required
+@require_roles("OWNER", "ADMIN", "TEACHER", "STAFF")
+def attendance_records(request):
+    """View Historical Attendance Logs"""
+    school = get_current_school(request)
+    date_filter = request.GET.get('date')
+    class_filter = request.GET.get('class_id')
     
-    paginator = Paginator(records, 50)
-    page_obj = paginator.get_page(request.GET.get('page', 1))
+    records = _filtered_attendance(school, request.GET).select_related('student', 'student__student_class')
+
+    # Newest day first, in the order the day was recorded; the total is the planner's estimate.
+    paginator = KeysetPaginator(records, 50, ordering=('-date', 'id'), count='estimate')
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+
+    # Class summary for the month (of the selected date, else this month) from the rollup table
+    class_summary, summary_month = None, None
+    if class_filter and class_filter.isdigit():
+        try:
+            summary_month = date.fromisoformat(date_filter).replace(day=1) if date_filter else date.today().replace(day=1)
+        except ValueError:
+            summary_month = date.today().replace(day=1)
+        class_summary = AttendanceService.class_month_summary(school.id, int(class_filter), summary_month)
 
     classes = ClassRoom.objects.filter(school=school)
     context = {
         'records': page_obj,
         'page_obj': page_obj,
+        'class_summary': class_summary,
+        'summary_month': summary_month,
         'classes': classes,
         'selected_date': date_filter,
         'selected_class': int(class_filter) if class_filter and class_filter.isdigit() else None
     }
     return render(request, 'attendance_records.html', context)
 
-@login_required
-@require_roles("OWNER", "ADMIN", "TEACHER", "STAFF")
-def report_card(request):
-    school = get_current_school(request)
-    scores = ExamScore.objects.filter(student__school=school).select_related(
-        'student', 'student__student_class', 'exam_type'
-    ).order_by('-id')
-
-    class_filter = request.GET.get('class_id')
-    student_filter = request.GET.get('student')
-    exam_filter = request.GET.get('exam')
+def _filtered_scores(school, params):
+    """Exam scores of the school narrowed by the report card filters (class_id, student, exam)."""
+    scores = ExamScore.objects.filter(school=school)
+    class_filter = params.get('class_id')
+    student_filter = params.get('student')
+    exam_filter = params.get('exam')
 
     if class_filter and class_filter not in ('', 'None'):
         scores = scores.filter(student__student_class_id=class_filter)
@@ -120,11 +166,41 @@ def report_card(request):
         )
     if exam_filter:
         scores = scores.filter(exam_name__icontains=exam_filter)
+    return scores
 
-    paginator = Paginator(scores, 25)
-    page_obj = paginator.get_page(request.GET.get('page', 1))
-    subjects = Subject.objects.filter(school=school).order_by('name')
-    max_total = (subjects.count() * 100) if subjects.exists() else 500
+
+@login_required
+@require_roles("OWNER", "ADMIN", "TEACHER", "STAFF")
+def export_attendance(request):
+    """Attendance matching the attendance_records filters as XLSX / CSV."""
+    school = get_current_school(request)
+    records = _filtered_attendance(school, request.GET).order_by('-date', 'student__firstname', 'id')
+    return export_response(request, records, [
+        Column('Date', 'date'),
+        Column('Admission No', 'student__admission_no'),
+        Column('Roll No', 'student__roll_number'),
+        Column('Student', ('student__firstname', 'student__lastname'), full_name),
+        Column('Class', ('student__student_class__name', 'student__student_class__section'), class_label),
+        Column('Status', 'status'),
+    ], 'Attendance', 'Attendance')
+
+@login_required
+@require_roles("OWNER", "ADMIN", "TEACHER", "STAFF")
+@query_budget(12)
+def report_card(request):
+    school = get_current_school(request)
+    scores = _filtered_scores(school, request.GET).select_related(
+        'student', 'student__student_class', 'exam_type'
+    )
+
+    class_filter = request.GET.get('class_id')
+    student_filter = request.GET.get('student')
+    exam_filter = request.GET.get('exam')
+
+    paginator = KeysetPaginator(scores, 25, ordering=('-id',))
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+    subjects = list(Subject.objects.filter(school=school).order_by('name'))
+    max_total = len(subjects) * 100 or 500
     for s in page_obj.object_list:
         s.subject_marks_display = _get_legacy_subject_marks(s)
         s.marks_list = [(sub.name, s.subject_marks_display.get(sub.name, 0)) for sub in subjects]
@@ -136,7 +212,7 @@ def report_card(request):
     return render(request, 'report_card.html', {
         'scores': page_obj,
         'page_obj': page_obj,
-        'total_exams': scores.count(),
+        'total_exams': paginator.count,
         'classes': classes,
         'subjects': subjects,
         'class_filter': class_filter or '',
@@ -144,18 +220,6 @@ def report_card(request):
         'exam_filter': exam_filter or '',
     })
 
-def _get_legacy_subject_marks(score):
-    """Return subject name -> marks from legacy columns or subject_marks."""
-    if score.subject_marks:
-        return score.subject_marks
-    return {
-        'Maths': score.maths or 0,
-        'Physics': score.physics or 0,
-        'Chemistry': score.chemistry or 0,
-        'English': score.english or 0,
-        'Computer': score.computer or 0,
-    }
-
 
 @login_required
 @require_roles("OWNER", "ADMIN", "TEACHER")
@@ -195,9 +259,9 @@ def add_marks(request):
 @login_required
 @require_roles("OWNER", "ADMIN", "TEACHER", "STAFF", "PARENT")
 def marksheet_pdf(request, id):
-    """Generate marksheet PDF synchronously (no background task required)"""
+    """Marksheet PDF, rendered in the background and cached (see services.pdf)"""
     school = get_current_school(request)
-    score = get_object_or_404(ExamScore, id=id, student__school=school)
+    score = get_object_or_404(ExamScore, id=id, school=school)
     from ..utils.roles import get_user_role
     if get_user_role(request) == "PARENT":
         profile = getattr(request.user, "userprofile", None)
@@ -205,31 +269,33 @@ def marksheet_pdf(request, id):
             from django.http import HttpResponseForbidden
             return HttpResponseForbidden("You can only view your linked students' report cards.")
 
-    from django.utils import timezone
-
-    subject_marks_dict = _get_legacy_subject_marks(score)
-    total_obtained = sum(v for k, v in subject_marks_dict.items() if isinstance(v, (int, float)))
-    total_max = len(subject_marks_dict) * 100 if subject_marks_dict else 500
-    percentage = round((total_obtained / total_max) * 100, 2) if total_max > 0 else 0
-    result_status = 'PASS' if total_obtained >= (total_max * 0.33) else 'FAIL'
-
-    template = get_template('marksheet_pdf.html')
-    html = template.render({
-        'score': score,
-        'student': score.student,
-        'school': school,
-        'subject_marks_dict': subject_marks_dict,
-        'total_obtained': total_obtained,
-        'total_max': total_max,
-        'percentage': percentage,
-        'result_status': result_status,
-        'date': timezone.now().date(),
-    })
+    return PdfService.respond(request, "marksheet", score, f"marksheet_{score.student.firstname}_{score.exam_name}.pdf")
+
 
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'filename="marksheet_{score.student.firstname}_{score.exam_name}.pdf"'
-    pisa.CreatePDF(html, dest=response)
-    return response
+@login_required
+@require_roles("OWNER", "ADMIN", "TEACHER", "STAFF")
+@require_POST
+def marksheet_export(request):
+    """Start a batch export of the marksheets matching the report card filters (a class is required)."""
+    school = get_current_school(request)
+    class_id = request.POST.get('class_id')
+    if not class_id or not class_id.isdigit():
+        messages.error(request, "Choose a class to export its marksheets.")
+        return redirect('report_card')
+    classroom = get_object_or_404(ClassRoom, id=int(class_id), school=school)
+    score_ids = list(
+        _filtered_scores(school, request.POST)
+        .order_by('student__roll_number', 'student__firstname', 'id')
+        .values_list('id', flat=True)
+    )
+    if not score_ids:
+        messages.error(request, "No marksheets match the selected filters.")
+        return redirect('report_card')
+    exam = request.POST.get('exam', '').strip()
+    label = f"{classroom}" + (f" - {exam}" if exam else "")
+    output = 'pdf' if request.POST.get('output') == 'pdf' else 'zip'
+    export = PdfService.start_export(school, 'marksheet', score_ids, output=output, label=label, created_by=request.user)
+    return redirect('pdf_export_detail', pk=export.pk)
 
 
 # --- Subject & Exam type management ---
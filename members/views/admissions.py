@@ -7,6 +7,7 @@ from django.views.decorators.http import require_POST
 
 from ..models import AdmissionEnquiry, Member, ClassRoom
 from ..utils import get_current_school
+from ..utils.aggregates import count_values
 from ..utils.role_guards import require_roles
 
 
@@ -21,10 +22,11 @@ def enquiry_list(request):
     qs = AdmissionEnquiry.objects.filter(school=school).order_by("-created_at")
     if status_filter:
         qs = qs.filter(status=status_filter)
-    status_counts = [
-        (s, AdmissionEnquiry.objects.filter(school=school, status=s).count())
-        for s in ["New", "Contacted", "Visited", "Admitted", "Lost"]
-    ]
+    status_counts = list(
+        count_values(
+            AdmissionEnquiry.objects.filter(school=school), "status", ["New", "Contacted", "Visited", "Admitted", "Lost"]
+        ).items()
+    )
     return render(
         request,
         "enquiry_list.html",
@@ -1,14 +1,14 @@
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect, get_object_or_404
-from django.db.models import Sum
 from django.http import HttpResponse
-from datetime import date
 
-from ..models import Member, Notice, FeeTransaction, LibraryTransaction, StudentTransport
+from ..models import Member, Notice, FeeTransaction
 from ..forms import AddNoticeForm
+from ..services.dashboard import DashboardService
 from ..utils import get_current_school
 from ..utils.role_guards import require_roles
 from ..utils.roles import get_user_role
+from ..utils.query_budget import query_budget
 
 
 def landing(request):
@@ -30,6 +30,7 @@ def landing(request):
 
 @login_required
 @require_roles("OWNER", "ADMIN", "ACCOUNTANT", "TEACHER", "STAFF", "STUDENT", "PARENT")
+@query_budget(15)
 def index(request):
     school = getattr(request, "school", None)
     if school is None:
@@ -38,26 +39,15 @@ def index(request):
         return redirect("student_portal")
     if get_user_role(request) == "PARENT":
         return redirect("parent_dashboard")
-    total_students = Member.objects.filter(school=school).count()
-    new_admissions = Member.objects.filter(
-        school=school,
-        joined_date__month=date.today().month,
-    ).count()
-    revenue_stats = Member.objects.filter(school=school).aggregate(
-        total_expected=Sum("fee_total"),
-        total_collected=Sum("fee_paid"),
-    )
-    total_revenue = revenue_stats["total_collected"] or 0
-    pending_dues = (revenue_stats["total_expected"] or 0) - total_revenue
+    snapshot = DashboardService.get(school.id)
+    total_revenue = snapshot.fee_collected
+    pending_dues = snapshot.fee_expected - total_revenue
     recent_transactions = (
-        FeeTransaction.objects.filter(student__school=school)
+        FeeTransaction.objects.filter(school=school)
         .select_related("student", "student__student_class")
         .order_by("-payment_date", "-id")[:5]
     )
 
-    # Added Phase 1 Analytics
-    male_count = Member.objects.filter(school=school, gender="Male").count()
-    female_count = Member.objects.filter(school=school, gender="Female").count()
     recent_admissions = Member.objects.filter(school=school).order_by("-joined_date", "-id")[:5]
 
     profile = getattr(request.user, "userprofile", None)
@@ -75,16 +65,16 @@ def index(request):
 
     context = {
         "school": school,
-        "total_students": total_students,
-        "new_admissions": new_admissions,
+        "total_students": snapshot.total_students,
+        "new_admissions": snapshot.new_admissions,
         "total_revenue": total_revenue,
         "pending_dues": pending_dues,
         "recent_transactions": recent_transactions,
-        "male_count": male_count,
-        "female_count": female_count,
+        "male_count": snapshot.male_count,
+        "female_count": snapshot.female_count,
         "recent_admissions": recent_admissions,
-        "students_on_bus": StudentTransport.objects.filter(school=school).count(),
-        "books_issued": LibraryTransaction.objects.filter(school=school, status="Issued").count(),
+        "students_on_bus": snapshot.students_on_bus,
+        "books_issued": snapshot.books_issued,
         "show_getting_started": show_getting_started,
         "getting_started_items": getting_started_items,
     }
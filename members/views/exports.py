@@ -0,0 +1,68 @@
+"""Batch PDF exports (class marksheets, receipt ranges) - progress page, JSON status, download."""
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+
+from ..models import PdfExport
+from ..utils import get_current_school
+from ..utils.role_guards import require_roles
+from ..services.pdf import PdfService
+
+EXPORT_ROLES = ("OWNER", "ADMIN", "ACCOUNTANT", "TEACHER", "STAFF")
+
+
+def _export_filename(export):
+    stem = f"{export.get_kind_display()} {export.label}".strip()
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in stem) + f".{export.output}"
+
+
+@login_required
+@require_roles(*EXPORT_ROLES)
+@require_GET
+def pdf_export_detail(request, pk):
+    """Progress page for one export; reloads itself until the download is ready."""
+    school = get_current_school(request)
+    export = get_object_or_404(PdfExport, pk=pk, school=school)
+    return render(request, "pdf_export.html", {"export": export, "filename": _export_filename(export)})
+
+
+@login_required
+@require_roles(*EXPORT_ROLES)
+@require_GET
+def pdf_export_status(request, pk):
+    """Render progress of one export (JSON, for polling)."""
+    school = get_current_school(request)
+    if not school:
+        return JsonResponse({"ok": False}, status=403)
+    e = get_object_or_404(PdfExport, pk=pk, school=school)
+    return JsonResponse({
+        "id": e.pk,
+        "kind": e.kind,
+        "output": e.output,
+        "label": e.label,
+        "status": e.status,
+        "total": e.total,
+        "rendered": e.rendered_count,
+        "download_url": reverse("pdf_export_download", args=[e.pk]) if e.status == "Done" else None,
+        "created_at": e.created_at.isoformat(),
+        "finished_at": e.finished_at.isoformat() if e.finished_at else None,
+    })
+
+
+@login_required
+@require_roles(*EXPORT_ROLES)
+@require_GET
+def pdf_export_download(request, pk):
+    """Stream a finished export: the merged PDF from storage, or a ZIP built on the fly."""
+    school = get_current_school(request)
+    export = get_object_or_404(PdfExport, pk=pk, school=school)
+    if export.status != "Done":
+        raise Http404("Export is not ready yet")
+    filename = _export_filename(export)
+    if export.output == "pdf":
+        return FileResponse(export.merged_file.open("rb"), as_attachment=True, filename=filename, content_type="application/pdf")
+    response = StreamingHttpResponse(PdfService.iter_zip(export.documents), content_type="application/zip")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -1,15 +1,16 @@
 from django.core.paginator import Paginator
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponse, JsonResponse
-from django.template.loader import get_template
+from django.http import JsonResponse
+from django.urls import reverse
 from django.db import transaction
 from django.db.models import Sum, F
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
 from django.utils import timezone
-from xhtml2pdf import pisa
 from ..models import (
     Member,
+    MemberQuerySet,
     FeeTransaction,
     ClassRoom,
     FeeStructure,
@@ -27,25 +28,39 @@ from ..forms import FeeCollectionForm, ExpenseForm
 from ..utils import get_current_school
 from ..utils.role_guards import require_roles
 from ..services.finance import FinanceService
+from ..services.pdf import PdfService
+from ..utils.tabular_export import Column, class_label, export_response, full_name
+from ..utils.query_budget import query_budget
 
-@login_required
-@require_roles("OWNER", "ADMIN", "ACCOUNTANT", "TEACHER", "STAFF")
-def fee_home(request):
-    school = get_current_school(request)
-    transactions = FeeTransaction.objects.filter(student__school=school).select_related('student').order_by('-payment_date', '-id')
-    
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
-    class_filter = request.GET.get('class_id')
-    mode_filter = request.GET.get('mode')
+DUES_LIST_LIMIT = 200
+
+def _filtered_transactions(school, params):
+    """Fee transactions of the school narrowed by the fee_home filters (dates, class, mode)."""
+    transactions = FeeTransaction.objects.filter(school=school)
+    start_date = params.get('start_date')
+    end_date = params.get('end_date')
+    class_filter = params.get('class_id')
+    mode_filter = params.get('mode')
 
     if start_date: transactions = transactions.filter(payment_date__gte=start_date)
     if end_date: transactions = transactions.filter(payment_date__lte=end_date)
     if class_filter: transactions = transactions.filter(student__student_class__id=class_filter)
     if mode_filter: transactions = transactions.filter(payment_mode=mode_filter)
+    return transactions
+
+
+@login_required
+@require_roles("OWNER", "ADMIN", "ACCOUNTANT", "TEACHER", "STAFF")
+def fee_home(request):
+    school = get_current_school(request)
+    transactions = _filtered_transactions(school, request.GET).select_related('student').order_by('-payment_date', '-id')
 
     total_collected = transactions.aggregate(Sum('amount_paid'))['amount_paid__sum'] or 0
-    students = Member.objects.filter(school=school).annotate(balance=F('fee_total') - F('fee_paid')).order_by('-balance')
+    # Largest dues for the quick-pay table; the payment modal finds anyone else via student_search
+    students = (
+        Member.objects.filter(school=school).for_list()
+        .annotate(balance=F('fee_total') - F('fee_paid')).filter(balance__gt=0).order_by('-balance', 'id')[:DUES_LIST_LIMIT]
+    )
     tx_paginator = Paginator(transactions, 25)
     page_obj = tx_paginator.get_page(request.GET.get('page', 1))
 
@@ -57,6 +72,25 @@ def fee_home(request):
 
 @login_required
 @require_roles("OWNER", "ADMIN", "ACCOUNTANT")
+def export_fee_transactions(request):
+    """Fee transactions matching the fee_home filters as XLSX / CSV."""
+    school = get_current_school(request)
+    transactions = _filtered_transactions(school, request.GET).order_by('-payment_date', '-id')
+    return export_response(request, transactions, [
+        Column('Receipt #', ('payment_date', 'id'), lambda d, pk: f"REC-{d.strftime('%Y%m%d')}-{pk}"),
+        Column('Date', 'payment_date'),
+        Column('Admission No', 'student__admission_no'),
+        Column('Student', ('student__firstname', 'student__lastname'), full_name),
+        Column('Class', ('student__student_class__name', 'student__student_class__section'), class_label),
+        Column('Month', 'month_year'),
+        Column('Mode', 'payment_mode'),
+        Column('Amount', 'amount_paid'),
+        Column('Status', 'status'),
+    ], 'Fee_Transactions', 'Transactions')
+
+@login_required
+@require_roles("OWNER", "ADMIN", "ACCOUNTANT")
+@query_budget(28)
 def collect_fee(request):
     if request.method == "POST":
         school = get_current_school(request)
@@ -108,14 +142,30 @@ def generate_monthly_dues(request):
 @require_roles("OWNER", "ADMIN", "ACCOUNTANT", "TEACHER", "STAFF")
 def receipt_pdf(request, id):
     school = get_current_school(request)
-    t = get_object_or_404(FeeTransaction, id=id, student__school=school)
-    template = get_template('receipt_pdf.html')
-    school = t.student.school
-    remaining_balance = (t.student.fee_total or 0) - (t.student.fee_paid or 0)
-    html = template.render({'t': t, 'school': school, 'remaining_balance': remaining_balance})
-    response = HttpResponse(content_type='application/pdf')
-    pisa.CreatePDF(html, dest=response)
-    return response
+    t = get_object_or_404(FeeTransaction.objects.select_related('student__school'), id=id, school=school)
+    return PdfService.respond(request, "receipt", t, f"receipt_{t.receipt_code}.pdf")
+
+
+@login_required
+@require_roles("OWNER", "ADMIN", "ACCOUNTANT")
+@require_POST
+def receipt_export(request):
+    """Start a batch export of every receipt matching the fee_home filters (a date range is required)."""
+    school = get_current_school(request)
+    start_date = request.POST.get('start_date')
+    end_date = request.POST.get('end_date')
+    if not start_date or not end_date:
+        messages.error(request, "Choose a date range to export receipts.")
+        return redirect('fee_home')
+    tx_ids = list(_filtered_transactions(school, request.POST).order_by('payment_date', 'id').values_list('id', flat=True))
+    if not tx_ids:
+        messages.error(request, "No receipts in the selected range.")
+        return redirect('fee_home')
+    output = 'pdf' if request.POST.get('output') == 'pdf' else 'zip'
+    export = PdfService.start_export(
+        school, 'receipt', tx_ids, output=output, label=f"{start_date} to {end_date}", created_by=request.user
+    )
+    return redirect('pdf_export_detail', pk=export.pk)
 
 
 @login_required
@@ -132,7 +182,7 @@ def student_receipt_pdf(request, student_id: int):
 @require_roles("OWNER", "ADMIN")
 def delete_fee(request, id):
     school = get_current_school(request)
-    t = get_object_or_404(FeeTransaction, id=id, student__school=school)
+    t = get_object_or_404(FeeTransaction, id=id, school=school)
     with transaction.atomic():
         Member.objects.filter(pk=t.student_id).update(
             fee_paid=F('fee_paid') - t.amount_paid
@@ -177,20 +227,12 @@ def add_expense(request):
 
 @login_required
 @require_roles("OWNER", "ADMIN", "ACCOUNTANT")
+@query_budget(8)
 def fee_installments(request):
-    """List fee installments by student; ensure quarterly installments exist for active academic year."""
+    """List fee installments by student (read-only; rows come from generate_installments)."""
     school = get_current_school(request)
     class_id = request.GET.get('class_id')
     student_id = request.GET.get('student_id')
-    today = timezone.now().date()
-    students_qs = Member.objects.filter(school=school).select_related('student_class').order_by('student_class__name', 'firstname')
-    if class_id:
-        students_qs = students_qs.filter(student_class_id=class_id)
-    if student_id:
-        students_qs = students_qs.filter(id=student_id)
-    # Ensure installments exist for each student
-    for student in students_qs:
-        FinanceService.ensure_quarterly_installments(student, as_of=today)
     installments = FeeInstallment.objects.filter(school=school).select_related('student', 'student__student_class', 'academic_year').order_by('student__firstname', 'due_date')
     if class_id:
         installments = installments.filter(student__student_class_id=class_id)
@@ -200,10 +242,24 @@ def fee_installments(request):
     return render(request, 'fee_installments.html', {
         'installments': installments,
         'classes': classes,
-        'students': students_qs[:500],
     })
 
 
+@login_required
+@require_roles("OWNER", "ADMIN", "ACCOUNTANT")
+@require_POST
+def fee_installments_generate(request):
+    """Bulk-generate quarterly installments for the school (or one class) and refresh late fees."""
+    school = get_current_school(request)
+    class_id = request.POST.get('class_id')
+    class_id = int(class_id) if class_id and class_id.isdigit() else None
+    if class_id:
+        get_object_or_404(ClassRoom, id=class_id, school=school)
+    FinanceService.generate_installments(school.id, class_id=class_id, as_of=timezone.now().date())
+    url = reverse('fee_installments')
+    return redirect(f"{url}?class_id={class_id}" if class_id else url)
+
+
 # --- Finance v2: Discounts ---
 
 
@@ -262,7 +318,10 @@ def fee_discount_delete(request, pk):
 def fee_concessions(request):
     """List and add student concessions (assign discount to student)."""
     school = get_current_school(request)
-    concessions = StudentConcession.objects.filter(school=school).select_related('student', 'discount').order_by('-id')
+    concessions = (
+        StudentConcession.objects.filter(school=school).select_related('student', 'discount')
+        .defer(*MemberQuerySet.related_defer('student')).order_by('-id')
+    )
     if request.method == "POST" and request.POST.get('action') == 'add':
         student_id = request.POST.get('student_id')
         discount_id = request.POST.get('discount_id')
@@ -271,7 +330,7 @@ def fee_concessions(request):
             discount = get_object_or_404(FeeDiscount, id=discount_id, school=school)
             StudentConcession.objects.get_or_create(school=school, student=student, discount=discount, defaults={'is_active': True})
             return redirect('fee_concessions')
-    students = Member.objects.filter(school=school).select_related('student_class').order_by('firstname')
+    students = Member.objects.filter(school=school).for_picker()
     discounts = FeeDiscount.objects.filter(school=school, is_active=True)
     return render(request, 'fee_concessions.html', {'concessions': concessions, 'students': students, 'discounts': discounts})
 
@@ -306,6 +365,30 @@ def fee_receipts(request):
     return render(request, 'fee_receipts.html', {'receipts': receipts})
 
 
+@login_required
+@require_roles("OWNER", "ADMIN", "ACCOUNTANT")
+def export_fee_receipts(request):
+    """All fee payment receipts of the school (optionally ?start_date / ?end_date) as XLSX / CSV."""
+    school = get_current_school(request)
+    receipts = FeePaymentReceipt.objects.filter(school=school).order_by('-received_at', '-id')
+    if request.GET.get('start_date'):
+        receipts = receipts.filter(received_at__date__gte=request.GET['start_date'])
+    if request.GET.get('end_date'):
+        receipts = receipts.filter(received_at__date__lte=request.GET['end_date'])
+    return export_response(request, receipts, [
+        Column('Receipt ID', 'id'),
+        Column('Received At', 'received_at'),
+        Column('Admission No', 'student__admission_no'),
+        Column('Student', ('student__firstname', 'student__lastname'), full_name),
+        Column('Class', ('student__student_class__name', 'student__student_class__section'), class_label),
+        Column('Amount', 'amount'),
+        Column('Mode', 'mode'),
+        Column('Status', 'status'),
+        Column('Reference', ('upi_ref', 'bank_ref', 'cheque_no', 'gateway_payment_id'), lambda *refs: next((r for r in refs if r), '')),
+        Column('Notes', 'notes'),
+    ], 'Fee_Receipts', 'Receipts')
+
+
 @login_required
 @require_roles("OWNER", "ADMIN", "ACCOUNTANT")
 @require_POST
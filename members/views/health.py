@@ -1,7 +1,26 @@
-"""Health check endpoint for load balancers and PaaS platforms."""
-from django.http import HttpResponse
+"""Health check and metrics endpoints for load balancers, PaaS platforms and Prometheus."""
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from ..services import metrics as request_metrics
 
 
 def health(request):
     """Returns 200 OK - no auth, no tenant required."""
     return HttpResponse("OK", content_type="text/plain")
+
+
+def metrics(request):
+    """Request metrics of all workers in the Prometheus text format.
+
+    Needs "Authorization: Bearer <METRICS_TOKEN>"; without a METRICS_TOKEN only DEBUG serves it.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+            return HttpResponseForbidden("Invalid metrics token")
+    elif not settings.DEBUG:
+        return HttpResponseForbidden("Set METRICS_TOKEN to enable metrics")
+    return HttpResponse(request_metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,26 +1,24 @@
-from django.core.paginator import Paginator
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponse
-from django.template.loader import get_template
 from django.db.models import Sum
 from django.contrib.auth.decorators import login_required
-from xhtml2pdf import pisa
 from ..models import Staff, SalaryTransaction
 from ..utils import get_current_school
+from ..utils.keyset import KeysetPaginator
 from ..utils.role_guards import require_roles
+from ..services.pdf import PdfService
 
 @login_required
 @require_roles("OWNER", "ADMIN", "ACCOUNTANT", "TEACHER", "STAFF")
 def staff_list(request):
     school = get_current_school(request)
-    staff_qs = Staff.objects.filter(school=school, is_active=True).order_by('first_name', 'last_name')
-    paginator = Paginator(staff_qs, 25)
-    page_obj = paginator.get_page(request.GET.get('page', 1))
+    staff_qs = Staff.objects.filter(school=school, is_active=True)
+    paginator = KeysetPaginator(staff_qs, 25, ordering=('first_name', 'last_name', 'id'), count='exact')
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     salary_history = SalaryTransaction.objects.select_related('staff').filter(school=school).order_by('-payment_date')[:50]
     
     context = {
         'staff_members': page_obj, 'page_obj': page_obj, 'salary_history': salary_history,
-        'total_staff': staff_qs.count(),
+        'total_staff': paginator.count,
         'monthly_payroll_est': staff_qs.aggregate(Sum('salary'))['salary__sum'] or 0
     }
     return render(request, 'hr_staff.html', context)
@@ -56,8 +54,4 @@ def pay_salary(request):
 def salary_slip_pdf(request, id):
     school = get_current_school(request)
     t = get_object_or_404(SalaryTransaction, id=id, school=school)
-    template = get_template('salary_slip_pdf.html')
-    html = template.render({'t': t, 'school': t.school})
-    response = HttpResponse(content_type='application/pdf')
-    pisa.CreatePDF(html, dest=response)
-    return response
\ No newline at end of file
+    return PdfService.respond(request, "salary_slip", t, f"salary_slip_{t.id}.pdf")
\ No newline at end of file
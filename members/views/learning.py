@@ -3,7 +3,6 @@ Phase 2: Learning Hub - Study Materials & Video Library
 """
 import re
 from django.contrib import messages
-from django.core.paginator import Paginator
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ValidationError
 from django.shortcuts import render, redirect, get_object_or_404
@@ -11,6 +10,7 @@ from django.db.models import Q
 
 from ..models import StudyMaterial
 from ..utils import get_current_school
+from ..utils.keyset import KeysetPaginator
 from ..utils.role_guards import require_roles
 from ..validators import validate_document_file
 
@@ -64,7 +64,7 @@ def learning_hub(request):
             return redirect("learning_hub")
 
     # Filter by subject/class
-    qs = StudyMaterial.objects.filter(school=school).order_by("-id")
+    qs = StudyMaterial.objects.filter(school=school)
     subject_filter = request.GET.get("subject", "").strip()
     class_filter = request.GET.get("class", "").strip()
     if subject_filter:
@@ -72,8 +72,8 @@ def learning_hub(request):
     if class_filter:
         qs = qs.filter(class_name__icontains=class_filter)
 
-    paginator = Paginator(qs, 15)
-    page_obj = paginator.get_page(request.GET.get("page", 1))
+    paginator = KeysetPaginator(qs, 15, ordering=("-id",))
+    page_obj = paginator.get_page(request.GET.get("cursor"))
 
     # Add embed URL for templates
     materials = []
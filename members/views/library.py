@@ -1,4 +1,3 @@
-import xlwt
 from datetime import date
 from django.core.paginator import Paginator
 from django.contrib import messages
@@ -7,33 +6,35 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.http import HttpResponse
 from django.contrib.auth.decorators import login_required
 from django.core.files.storage import FileSystemStorage
-from ..models import Member, Book, LibraryTransaction, StudyMaterial
+from ..models import Book, LibraryTransaction, MemberQuerySet, StudyMaterial
 from ..utils import get_current_school
 from ..utils.role_guards import require_roles
 from ..validators import validate_document_file
+from ..utils.tabular_export import Column, export_response, full_name
+from ..utils.query_budget import query_budget
 from ..services.library import LibraryService  # Service Layer Import
 
 @login_required
 @require_roles("OWNER", "ADMIN", "ACCOUNTANT", "TEACHER", "STAFF")
+@query_budget(10)
 def library(request):
     school = get_current_school(request)
     books = Book.objects.filter(school=school).order_by('-id')
     transactions_qs = (
         LibraryTransaction.objects.filter(school=school, status='Issued')
         .select_related('student', 'book')
+        .defer(*MemberQuerySet.related_defer('student'))
         .order_by('-id')
     )
     paginator = Paginator(transactions_qs, 25)
     page_obj = paginator.get_page(request.GET.get('page', 1))
-    all_students = Member.objects.filter(school=school).order_by('firstname')
 
     context = {
         'books': books,
         'transactions': page_obj,
         'page_obj': page_obj,
         'total_books': books.count(),
-        'issued_books': transactions_qs.count(), 
-        'all_students': all_students
+        'issued_books': transactions_qs.count(),
     }
     return render(request, 'library.html', context)
 
@@ -92,21 +93,15 @@ def delete_book(request, id):
 @require_roles("OWNER", "ADMIN", "ACCOUNTANT", "TEACHER", "STAFF")
 def export_library_history(request):
     school = get_current_school(request)
-    response = HttpResponse(content_type='application/ms-excel')
-    response['Content-Disposition'] = 'attachment; filename="Library_Report.xls"'
-    wb = xlwt.Workbook(encoding='utf-8')
-    ws = wb.add_sheet('Library')
-    columns = ['Student', 'Book', 'Issue Date', 'Due Date', 'Status', 'Fine']
-    for col, name in enumerate(columns): ws.write(0, col, name)
-    for row, t in enumerate(LibraryTransaction.objects.filter(school=school).select_related('student', 'book'), 1):
-        ws.write(row, 0, f"{t.student.firstname} {t.student.lastname}")
-        ws.write(row, 1, t.book.title)
-        ws.write(row, 2, str(t.issue_date))
-        ws.write(row, 3, str(t.due_date))
-        ws.write(row, 4, t.status)
-        ws.write(row, 5, t.fine_amount)
-    wb.save(response)
-    return response
+    transactions = LibraryTransaction.objects.filter(school=school).order_by('-issue_date', '-id')
+    return export_response(request, transactions, [
+        Column('Student', ('student__firstname', 'student__lastname'), full_name),
+        Column('Book', 'book__title'),
+        Column('Issue Date', 'issue_date'),
+        Column('Due Date', 'due_date'),
+        Column('Status', 'status'),
+        Column('Fine', 'fine_amount'),
+    ], 'Library_Report', 'Library')
 
 @login_required
 @require_roles("OWNER", "ADMIN", "ACCOUNTANT", "TEACHER", "STAFF")
@@ -6,22 +6,24 @@ from django.views.decorators.http import require_POST
 from django.views.decorators.http import require_GET
 from django.contrib import messages
 
-from ..models import Notification, Member, UserProfile, ClassRoom
+from ..models import Notification, NotificationBroadcast, Member, UserProfile, ClassRoom
 from ..utils import get_current_school
 from ..utils.role_guards import require_roles
+from ..utils.query_budget import query_budget
+from ..services.notifications import NotificationService
 
 
 @login_required
 @require_GET
+@query_budget(5)
 def notification_list(request):
     """Return recent notifications for current user (for navbar dropdown)."""
     school = get_current_school(request)
     if not school:
         return JsonResponse({"notifications": [], "unread_count": 0})
-    qs = Notification.objects.filter(school=school, user=request.user).order_by("-created_at")[:15]
-    notifications = [{"id": n.id, "title": n.title, "message": n.message[:100] if n.message else "", "read": n.read, "created_at": n.created_at.isoformat()} for n in qs]
-    unread_count = Notification.objects.filter(school=school, user=request.user, read=False).count()
-    return JsonResponse({"notifications": notifications, "unread_count": unread_count})
+    summary = NotificationService.summary(school.id, request.user.id)
+    notifications = [{"id": n["id"], "title": n["title"], "message": n["message"][:100] if n["message"] else "", "read": n["read"], "created_at": n["created_at"].isoformat()} for n in summary["recent"]]
+    return JsonResponse({"notifications": notifications, "unread_count": summary["unread_count"]})
 
 
 @login_required
@@ -47,7 +49,7 @@ def notification_mark_all_read(request):
     school = get_current_school(request)
     if not school:
         return JsonResponse({"ok": False}, status=403)
-    Notification.objects.filter(school=school, user=request.user, read=False).update(read=True)
+    NotificationService.mark_all_read(school.id, request.user.id)
     if request.headers.get("X-Requested-With") == "XMLHttpRequest" or request.GET.get("ajax"):
         return JsonResponse({"ok": True})
     return redirect(request.GET.get("next", "index"))
@@ -77,7 +79,29 @@ def notification_send(request):
     else:
         profiles = UserProfile.objects.filter(school=school).exclude(role="STUDENT")
     user_ids = list(profiles.values_list("user_id", flat=True))
-    for uid in user_ids:
-        Notification.objects.create(school=school, user_id=uid, title=title, message=message)
-    messages.success(request, f"Notification sent to {len(user_ids)} user(s).")
+    broadcast = NotificationService.broadcast(school, title, message, user_ids, created_by=request.user)
+    if broadcast.status == "Done":
+        messages.success(request, f"Notification sent to {broadcast.total_recipients} user(s).")
+    else:
+        messages.success(request, f"Sending notification to {broadcast.total_recipients} user(s) in the background (broadcast #{broadcast.pk}).")
     return redirect("index")
+
+
+@login_required
+@require_roles("OWNER", "ADMIN", "TEACHER")
+@require_GET
+def notification_broadcast_status(request, pk):
+    """Delivery progress of one notification_send broadcast (JSON, for polling)."""
+    school = get_current_school(request)
+    if not school:
+        return JsonResponse({"ok": False}, status=403)
+    b = get_object_or_404(NotificationBroadcast, pk=pk, school=school)
+    return JsonResponse({
+        "id": b.pk,
+        "title": b.title,
+        "status": b.status,
+        "total": b.total_recipients,
+        "delivered": b.delivered_count,
+        "created_at": b.created_at.isoformat(),
+        "finished_at": b.finished_at.isoformat() if b.finished_at else None,
+    })
@@ -6,7 +6,9 @@ from django.db.models import Sum
 
 from ..models import Member, Attendance, FeeTransaction, ExamScore, Notice, StudyMaterial
 from ..utils import get_current_school
+from ..services.attendance import AttendanceService
 from ..utils.role_guards import require_roles
+from ..utils.query_budget import query_budget
 
 
 def _parent_students(request):
@@ -22,18 +24,31 @@ def _parent_students(request):
 
 @login_required
 @require_roles("PARENT")
+@query_budget(10)
 def parent_dashboard(request):
     """List linked students and short summary for each."""
     school = get_current_school(request)
     if not school:
         return HttpResponseForbidden("No school context")
-    students = _parent_students(request)
+    students = list(_parent_students(request))
+    # Attendance counts for all children from the monthly rollup (one grouped query)
+    attendance = AttendanceService.totals([s.id for s in students])
+    # Latest exam name of every child in one query (newest first, first row per student wins)
+    latest_exam = {}
+    exams = (
+        ExamScore.objects.filter(student__in=students)
+        .order_by("student_id", "-created_at", "-id")
+        .values_list("student_id", "exam_name")
+    )
+    for student_id, exam_name in exams:
+        latest_exam.setdefault(student_id, exam_name)
     # Add summary per student: recent attendance count, fee balance, latest exam
     for s in students:
-        s.recent_present = Attendance.objects.filter(student=s, status="Present").count()
-        s.recent_absent = Attendance.objects.filter(student=s, status="Absent").count()
+        counts = attendance.get(s.id, {})
+        s.recent_present = counts.get("present", 0)
+        s.recent_absent = counts.get("absent", 0)
         s.fee_balance = (s.fee_total or 0) - (s.fee_paid or 0)
-        s.latest_exam = ExamScore.objects.filter(student=s).order_by("-created_at").first()
+        s.latest_exam_name = latest_exam.get(s.id)
     notices = Notice.objects.filter(school=school).order_by("-created_at")[:5]
     return render(request, "parent_dashboard.html", {"students": students, "notices": notices})
 
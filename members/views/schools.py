@@ -1,25 +1,21 @@
 """
 School management - Settings for school owners, Add School for superuser.
 """
-import json
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import get_user_model
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponseForbidden, HttpResponse
+from django.http import HttpResponseBadRequest, HttpResponseForbidden, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods, require_POST
-from django.core.serializers.json import DjangoJSONEncoder
 
 from ..models import (
     School,
     UserProfile,
     AcademicYear,
-    ClassRoom,
     Member,
-    FeeStructure,
-    FeeTransaction,
     ROLE_CHOICES,
 )
+from ..services.backup import MODELS_BY_LABEL, BackupService
 from ..utils import get_current_school
 from ..utils.role_guards import require_roles
 
@@ -318,7 +314,7 @@ def school_user_edit(request, user_id):
             profile.guardian_of.set(Member.objects.filter(id__in=guardian_ids, school=school))
         messages.success(request, "User updated.")
         return redirect("school_user_list")
-    students = Member.objects.filter(school=school).select_related("student_class").order_by("firstname")
+    students = Member.objects.filter(school=school).for_picker() if profile.role == "PARENT" else []
     guardian_ids = list(profile.guardian_of.values_list("id", flat=True))
     return render(request, "school_user_form.html", {"profile": profile, "roles": ROLE_CHOICES, "edit": True, "students": students, "guardian_ids": guardian_ids})
 
@@ -389,38 +385,34 @@ def academic_year_edit(request, year_id):
     return render(request, "academic_year_edit.html", {"year": ay})
 
 
-# --- JSON backup (OWNER only) ---
-
-
-def _model_to_dict(queryset, fields):
-    """Serialize queryset to list of dicts with only given fields."""
-    return list(queryset.values(*fields))
+# --- Backup download (OWNER only) ---
 
 
 @login_required
 @require_roles("OWNER")
 def school_backup_json(request):
-    """Download a JSON backup of key school data (read-only, no passwords)."""
+    """
+    Stream an NDJSON backup of all school data (no user accounts or passwords).
+    ?gzip=1 compresses it; ?after=<model>:<pk> continues an interrupted download.
+    Restore with: python manage.py restore_school <file>
+    """
     school = get_current_school(request)
     if not school:
         raise HttpResponseForbidden("No school context")
-    payload = {
-        "school": {"id": school.id, "name": school.name, "address": school.address, "school_code": school.school_code, "code": school.code},
-        "academic_years": _model_to_dict(AcademicYear.objects.filter(school=school), ["id", "name", "start_date", "end_date", "is_active"]),
-        "class_rooms": _model_to_dict(ClassRoom.objects.filter(school=school), ["id", "name", "section"]),
-        "members": _model_to_dict(
-            Member.objects.filter(school=school),
-            ["id", "admission_no", "firstname", "lastname", "father_name", "mobile_number", "email", "student_class_id", "roll_number", "gender", "dob", "joined_date"],
-        ),
-        "fee_structures": _model_to_dict(FeeStructure.objects.filter(school=school), ["id", "class_room_id", "title", "amount", "due_date"]),
-        "fee_transactions": _model_to_dict(
-            FeeTransaction.objects.filter(student__school=school),
-            ["id", "student_id", "amount_paid", "month_year", "payment_date", "payment_mode", "status"],
-        ),
-    }
-    # Use Django's date serializer
-    response = HttpResponse(json.dumps(payload, indent=2, cls=DjangoJSONEncoder), content_type="application/json")
-    response["Content-Disposition"] = f'attachment; filename="school_backup_{school.code}.json"'
+    after = None
+    if request.GET.get("after"):
+        label, _, pk = request.GET["after"].rpartition(":")
+        if label not in MODELS_BY_LABEL or not pk.isdigit():
+            return HttpResponseBadRequest("after must be <model>:<pk>, e.g. members.member:120")
+        after = (label, int(pk))
+    compress = request.GET.get("gzip") == "1"
+    response = StreamingHttpResponse(
+        BackupService.iter_ndjson(school, compress=compress, after=after),
+        content_type="application/gzip" if compress else "application/x-ndjson",
+    )
+    suffix = f"_after_{after[0].split('.')[-1]}_{after[1]}" if after else ""
+    filename = f"school_backup_{school.code}{suffix}.ndjson" + (".gz" if compress else "")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
     return response
 
 
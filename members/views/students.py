@@ -1,25 +1,85 @@
+import csv
+import zipfile
 from datetime import date
-from django.core.paginator import Paginator
 from django.contrib import messages
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.core.files.storage import FileSystemStorage
 from django.core.exceptions import ValidationError
-from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
-from ..models import Member, ClassRoom, ExamScore, Attendance, UserProfile, TransportRoute, StudentTransport
+from django.http import HttpResponseForbidden, JsonResponse
+from ..models import Member, ClassRoom, ExamScore, UserProfile, TransportRoute, StudentTransport
+from ..services.attendance import AttendanceService
+from ..services.pdf import PdfService
+from ..services.student_import import StudentImportService, read_sheet
+from ..services.student_search import StudentSearchService
+from ..utils.keyset import KeysetPaginator
+from ..utils.tabular_export import Column, class_label, export_response
 from ..utils import get_current_school
 from ..validators import validate_image_file, validate_document_file
 from ..utils.role_guards import require_roles
+from ..utils.query_budget import query_budget
 
 @login_required
 @require_roles("OWNER", "ADMIN", "ACCOUNTANT", "TEACHER", "STAFF")
+@query_budget(8)
 def all_students(request):
     school = get_current_school(request)
-    qs = Member.objects.select_related('school', 'student_class').filter(school=school).order_by('firstname')
-    paginator = Paginator(qs, 25)
-    page_obj = paginator.get_page(request.GET.get('page', 1))
+    qs = Member.objects.filter(school=school).for_list()
+    paginator = KeysetPaginator(qs, 25, ordering=('firstname', 'id'))
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     return render(request, 'all_students.html', {'page_obj': page_obj, 'mymembers': page_obj})
 
+@login_required
+@require_roles("OWNER", "ADMIN", "ACCOUNTANT", "TEACHER", "STAFF")
+def export_students(request):
+    """Student register (optionally one ?class_id) as XLSX / CSV."""
+    school = get_current_school(request)
+    qs = Member.objects.filter(school=school).order_by('student_class__name', 'student_class__section', 'roll_number', 'firstname', 'id')
+    class_id = request.GET.get('class_id')
+    if class_id and class_id.isdigit():
+        qs = qs.filter(student_class_id=int(class_id))
+    return export_response(request, qs, [
+        Column('Admission No', 'admission_no'),
+        Column('Roll No', 'roll_number'),
+        Column('First Name', 'firstname'),
+        Column('Last Name', 'lastname'),
+        Column('Class', ('student_class__name', 'student_class__section'), class_label),
+        Column('Gender', 'gender'),
+        Column('Date of Birth', 'dob'),
+        Column("Father's Name", 'father_name'),
+        Column('Mobile', 'mobile_number'),
+        Column('Email', 'email'),
+        Column('Joined', 'joined_date'),
+        Column('Total Fee', 'fee_total'),
+        Column('Paid', 'fee_paid'),
+        Column('Balance', ('fee_total', 'fee_paid'), lambda total, paid: (total or 0) - (paid or 0)),
+    ], 'Student_Register', 'Students')
+
+@login_required
+@require_roles("OWNER", "ADMIN")
+def import_students(request):
+    """Bulk admission from a CSV / XLSX sheet; bad rows are listed, the rest are imported."""
+    school = get_current_school(request)
+    result = None
+    if request.method == "POST":
+        upload = request.FILES.get("excel_file")
+        if not upload:
+            messages.error(request, "Choose a .xlsx or .csv file to import.")
+            return redirect("import_students")
+        try:
+            result = StudentImportService.import_rows(school, read_sheet(upload))
+        except ValueError as e:
+            messages.error(request, str(e))
+            return redirect("import_students")
+        except (UnicodeDecodeError, csv.Error, zipfile.BadZipFile):
+            messages.error(request, "Could not read the file. Save it as .xlsx or .csv (UTF-8) and try again.")
+            return redirect("import_students")
+        if result.created:
+            messages.success(request, f"Imported {result.created} student(s).")
+        if result.error_count:
+            messages.warning(request, f"{result.error_count} row(s) were skipped - see the list below.")
+    return render(request, "import_students.html", {"result": result})
+
 @login_required
 @require_roles("OWNER", "ADMIN")
 def create_student_login(request, id):
@@ -59,14 +119,14 @@ def student_profile(request, id):
     Detailed view for a single student including exam and attendance stats.
     """
     school = get_current_school(request)
-    student = get_object_or_404(Member.objects.select_related('school', 'student_class'), id=id, school=school)
+    student = get_object_or_404(Member.objects.select_related('school', 'student_class', 'profile'), id=id, school=school)
     
     # Related data
     exams = ExamScore.objects.filter(student=student).order_by('-id')
-    attendance_list = Attendance.objects.filter(student=student).order_by('-date')
+    attendance = AttendanceService.totals([student.id]).get(student.id, {})
     
-    total_days = attendance_list.count()
-    present_days = attendance_list.filter(status='Present').count()
+    total_days = attendance.get('total', 0)
+    present_days = attendance.get('present', 0)
     
     # Calculate percentage safely
     attendance_percentage = (present_days / total_days * 100) if total_days > 0 else 0
@@ -297,6 +357,27 @@ def id_card(request, id):
     return render(request, 'id_card.html', {'student': student, 'school': school})
 
 
+@login_required
+@require_roles("OWNER", "ADMIN", "ACCOUNTANT", "TEACHER", "STAFF")
+def student_search(request):
+    """
+    Typeahead for the student pickers: ?q=<name or admission no>[&limit=10][&class_id=].
+    Returns JSON: {"results": [{"id", "name", "admission_no", "roll_number", "class", "due"}, ...]}
+    """
+    school = get_current_school(request)
+    if not school:
+        return JsonResponse({'results': []}, status=403)
+    limit = request.GET.get('limit', '')
+    class_id = request.GET.get('class_id', '')
+    results = StudentSearchService.search(
+        school.id,
+        request.GET.get('q', '')[:100],
+        limit=int(limit) if limit.isdigit() else 10,
+        class_id=int(class_id) if class_id.isdigit() else None,
+    )
+    return JsonResponse({'results': results})
+
+
 @login_required
 @require_roles("OWNER", "ADMIN", "ACCOUNTANT", "TEACHER", "STAFF")
 def check_admission_number(request):
@@ -313,7 +394,7 @@ def check_admission_number(request):
     existing_student = Member.objects.filter(
         school=school,
         admission_no__iexact=admission_no  # Case-insensitive check
-    ).first()
+    ).select_related('student_class').only('firstname', 'lastname', 'student_class__name', 'student_class__section').first()
     
     if existing_student:
         return JsonResponse({
@@ -329,103 +410,5 @@ def check_admission_number(request):
 @require_roles("OWNER", "ADMIN", "ACCOUNTANT", "TEACHER", "STAFF")
 def admission_receipt_pdf(request, id):
     school = get_current_school(request)
-    student = get_object_or_404(Member, id=id, school=school)
-
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="Admission_Receipt_{student.admission_no}.pdf"'
-
-    from reportlab.pdfgen import canvas
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib import colors
-    from reportlab.lib.units import inch
-
-    p = canvas.Canvas(response, pagesize=A4)
-    width, height = A4
-
-    # --- Header ---
-    y = height - 50
-    p.setFont("Helvetica-Bold", 24)
-    p.drawCentredString(width / 2, y, "ABC SCHOOL") # Replace with school.name if available
-    
-    y -= 30
-    p.setFont("Helvetica", 12)
-    p.drawCentredString(width / 2, y, "Excellence in Education")
-    p.drawCentredString(width / 2, y - 15, "123 School Road, City, State - 123456")
-    
-    y -= 40
-    p.line(50, y, width - 50, y)
-    
-    # --- Title ---
-    y -= 40
-    p.setFont("Helvetica-Bold", 18)
-    p.drawCentredString(width / 2, y, "ADMISSION CONFIRMATION RECEIPT")
-
-    # --- Student Details ---
-    y -= 50
-    x_left = 70
-    x_right = 350
-    line_height = 25
-    
-    p.setFont("Helvetica-Bold", 12)
-    p.drawString(x_left, y, "Student Information")
-    y -= line_height
-    p.line(x_left, y+5, 200, y+5) # Underline
-
-    p.setFont("Helvetica", 12)
-    
-    labels = [
-        ("Admission Number:", student.admission_no),
-        ("Student Name:", f"{student.firstname} {student.lastname}"),
-        ("Class & Section:", str(student.student_class) if student.student_class else "N/A"),
-        ("Date of Birth:", str(student.dob) if student.dob else "N/A"),
-        ("Gender:", student.gender),
-        ("Father's Name:", student.father_name),
-        ("Mobile Number:", student.mobile_number),
-        ("Address:", student.address[:50] + "..." if student.address and len(student.address)>50 else student.address),
-        ("Admission Date:", str(student.joined_date)),
-    ]
-
-    for label, value in labels:
-        y -= line_height
-        p.setFont("Helvetica-Bold", 10)
-        p.drawString(x_left, y, label)
-        p.setFont("Helvetica", 10)
-        p.drawString(x_left + 150, y, str(value or "N/A"))
-
-    # --- Financial Details ---
-    y_finance = height - 210
-    
-    y -= 40
-    p.setFont("Helvetica-Bold", 12)
-    p.drawString(x_left, y, "Fee Details")
-    y -= line_height
-    p.line(x_left, y+5, 150, y+5)
-
-    p.setFont("Helvetica", 11)
-    fee_data = [
-        ("Total Fee:", f"Rs. {student.fee_total}"),
-        ("Amount Paid:", f"Rs. {student.fee_paid}"),
-        ("Balance Due:", f"Rs. {(student.fee_total or 0) - (student.fee_paid or 0)}"),
-    ]
-
-    for label, value in fee_data:
-        y -= line_height
-        p.drawString(x_left, y, label)
-        p.drawString(x_left + 150, y, value)
-
-    # --- Footer ---
-    y = 100
-    p.setFont("Helvetica-Oblique", 10)
-    p.drawString(x_left, y, "Authorized Signatory")
-    p.drawString(width - 200, y, "Parent/Guardian Signature")
-    
-    p.line(x_left, y+10, x_left + 150, y+10)
-    p.line(width - 200, y+10, width - 50, y+10)
-
-    y -= 40
-    p.setFont("Helvetica", 8)
-    p.drawCentredString(width / 2, y, "This is a computer-generated receipt.")
-
-    p.showPage()
-    p.save()
-    return response
\ No newline at end of file
+    student = get_object_or_404(Member.objects.select_related('student_class'), id=id, school=school)
+    return PdfService.respond(request, "admission_receipt", student, f"Admission_Receipt_{student.admission_no}.pdf", attachment=True)
@@ -3,6 +3,7 @@ Super Admin Views - Software Owner Portal
 Manages all schools in the multi-tenant system
 """
 
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.views import LoginView
@@ -10,6 +11,8 @@ from django.contrib.auth.models import User
 from django.contrib import messages
 from django.db.models import Count, Q
 from members.models import School, Member
+from members.services import slow_queries as slow_query_log
+from members.utils.aggregates import count_buckets
 from django.utils.text import slugify
 import random
 import string
@@ -35,11 +38,12 @@ def super_admin_dashboard(request):
     
     schools = School.objects.all()
     total_students = Member.objects.all().count()
+    school_counts = count_buckets(schools, total=None, active=Q(is_active=True), demo=Q(is_demo=True))
     
     context = {
-        'total_schools': schools.count(),
-        'active_schools': schools.filter(is_active=True).count(),
-        'demo_schools': schools.filter(is_demo=True).count(),
+        'total_schools': school_counts['total'],
+        'active_schools': school_counts['active'],
+        'demo_schools': school_counts['demo'],
         'total_students': total_students,
         'schools': schools.order_by('-created_at')[:10],
     }
@@ -84,29 +88,31 @@ def create_demo_school(request):
 @login_required
 @user_passes_test(is_super_admin, login_url='/super-admin/login/')
 def populate_demo_data(request, school_id):
-    """Populate demo school with sample data"""
+    """Create the demo admin login now; the sample data is generated in the background"""
     school = get_object_or_404(School, id=school_id, is_demo=True)
     
     # Import demo data generator
+    from members.tasks import populate_demo_school_task
+    from members.utils import background
     from members.utils.demo_data_generator import DemoDataGenerator
     
-    # Generate data
     generator = DemoDataGenerator(school)
     
     try:
-        result = generator.generate_all()
+        admin_user = generator.create_admin_user()
+        background.submit(populate_demo_school_task, school.id)
         
         context = {
             'school': school,
-            'admin_username': result['admin_username'],
-            'admin_password': result['admin_password'],
+            'admin_username': admin_user.username,
+            'admin_password': generator.PASSWORD,
             'school_url': f'/accounts/login/',
-            'students_count': result['students_count'],
-            'staff_count': result['staff_count'],
-            'classes_count': result['classes_count'],
+            'students_count': generator.STUDENTS,
+            'staff_count': generator.STAFF,
+            'classes_count': generator.CLASSES,
         }
         
-        messages.success(request, f'✅ Demo data generated: {result["students_count"]} students, {result["staff_count"]} staff!')
+        messages.success(request, f'✅ Demo school ready. {generator.STUDENTS} students and {generator.STAFF} staff are being added in the background.')
         
     except Exception as e:
         messages.error(request, f'❌ Error generating demo data: {str(e)}')
@@ -143,3 +149,21 @@ def toggle_school_status(request, school_id):
     messages.success(request, f'School "{school.name}" has been {status}.')
     
     return redirect('super_admin:school_list')
+
+
+@login_required
+@user_passes_test(is_super_admin, login_url='/super-admin/login/')
+def slow_queries(request):
+    """Slow SQL from the sampler (SLOW_QUERY_MS), grouped by fingerprint, optionally for one school"""
+    school = request.GET.get('school') or None
+    entries = slow_query_log.recent(school=school)
+    context = {
+        'enabled': settings.SLOW_QUERY_MS > 0,
+        'threshold_ms': settings.SLOW_QUERY_MS,
+        'groups': slow_query_log.grouped(entries)[:100],
+        'recent': entries[:50],
+        'school': school or '',
+        'schools': School.objects.order_by('code').values_list('code', flat=True),
+    }
+    return render(request, 'super_admin/slow_queries.html', context)
+
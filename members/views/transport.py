@@ -2,7 +2,7 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.db.models import Sum
 from django.contrib.auth.decorators import login_required
 from decimal import Decimal
-from ..models import Member, TransportRoute, StudentTransport, TransportZone, TransportStop
+from ..models import Member, MemberQuerySet, TransportRoute, StudentTransport, TransportZone, TransportStop
 from ..utils import get_current_school
 from ..utils.role_guards import require_roles
 
@@ -11,9 +11,12 @@ from ..utils.role_guards import require_roles
 def transport_home(request):
     school = get_current_school(request)
     routes = TransportRoute.objects.filter(school=school)
-    transport_students = StudentTransport.objects.select_related('student', 'route').filter(school=school)
+    transport_students = (
+        StudentTransport.objects.select_related('student', 'route').filter(school=school)
+        .defer(*MemberQuerySet.related_defer('student'))
+    )
     assigned_ids = transport_students.values_list('student_id', flat=True)
-    available_students = Member.objects.filter(school=school).exclude(id__in=assigned_ids)
+    available_students = Member.objects.filter(school=school).exclude(id__in=assigned_ids).for_picker()
     zones = TransportZone.objects.filter(school=school).order_by('name')
     stops = TransportStop.objects.filter(school=school).select_related('zone').order_by('zone__name', 'name')
 
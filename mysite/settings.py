@@ -61,9 +61,15 @@ INSTALLED_APPS = [
 #     INSTALLED_APPS += ['debug_toolbar']
 
 MIDDLEWARE = [
+    # Counts queries per request and enforces @query_budget; first so it sees them all
+    'members.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     # 'members.middleware.subdomain.SubdomainMiddleware',  # TODO: Fix branding import before enabling
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    # Per school / URL name latency, queries, template time and size for /metrics
+    'members.middleware.MetricsMiddleware',
+    # Opt-in slow-query sampler (SLOW_QUERY_MS); skipped entirely when off
+    'members.middleware.SlowQueryMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     
     # ✅ CORS Middleware must be before CommonMiddleware
@@ -213,6 +219,31 @@ CORS_ALLOWED_ORIGINS = [
     "https://school-erp-51hd.onrender.com",
 ]
 
+# --- BACKGROUND TASKS ---
+# With a broker, long jobs (notification fan-out, ...) go to Celery workers;
+# without one they run in a small in-process thread pool (BACKGROUND_WORKERS threads).
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', '')
+CELERY_TASK_ALWAYS_EAGER = os.environ.get('CELERY_TASK_ALWAYS_EAGER', 'False').lower() in ('true', '1', 'yes')
+BACKGROUND_WORKERS = int(os.environ.get('BACKGROUND_WORKERS', '2'))
+# PDF rendering (receipts, marksheets, salary slips) is CPU-bound: >0 renders in that many
+# worker processes instead of the background thread (see members/services/pdf.py).
+PDF_RENDER_PROCESSES = int(os.environ.get('PDF_RENDER_PROCESSES', '0'))
+# Batch exports (a class's marksheets, a range of receipts) use a pool of this many processes
+# for the duration of the export when PDF_RENDER_PROCESSES is 0 (1 = render inline).
+PDF_EXPORT_PROCESSES = int(os.environ.get('PDF_EXPORT_PROCESSES', '2'))
+# Raise instead of logging when a view goes over its @query_budget (the budget tests set it)
+QUERY_BUDGET_STRICT = os.environ.get('QUERY_BUDGET_STRICT', 'False').lower() in ('true', '1', 'yes')
+# /metrics (Prometheus): workers share their counters through files in METRICS_DIR (a tmpfs
+# such as /dev/shm/erp-metrics, emptied on deploy); unset keeps them per process.
+METRICS_DIR = os.environ.get('METRICS_DIR', '')
+METRICS_FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', '5'))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+# Slow-query sampler: statements of at least SLOW_QUERY_MS (0 = off) in the sampled share of
+# requests go to a ring buffer (super-admin "Slow queries" page, manage.py dump_slow_queries).
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', '0'))
+SLOW_QUERY_SAMPLE_RATE = float(os.environ.get('SLOW_QUERY_SAMPLE_RATE', '1'))
+SLOW_QUERY_BUFFER = int(os.environ.get('SLOW_QUERY_BUFFER', '500'))
+
 # --- DEBUG TOOLBAR (only when DEBUG) ---
 if DEBUG:
     INTERNAL_IPS = ['127.0.0.1']
@@ -4,10 +4,11 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import RedirectView
 from members.views.auth import TenantLoginView
-from members.views.health import health
+from members.views.health import health, metrics
 
 urlpatterns = [
     path('health/', health, name='health'),
+    path('metrics', metrics, name='metrics'),
     path('favicon.ico', RedirectView.as_view(url=settings.STATIC_URL + 'assets/img/brand/semora-logo.png', permanent=False)),
     path('admin/', admin.site.urls),
     path('', include('pwa.urls')),
@@ -0,0 +1,81 @@
+/*
+ * Student typeahead for <select> pickers.
+ *
+ *   <input type="search" data-student-search="#student_select" data-url="{% url 'student_search' %}">
+ *   <select id="student_select" name="student_id" size="8" required></select>
+ *
+ * Typing asks the search endpoint for the top matches and replaces the select's options
+ * with them (data-name / data-class / data-due set on each option), so the page no longer
+ * ships the whole roster.
+ */
+(function () {
+    "use strict";
+
+    function label(s) {
+        var parts = [s.name];
+        if (s.class) parts.push("(" + s.class + ")");
+        if (s.admission_no) parts.push("· " + s.admission_no);
+        return parts.join(" ");
+    }
+
+    function fill(select, results, query) {
+        select.innerHTML = "";
+        if (!results.length) {
+            var none = document.createElement("option");
+            none.disabled = true;
+            none.textContent = query ? "No students match \"" + query + "\"" : "Type a name or admission no.";
+            select.appendChild(none);
+            return;
+        }
+        results.forEach(function (s) {
+            var opt = document.createElement("option");
+            opt.value = s.id;
+            opt.textContent = label(s) + (select.dataset.showDue ? " (Due: ₹" + s.due + ")" : "");
+            opt.dataset.name = s.name;
+            opt.dataset.class = s.class;
+            opt.dataset.due = s.due;
+            select.appendChild(opt);
+        });
+    }
+
+    function attach(input) {
+        var select = document.querySelector(input.dataset.studentSearch);
+        if (!select) return;
+        var timer = null;
+        var seq = 0;
+        input.setAttribute("autocomplete", "off");
+        input.addEventListener("input", function () {
+            clearTimeout(timer);
+            var query = input.value.trim();
+            timer = setTimeout(function () {
+                if (!query) { fill(select, [], ""); return; }
+                var mine = ++seq;
+                var url = input.dataset.url + "?limit=" + (input.dataset.limit || 20) + "&q=" + encodeURIComponent(query);
+                fetch(url, { credentials: "same-origin", headers: { "Accept": "application/json" } })
+                    .then(function (r) { return r.ok ? r.json() : { results: [] }; })
+                    .then(function (data) {
+                        if (mine !== seq) return; // a newer query is on its way
+                        fill(select, data.results || [], query);
+                        if (data.results && data.results.length === 1) {
+                            select.value = data.results[0].id;
+                            select.dispatchEvent(new Event("change"));
+                        }
+                    });
+            }, 150);
+        });
+    }
+
+    window.StudentSearch = {
+        // Put one known student into the picker (e.g. from a "Pay now" button) and select it.
+        select: function (selector, student) {
+            var select = document.querySelector(selector);
+            fill(select, [student], "");
+            select.value = student.id;
+            select.dispatchEvent(new Event("change"));
+        }
+    };
+
+    document.addEventListener("DOMContentLoaded", function () {
+        document.querySelectorAll("[data-student-search]").forEach(attach);
+    });
+})();